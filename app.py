@@ -1,12 +1,29 @@
 # app.py
 # app.py
+import time
+_imports_t0 = time.perf_counter()
 import streamlit as st
 from pathlib import Path
 import pandas as pd
 from datetime import datetime, timedelta, time as dtime
-from utils.parser import parse_log_file, extract_alarm_events
-from utils.visuals import draw_root_cause_diagram_pil, plot_timeline_altair, plot_alarm_counts
-import io
+from utils.anomaly import RATE_WINDOWS, RateMonitor, detect_from_counts, detect_rate_anomalies
+from utils.archives import ARCHIVE_EXTENSIONS, archive_kind
+from utils.cache import ParseCache
+from utils.correlate import correlate_events
+from utils.parallel import parse_files_parallel
+from utils import profiling
+from utils.export import EXPORT_MIME, export_events
+from utils.filters import filter_events
+from utils.aggregate import alarm_counts, timeline_data
+from utils.follow import FileFollower
+from utils.intervals import interval_summary, pair_alarm_intervals
+from utils.search import EventIndex
+from utils.store import EventStore
+from utils.templates import TemplateMiner
+from utils.uploads import UploadStore
+from utils.visuals import collapse_runs, diagram_page_count, render_root_cause_page, plot_timeline_altair, plot_alarm_counts
+# the first run in a server process pays for the imports; reruns find the modules loaded
+import_seconds = time.perf_counter() - _imports_t0
 
 st.set_page_config(layout="wide", page_title="TSMC Log Analyzer")
 BASE_DIR = Path(__file__).parent
@@ -18,161 +35,514 @@ st.markdown("Upload logs or select files from `logs/`. Supports TSMC and McScrip
 
 # Sidebar - upload & select
 st.sidebar.header("Load logs")
-uploaded = st.sidebar.file_uploader("Upload log file(s)", accept_multiple_files=True, type=["txt","log"])
+# Uploads are stored by content hash (logs/.store); gzip/zip/tar bundles are parsed in place
+@st.cache_resource
+def get_upload_store():
+    return UploadStore(LOGS_DIR)
+
+uploaded = st.sidebar.file_uploader("Upload log file(s) or archives", accept_multiple_files=True,
+                                    type=["txt","log"] + ARCHIVE_EXTENSIONS)
+compress_uploads = st.sidebar.checkbox("Keep large uploads gzip-compressed", value=False)
 if uploaded:
-    for f in uploaded:
-        out = LOGS_DIR / f.name
-        with open(out, "wb") as fh:
-            fh.write(f.getbuffer())
-    st.sidebar.success(f"Saved {len(uploaded)} file(s) to logs/")
-
-all_logs = sorted([p for p in LOGS_DIR.iterdir() if p.is_file()])
-choices = [p.name for p in all_logs]
+    # each upload is hashed once per session, not on every rerun
+    seen_uploads = st.session_state.setdefault("seen_uploads", set())
+    new_uploads = [f for f in uploaded if f.file_id not in seen_uploads]
+    if new_uploads:
+        stored = sum(get_upload_store().add(f.name, f.getbuffer(), compress=compress_uploads) for f in new_uploads)
+        seen_uploads.update(f.file_id for f in new_uploads)
+        st.sidebar.success(f"Stored {stored} new file(s), {len(new_uploads) - stored} already uploaded")
+
+# hidden entries are the app's own state (.cache, .store, .events.db)
+log_paths = {p.name: p for p in sorted(LOGS_DIR.iterdir()) if p.is_file() and not p.name.startswith(".")}
+log_paths.update(get_upload_store().paths())
+choices = sorted(log_paths)
 selected_files = st.sidebar.multiselect("Select files (logs/)", options=choices, default=choices[:1] if choices else [])
 
 if not selected_files:
     st.info("No files selected. Upload or choose logs to begin.")
     st.stop()
 
-# Parse files
-raw_dfs = []
-events = []
-file_summaries = {}
-for fname in selected_files:
-    path = LOGS_DIR / fname
-    try:
-        text = path.read_text(errors="ignore")
-    except Exception as e:
-        st.error(f"Failed to read {fname}: {e}")
-        continue
-    lines = text.splitlines()
-    parsed = parse_log_file(lines)  # list of dicts
-    df_parsed = pd.DataFrame(parsed)
-    df_parsed["source_file"] = fname
-    raw_dfs.append(df_parsed)
-
-    # Extract events (list of dicts)
-    evts = extract_alarm_events(df_parsed)
-    file_summaries[fname] = {"lines": len(lines), "events": len(evts)}
-    for e in evts:
-        e["source_file"] = fname
-    events.extend(evts)
-
-# Events DataFrame (may be empty)
-events_df = pd.DataFrame(events)
-# Normalize columns
-required_cols = ["Device Name","Alarm Name","Severity","Status","Raise Date","Terminated Date","Message","source_file"]
-for col in required_cols:
-    if col not in events_df.columns:
-        events_df[col] = pd.NA
-
-# Convert Raise Date/Terminated Date to datetimes
-events_df["Raise Date"] = pd.to_datetime(events_df["Raise Date"], errors="coerce")
-events_df["Terminated Date"] = pd.to_datetime(events_df["Terminated Date"], errors="coerce")
-
-# Sidebar filters
-st.sidebar.header("Filters")
-if not events_df.empty and events_df["Raise Date"].notna().any():
-    min_dt = events_df["Raise Date"].min()
-    max_dt = events_df["Raise Date"].max()
-else:
-    # default to last 7 days to avoid NaT errors
-    max_dt = pd.Timestamp.now()
-    min_dt = max_dt - pd.Timedelta(days=7)
-
-# date picker requires date objects
+# Follow mode: keep one FileFollower per file in the session and only parse appended bytes
+follow = st.sidebar.checkbox("Follow mode (parse only newly appended lines)", value=False)
+refresh_secs = st.sidebar.number_input("Auto-refresh every N seconds (0 = off)", min_value=0, value=0, step=5) if follow else 0
+# Event store: events are kept in SQLite, filters run as SQL and only one page of rows is loaded
+use_store = st.sidebar.checkbox("Use event store (SQLite, logs/.events.db)", value=False, disabled=follow) and not follow
+# Log templates: the lines no specific rule matched are clustered while the files are parsed
+mine = None
+if st.sidebar.checkbox("Mine templates from unmatched lines", value=False):
+    mine = {"max_templates": st.sidebar.number_input("Keep at most N templates (least recently seen are dropped)",
+                                                     min_value=100, value=5000, step=500)}
+# Performance panel: time (and optionally peak memory) of every stage of this run, per file and per event rule
+show_perf = st.sidebar.checkbox("Performance panel", value=False)
+trace_memory = st.sidebar.checkbox(
+    "Track peak memory (slower)", value=False,
+    help="Peaks are process-wide: they include allocations of other sessions running at the same time.") if show_perf else False
+profiling.deactivate()  # an earlier run may have stopped before its own deactivate
+profiler = profiling.Profiler(trace_memory=trace_memory) if show_perf else None
+profiling.activate(profiler)
 try:
-    date_range = st.sidebar.date_input("Date range (Raise Date)", [min_dt.date(), max_dt.date()])
-except Exception:
-    # fallback to safe values
-    date_range = [min_dt.date(), max_dt.date()]
-
-# time inputs
-start_time = st.sidebar.time_input("Start time", value=dtime(0,0))
-end_time = st.sidebar.time_input("End time", value=dtime(23,59,59))
-
-start_dt = datetime.combine(date_range[0], start_time)
-end_dt = datetime.combine(date_range[1], end_time)
-
-severities = sorted(events_df["Severity"].dropna().unique()) if not events_df.empty else []
-selected_sev = st.sidebar.multiselect("Severity", options=severities, default=severities)
-alarm_name_filter = st.sidebar.text_input("Alarm name/code filter (partial)", "")
-text_search = st.sidebar.text_input("Full-text search", "")
-
-# Apply filters safely
-df_filtered = events_df.copy()
-if not df_filtered.empty:
-    # filter by datetime if Raise Date exists
-    if df_filtered["Raise Date"].notna().any():
-        df_filtered = df_filtered[(df_filtered["Raise Date"] >= pd.to_datetime(start_dt)) & (df_filtered["Raise Date"] <= pd.to_datetime(end_dt))]
-    if selected_sev:
-        df_filtered = df_filtered[df_filtered["Severity"].isin(selected_sev)]
-    if alarm_name_filter:
-        df_filtered = df_filtered[df_filtered["Alarm Name"].astype(str).str.contains(alarm_name_filter, case=False, na=False)]
-    if text_search:
-        df_filtered = df_filtered[df_filtered["Message"].astype(str).str.contains(text_search, case=False, na=False)]
-
-# UI - file summary
-st.header("Summary of parsed files")
-cols = st.columns(len(file_summaries) or 1)
-i = 0
-for fname, s in file_summaries.items():
-    cols[i % len(cols)].metric(fname, f"{s['events']} events\n{s['lines']} lines")
-    i += 1
-
-# Event table & download
-st.markdown("### Event Details")
-if df_filtered.empty:
-    st.info("No events match filters or no events found in selected files.")
-else:
-    # Ensure required columns exist before selecting
+    @st.cache_resource
+    def cold_import_seconds(_seconds):
+        # kept from the first run of the process (the value isn't part of the cache key)
+        return _seconds
+
+    cold_imports = cold_import_seconds(import_seconds)
+    if profiler is not None:
+        profiler.record_stage("imports (first run)", cold_imports)
+        profiler.record_stage("imports", import_seconds)
+
+    def follow_events(fname, path, mine=None):
+        followers = st.session_state.setdefault("followers", {})
+        # a follower mines from its first poll on: other template settings need a follower of their own
+        key = (fname, None if mine is None else tuple(sorted(mine.items())))
+        if key not in followers:
+            followers[key] = FileFollower(path, miner=TemplateMiner(**mine) if mine is not None else None)
+        fol = followers[key]
+        fol.poll()
+        templates = (fol.miner.to_frame(route=True), fol.miner.stats) if fol.miner is not None else None
+        return fol.events, fol.lines, templates
+
+    # Parse files; results are cached on disk (logs/.cache) keyed by file content
+    @st.cache_resource
+    def get_parse_cache():
+        return ParseCache(LOGS_DIR / ".cache")
+
+    def load_events(paths, mine=None):
+        """{path: (events, line count, templates)}; cache misses are parsed together on a process pool.
+        With mine (TemplateMiner settings) templates is the file's (templates frame, miner stats),
+        mined in the same pass and cached with the events; otherwise None."""
+        cache = get_parse_cache()
+        loaded, misses = {}, []
+        for path in paths:
+            with profiling.stage("cache read", Path(path).name) as rec:
+                hit = cache.get(path, with_entries=False)
+                templates = cache.get_templates(path, mine) if hit is not None and mine is not None else None
+                rec["rows"] = len(hit[1]) if hit is not None else 0
+            if hit is not None and (mine is None or templates is not None):
+                _, evts, meta = hit
+                loaded[path] = (evts, meta["lines"], templates)
+            else:
+                misses.append(path)
+        if misses:
+            miners = {path: TemplateMiner(**mine) for path in misses} if mine is not None else {}
+            for path, (_, evts, n_lines) in parse_files_parallel(misses, miners=miners).items():
+                templates = cached = None
+                if path in miners:
+                    templates = (miners[path].to_frame(route=True), miners[path].stats)
+                    cached = (templates[0], {"settings": mine, "stats": templates[1]})
+                with profiling.stage("cache write", Path(path).name):
+                    cache.put(path, None, evts, templates=cached, lines=n_lines)
+                loaded[path] = (evts, n_lines, templates)
+        return loaded
+
+    @st.cache_resource
+    def get_event_store():
+        return EventStore(LOGS_DIR / ".events.db")
+
+    paths = {fname: log_paths[fname] for fname in selected_files}
+    # store mode only parses files whose content changed since they were inserted
+    to_load = paths
+    if use_store:
+        store = get_event_store()
+        to_load = {fname: path for fname, path in paths.items() if store.file_key(fname) != get_parse_cache().key(path)}
+    loaded = {}
+    if not follow:
+        try:
+            loaded = load_events(list(to_load.values()), mine)
+        except Exception:
+            # retry one by one below so the failing file can be reported
+            loaded = {}
+
+    event_frames = []
+    file_summaries = {}
+    file_templates = {}  # fname -> (templates frame, miner stats) when mining
+    for fname, path in to_load.items():
+        try:
+            if follow and not archive_kind(path):
+                evts, n_lines, templates = follow_events(fname, path, mine)
+            else:
+                evts, n_lines, templates = loaded[path] if path in loaded else load_events([path], mine)[path]
+        except Exception as e:
+            st.error(f"Failed to read {fname}: {e}")
+            continue
+        if templates is not None:
+            file_templates[fname] = templates
+        if use_store:
+            with profiling.stage("store insert", fname) as rec:
+                store.insert_events(fname, get_parse_cache().key(path), evts, n_lines)
+                rec["rows"] = len(evts)
+            continue
+        file_summaries[fname] = {"lines": n_lines, "events": len(evts)}
+        event_frames.append(evts.assign(source_file=fname))
+    if use_store:
+        file_summaries = store.file_summaries(list(paths))
+        if mine is not None:
+            # files already in the store are only read for their templates (cached unless mined with other settings)
+            for fname, path in paths.items():
+                if fname not in to_load:
+                    try:
+                        file_templates[fname] = load_events([path], mine)[path][2]
+                    except Exception as e:
+                        st.error(f"Failed to read {fname}: {e}")
+
+    cache_stats = get_parse_cache().stats
+    st.sidebar.caption(
+        f"Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['evictions']} evicted ({get_parse_cache().total_bytes() / 2**20:.1f} MB on disk)"
+    )
+
+    # rows per table page in store mode
+    STORE_PAGE_ROWS = 1000
+
+    # Events DataFrame (may be empty)
+    events_df = pd.concat(event_frames, ignore_index=True) if event_frames else pd.DataFrame()
+    # Normalize columns
+    required_cols = ["Device Name","Component","Alarm Name","Severity","Status","Raise Date","Terminated Date","Message","source_file"]
     for col in required_cols:
-        if col not in df_filtered.columns:
-            df_filtered[col] = pd.NA
-
-    display_df = df_filtered[required_cols].sort_values("Raise Date").reset_index(drop=True)
-    st.dataframe(display_df, height=350)
-
-    # Excel download
-    buf = io.BytesIO()
-    display_df.to_excel(buf, index=False)
-    buf.seek(0)
-    st.download_button("Download filtered events (Excel)", data=buf, file_name="events_filtered.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-# Graphs
-st.markdown("### Graphical representation")
-if not df_filtered.empty:
-    st.subheader("Alarm timeline")
-    try:
-        chart = plot_timeline_altair(df_filtered)
-        st.altair_chart(chart, use_container_width=True)
-    except Exception as e:
-        st.error(f"Failed to render timeline: {e}")
+        if col not in events_df.columns:
+            events_df[col] = pd.NA
+
+    # Convert Raise Date/Terminated Date to datetimes
+    events_df["Raise Date"] = pd.to_datetime(events_df["Raise Date"], errors="coerce")
+    events_df["Terminated Date"] = pd.to_datetime(events_df["Terminated Date"], errors="coerce")
 
-    st.subheader("Alarm counts")
+    # Sidebar filters
+    st.sidebar.header("Filters")
+    if use_store:
+        min_dt, max_dt = store.date_range(files=list(paths))
+    elif not events_df.empty and events_df["Raise Date"].notna().any():
+        min_dt = events_df["Raise Date"].min()
+        max_dt = events_df["Raise Date"].max()
+    else:
+        min_dt = max_dt = pd.NaT
+    if pd.isna(min_dt):
+        # default to last 7 days to avoid NaT errors
+        max_dt = pd.Timestamp.now()
+        min_dt = max_dt - pd.Timedelta(days=7)
+
+    # date picker requires date objects
     try:
-        fig_counts = plot_alarm_counts(df_filtered)
-        # plotly or altair returned
-        if hasattr(fig_counts, "to_html") or hasattr(fig_counts, "data"):
-            st.plotly_chart(fig_counts, use_container_width=True)
+        date_range = st.sidebar.date_input("Date range (Raise Date)", [min_dt.date(), max_dt.date()])
+    except Exception:
+        # fallback to safe values
+        date_range = [min_dt.date(), max_dt.date()]
+
+    # time inputs
+    start_time = st.sidebar.time_input("Start time", value=dtime(0,0))
+    end_time = st.sidebar.time_input("End time", value=dtime(23,59,59))
+
+    start_dt = datetime.combine(date_range[0], start_time)
+    end_dt = datetime.combine(date_range[1], end_time)
+
+    if use_store:
+        severities = store.distinct("Severity", files=list(paths))
+    else:
+        severities = sorted(events_df["Severity"].dropna().unique()) if not events_df.empty else []
+    selected_sev = st.sidebar.multiselect("Severity", options=severities, default=severities)
+    alarm_name_filter = st.sidebar.text_input("Alarm name/code filter (partial)", "")
+    text_search = st.sidebar.text_input("Full-text search", "")
+
+    # Search index over Message/Alarm Name, built once per set of parsed files (by content key)
+    @st.cache_resource(max_entries=4)
+    def get_event_index(file_keys, _events_df):
+        return EventIndex(_events_df)
+
+    # content keys identify the loaded events (None while following or when a file failed)
+    file_keys = None
+    if not follow and len(file_summaries) == len(paths):
+        file_keys = tuple((fname, get_parse_cache().key(path)) for fname, path in paths.items())
+
+    if use_store:
+        store_filters = dict(files=list(paths), start=start_dt, end=end_dt, severities=selected_sev,
+                             alarm_name=alarm_name_filter, text=text_search)
+        with profiling.stage("filter") as rec:
+            n_matching = rec["rows"] = store.count(**store_filters)
+    else:
+        event_index = None
+        if file_keys is not None and (alarm_name_filter or text_search):
+            event_index = get_event_index(file_keys, events_df)
+
+        # Apply filters safely
+        with profiling.stage("filter") as rec:
+            df_filtered = filter_events(events_df, start_dt, end_dt, selected_sev, alarm_name_filter, text_search,
+                                        index=event_index).copy()
+            rec["rows"] = len(df_filtered)
+        n_matching = len(df_filtered)
+
+    # UI - file summary
+    st.header("Summary of parsed files")
+    cols = st.columns(len(file_summaries) or 1)
+    i = 0
+    for fname, s in file_summaries.items():
+        cols[i % len(cols)].metric(fname, f"{s['events']} events\n{s['lines']} lines")
+        i += 1
+
+    # Event table & download
+    st.markdown("### Event Details")
+    if use_store:
+        n_pages = max(1, -(-n_matching // STORE_PAGE_ROWS))
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) if n_pages > 1 else 1
+        with profiling.stage("store page") as rec:
+            df_filtered = store.query(limit=STORE_PAGE_ROWS, offset=(page - 1) * STORE_PAGE_ROWS, **store_filters)
+            rec["rows"] = len(df_filtered)
+        st.caption(f"{n_matching} matching events in the store; showing {len(df_filtered)} from row {(page - 1) * STORE_PAGE_ROWS + 1}.")
+    if df_filtered.empty:
+        st.info("No events match filters or no events found in selected files.")
+    else:
+        # Ensure required columns exist before selecting
+        for col in required_cols:
+            if col not in df_filtered.columns:
+                df_filtered[col] = pd.NA
+
+        display_df = df_filtered[required_cols].sort_values("Raise Date").reset_index(drop=True)
+        st.dataframe(display_df, height=350)
+
+        # Download: the file is only written when the button is clicked (streamed, see utils/export.py)
+        export_fmt = st.selectbox("Export format", options=["xlsx", "csv", "parquet", "jsonl"], index=0)
+        # the export runs after this script has finished, so its timing is kept for the next run's panel
+        export_profiles = st.session_state.setdefault("export_profiles", [])
+
+        def run_export(frames):
+            if profiler is None:
+                return export_events(frames, export_fmt)
+            timer = profiling.Profiler(trace_memory=trace_memory)
+            timer.start()
+            try:
+                with timer.stage("export", export_fmt) as rec:
+                    data = export_events(frames, export_fmt)
+                    rec["rows"] = n_matching
+            finally:
+                timer.stop()
+            export_profiles[:] = timer.stages
+            return data
+
+        st.download_button(
+            f"Download filtered events ({export_fmt})",
+            data=(lambda: run_export(store.iter_query(**store_filters))) if use_store
+            else (lambda: run_export(display_df)),
+            file_name=f"events_filtered.{export_fmt}",
+            mime=EXPORT_MIME[export_fmt],
+        )
+
+    # Alarm intervals: raise/terminate pairs over all events of the selected files, shown for the date range
+    with profiling.stage("intervals") as rec:
+        interval_events = store.query(files=list(paths), statuses=["Raised", "Terminated"]) if use_store else events_df
+        intervals = pair_alarm_intervals(interval_events)
+        rec["rows"] = len(intervals)
+    if not intervals.empty:
+        st.markdown("### Alarm intervals")
+        intervals = intervals[intervals["Raise Date"].between(start_dt, end_dt) | (intervals["State"] == "Open")]
+        summary = interval_summary(intervals)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Open alarms", summary["open"])
+        c2.metric("Closed intervals", summary["closed"])
+        c3.metric("Median duration", str(summary["median_duration"]))
+        c4.metric("Longest", str(summary["max_duration"]))
+        st.dataframe(intervals.reset_index(drop=True), height=250)
+
+    # Graphs: binned server-side; the bucket size follows the visible date range and single
+    # events are only plotted once they fit the point budget
+    def build_chart_data(df, start, end):
+        return timeline_data(df, start, end), alarm_counts(df, start, end)
+
+    @st.cache_data(max_entries=16)
+    def cached_chart_data(file_keys, filter_key, _df, start, end):
+        return build_chart_data(_df, start, end)
+
+    @st.cache_data(max_entries=16)
+    def cached_store_chart_data(file_keys, filter_key, _store_filters):
+        return get_event_store().chart_data(**_store_filters)
+
+    st.markdown("### Graphical representation")
+    if n_matching:
+        with profiling.stage("chart data") as rec:
+            if use_store:
+                filter_key = (str(start_dt), str(end_dt), tuple(selected_sev), alarm_name_filter, text_search)
+                if file_keys is not None:
+                    timeline, (counts, counts_label) = cached_store_chart_data(file_keys, filter_key, store_filters)
+                else:
+                    timeline, (counts, counts_label) = store.chart_data(**store_filters)
+            elif file_keys is not None:
+                filter_key = (str(start_dt), str(end_dt), tuple(selected_sev), alarm_name_filter, text_search)
+                timeline, (counts, counts_label) = cached_chart_data(file_keys, filter_key, df_filtered, start_dt, end_dt)
+            else:
+                timeline, (counts, counts_label) = build_chart_data(df_filtered, start_dt, end_dt)
+            rec["rows"] = len(timeline[1])
+
+        st.subheader("Alarm timeline")
+        try:
+            mode, data, bucket_label = timeline
+            with profiling.stage("timeline chart") as rec:
+                if mode == "bins":
+                    st.caption(f"{n_matching} events binned per {bucket_label}; narrow the date range to see single events.")
+                    chart = plot_timeline_altair(None, binned=data, bucket_label=bucket_label)
+                else:
+                    chart = plot_timeline_altair(data)
+                rec["rows"] = len(data)
+            st.altair_chart(chart, use_container_width=True)
+        except Exception as e:
+            st.error(f"Failed to render timeline: {e}")
+
+        st.subheader("Alarm counts")
+        try:
+            with profiling.stage("counts chart") as rec:
+                fig_counts = plot_alarm_counts(None, counts=counts, bucket_label=counts_label)
+                rec["rows"] = len(counts)
+            # plotly or altair returned
+            if hasattr(fig_counts, "to_html") or hasattr(fig_counts, "data"):
+                st.plotly_chart(fig_counts, use_container_width=True)
+            else:
+                st.altair_chart(fig_counts, use_container_width=True)
+        except Exception as e:
+            st.error(f"Failed to render counts: {e}")
+    else:
+        st.info("No charts to show for current filters.")
+
+    # Rate anomalies: buckets whose event count jumps above the group's EWMA baseline (see utils/anomaly.py)
+    st.markdown("### Rate anomalies")
+    if st.checkbox("Detect bursts in event rates", value=False):
+        c1, c2, c3 = st.columns(3)
+        rate_by = c1.selectbox("Group by", options=["Alarm Name", "Component", "Device Name"])
+        rate_freqs = c2.multiselect("Windows", options=list(RATE_WINDOWS), default=list(RATE_WINDOWS),
+                                    format_func=RATE_WINDOWS.get)
+        rate_threshold = c3.number_input("Threshold (robust z-score)", min_value=1.0, value=5.0, step=0.5)
+
+        @st.cache_data(max_entries=8)
+        def cached_rate_anomalies(file_keys, filter_key, params, _df):
+            return detect_rate_anomalies(_df, freqs=params[0], by=params[1], threshold=params[2])
+
+        with profiling.stage("rate anomalies") as rec:
+            if follow:
+                # new events only: one monitor per window keeps its baseline across reruns
+                monitors = st.session_state.setdefault("rate_monitors", {})
+                found = []
+                for freq in rate_freqs:
+                    state = monitors.get((freq, rate_by, rate_threshold))
+                    if state is None:
+                        state = monitors[(freq, rate_by, rate_threshold)] = {
+                            "monitor": RateMonitor(freq, by=rate_by, threshold=rate_threshold), "fed": {}, "found": []}
+                    new = []
+                    for fname in paths:
+                        file_events = events_df[events_df["source_file"] == fname]
+                        new.append(file_events.iloc[state["fed"].get(fname, 0):])
+                        state["fed"][fname] = len(file_events)
+                    closed = state["monitor"].update(pd.concat(new).sort_values("Raise Date", kind="mergesort"))
+                    if not closed.empty:
+                        state["found"].append(closed)
+                    found += state["found"] + [state["monitor"].pending().assign(Open=True)]
+                found = [f for f in found if not f.empty]
+                anomalies = pd.concat(found, ignore_index=True) if found else pd.DataFrame()
+            elif use_store:
+                found = [detect_from_counts(store.bin_events(freq, by=(rate_by,), **store_filters), freq, rate_by,
+                                            threshold=rate_threshold) for freq in rate_freqs]
+                found = [f for f in found if not f.empty]
+                anomalies = pd.concat(found, ignore_index=True) if found else pd.DataFrame()
+            else:
+                rate_params = (tuple(rate_freqs), rate_by, rate_threshold)
+                if file_keys is not None:
+                    filter_key = (str(start_dt), str(end_dt), tuple(selected_sev), alarm_name_filter, text_search)
+                    anomalies = cached_rate_anomalies(file_keys, filter_key, rate_params, df_filtered)
+                else:
+                    anomalies = detect_rate_anomalies(df_filtered, freqs=rate_freqs, by=rate_by, threshold=rate_threshold)
+            rec["rows"] = len(anomalies)
+        if anomalies.empty:
+            st.info("No rate anomalies for these settings.")
+        else:
+            if follow:
+                st.caption("Follow mode: all events of the followed files; rows marked Open are buckets still filling up.")
+            st.dataframe(anomalies.sort_values("Score", ascending=False, ignore_index=True), height=300)
+
+    # Cross-file correlation: cause -> effect alarm pairs within a time window, over the filtered events
+    st.markdown("### Cross-file correlation")
+    if st.checkbox("Find cause → effect pairs across the selected files", value=False):
+        c1, c2, c3, c4 = st.columns(4)
+        corr_window = c1.number_input("Window (seconds)", min_value=1, value=60, step=10)
+        corr_min = c2.number_input("Minimum count", min_value=1, value=3)
+        corr_cross = c3.checkbox("Only pairs across files", value=True)
+        corr_no_info = c4.checkbox("Ignore Info events", value=True)
+        corr_sev = [s for s in (selected_sev or severities) if not (corr_no_info and s == "Info")]
+
+        def correlation_streams():
+            if use_store:
+                return {fname: store.iter_query(**{**store_filters, "files": [fname]}) for fname in paths}
+            return {fname: df_filtered[df_filtered["source_file"] == fname] for fname in paths}
+
+        @st.cache_data(max_entries=8)
+        def cached_correlation(file_keys, filter_key, params, _streams):
+            return correlate_events(_streams, window_seconds=params[0], min_count=params[1], severities=list(params[3]),
+                                    cross_file_only=params[2])
+
+        corr_params = (corr_window, corr_min, corr_cross, tuple(corr_sev))
+        with profiling.stage("correlation") as rec:
+            if file_keys is not None:
+                filter_key = (str(start_dt), str(end_dt), tuple(selected_sev), alarm_name_filter, text_search, use_store)
+                correlations = cached_correlation(file_keys, filter_key, corr_params, correlation_streams())
+            else:
+                correlations = correlate_events(correlation_streams(), window_seconds=corr_window, min_count=corr_min,
+                                                severities=corr_sev, cross_file_only=corr_cross)
+            rec["rows"] = len(correlations)
+        if correlations.empty:
+            st.info("No correlated alarm pairs for these settings.")
         else:
-            st.altair_chart(fig_counts, use_container_width=True)
-    except Exception as e:
-        st.error(f"Failed to render counts: {e}")
-else:
-    st.info("No charts to show for current filters.")
-
-# Root cause diagrams per-file
-st.markdown("### Root cause / Flow diagrams (per-file)")
-chosen = st.multiselect("Choose file(s) to generate diagram for", options=selected_files)
-for fname in chosen:
-    # gather events for that file
-    ev_for_file = [e for e in events if e.get("source_file") == fname]
-    if not ev_for_file:
-        st.write(f"No notable events in `{fname}` to create diagram.")
-        continue
-    img = draw_root_cause_diagram_pil(ev_for_file, title=fname)
-    st.image(img, caption=f"Root cause diagram — {fname}")
-
-st.write("App built for the log formats seen in this session. Parser and visual heuristics can be extended if you have other formats.")
+            st.dataframe(correlations, height=300)
+
+    # Log templates: the per-file miners of the ingestion pass, merged in file order
+    if mine is not None:
+        st.markdown("### Log templates (lines without a specific event rule)")
+        with profiling.stage("templates") as rec:
+            miner = TemplateMiner(**mine)
+            for fname in paths:
+                if fname in file_templates:
+                    miner.merge_frame(*file_templates[fname])
+            templates, template_stats = miner.to_frame(), miner.stats
+            rec["rows"] = template_stats["lines"]
+        st.caption(f"{template_stats['lines']} lines in {len(templates)} templates"
+                   + (f" ({template_stats['evicted']} rare templates dropped)" if template_stats["evicted"] else ""))
+        st.dataframe(templates, height=300)
+
+    # Root cause diagrams per-file
+    st.markdown("### Root cause / Flow diagrams (per-file)")
+    chosen = st.multiselect("Choose file(s) to generate diagram for", options=selected_files)
+    for fname in chosen:
+        # gather events for that file
+        file_df = store.query(files=[fname]) if use_store else events_df[events_df["source_file"] == fname]
+        if file_df.empty:
+            st.write(f"No notable events in `{fname}` to create diagram.")
+            continue
+        boxes = collapse_runs(file_df)
+        n_pages = diagram_page_count(boxes)
+        page = 1
+        if n_pages > 1:
+            page = st.number_input(f"Page of {n_pages} — {fname}", min_value=1, max_value=n_pages, value=1, key=f"diagram_page_{fname}")
+        with profiling.stage("diagram", fname) as rec:
+            png = render_root_cause_page(boxes, page - 1, title=fname)
+            rec["rows"] = len(boxes)
+        st.image(png, caption=f"Root cause diagram — {fname} ({len(file_df)} events in {len(boxes)} boxes)")
+
+    st.write("App built for the log formats seen in this session. Parser and visual heuristics can be extended if you have other formats.")
+finally:
+    # also when a rerun or a closed session stops the script early
+    profiling.deactivate()
+
+# Performance panel for this run; numbers are gathered by utils.profiling while the script runs
+if profiler is not None:
+    st.markdown("### Performance")
+    stage_totals = pd.DataFrame(profiler.stage_totals(), columns=["stage", "file", "calls", "seconds", "rows", "peak_mb"])
+    st.caption(f"Imports took {import_seconds:.2f} s this run, {cold_imports:.2f} s on the first run of this server "
+               "process. Parse stages only appear for files that missed the parse cache; worker stages overlap in time.")
+    if not trace_memory:
+        stage_totals = stage_totals.drop(columns="peak_mb")
+    st.dataframe(stage_totals, height=300)
+    if profiler.rules:
+        st.markdown("Event rules (hits and cumulative match time)")
+        st.dataframe(pd.DataFrame(profiler.as_dict()["rules"]), height=250)
+    if export_profiles := st.session_state.get("export_profiles"):
+        st.caption("Last export: " + ", ".join(f"{r['file']} {r['seconds']:.2f} s, {r['rows']} rows" for r in export_profiles))
+        profiler.stages.extend(export_profiles)
+    st.download_button("Download profile (JSON)", data=profiler.to_json(), file_name="profile.json",
+                       mime="application/json")
 
+# Follow mode auto-refresh: rerun the script after the page has been rendered
+if follow and refresh_secs:
+    time.sleep(refresh_secs)
+    st.rerun()
@@ -0,0 +1,55 @@
+# benchmarks/bench_event_rules.py
+# Lines/sec of event classification on the bundled logs/ files:
+# the old per-rule regex cascade vs the literal-prefiltered rule table.
+#
+#   python benchmarks/bench_event_rules.py [logs_dir]
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.parser import EVENT_RULES, match_event_rule, parse_log_file
+
+
+def cascade_match(msg):
+    # behaviour of the original if/continue chain: every rule searched in turn
+    for rule in EVENT_RULES:
+        m = rule["pattern"].search(msg)
+        if m and (rule.get("guard") is None or rule["guard"](msg)):
+            return rule, m
+    return None, None
+
+
+def bench(fn, messages, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for msg in messages:
+            fn(msg)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    logs_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "logs"
+    print(f"{'file':40s} {'lines':>8s} {'before l/s':>12s} {'after l/s':>12s} {'speedup':>8s}")
+    all_msgs = []
+    for path in sorted(p for p in logs_dir.iterdir() if p.is_file()):
+        entries = parse_log_file(path.read_text(errors="ignore").splitlines())
+        msgs = [(e.get("Message") or "")[:2000] for e in entries]
+        for msg in msgs:
+            before, after = cascade_match(msg), match_event_rule(msg)
+            assert before[0] is after[0], f"rule mismatch in {path.name}: {msg!r}"
+        all_msgs.extend(msgs)
+        t_before, t_after = bench(cascade_match, msgs), bench(match_event_rule, msgs)
+        print(f"{path.name:40s} {len(msgs):8d} {len(msgs) / t_before:12.0f} {len(msgs) / t_after:12.0f} "
+              f"{t_before / t_after:7.1f}x")
+    t_before, t_after = bench(cascade_match, all_msgs), bench(match_event_rule, all_msgs)
+    print(f"{'TOTAL':40s} {len(all_msgs):8d} {len(all_msgs) / t_before:12.0f} {len(all_msgs) / t_after:12.0f} "
+          f"{t_before / t_after:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
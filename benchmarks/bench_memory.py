@@ -0,0 +1,67 @@
+# benchmarks/bench_memory.py
+# Peak RSS of the app's ingestion path (parse_files_parallel, events only) on synthetic files
+# of growing size (benchmarks/synth_logs.py), each parsed in a fresh interpreter. Memory must
+# stay bounded: with --check the run fails when the peak on the largest file exceeds the peak
+# on the smallest by more than --max-growth of the size difference (the events themselves are
+# kept, so some growth is expected). Sizes should be above one batch (200,000 lines, ~20 MB).
+#
+#   python benchmarks/bench_memory.py --sizes 64,256 --check
+#   python benchmarks/bench_memory.py --sizes 64,1024 --formats tsmc
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from synth_logs import EXTENSIONS, SYNTH_FORMATS, write_log
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = """
+import json, resource, sys
+from utils.parallel import parse_files_parallel
+path = sys.argv[1]
+_, events, lines = parse_files_parallel([path])[path]
+peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"peak_mb": peak_kb / 1024, "lines": lines, "events": len(events)}))
+"""
+
+
+def measure(path):
+    out = subprocess.run([sys.executable, "-c", _PROBE, str(path)], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="64,256", help="file sizes in MB, comma-separated")
+    ap.add_argument("--formats", nargs="+", default=list(SYNTH_FORMATS), choices=SYNTH_FORMATS)
+    ap.add_argument("--max-growth", type=float, default=0.2,
+                    help="allowed peak RSS growth as a fraction of the file size growth")
+    ap.add_argument("--check", action="store_true", help="exit 1 when memory grows with the file size")
+    args = ap.parse_args()
+    sizes = sorted(float(s) for s in args.sizes.split(","))
+
+    print(f"{'format':<12s} {'MB':>6s} {'peak RSS MB':>12s} {'lines':>10s} {'events':>8s}")
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            peaks = []
+            for size in sizes:
+                path = Path(tmp) / f"synth_{fmt}{EXTENSIONS[fmt]}"
+                write_log(path, fmt, size)
+                r = measure(path)
+                path.unlink()
+                peaks.append(r["peak_mb"])
+                print(f"{fmt:<12s} {size:6.0f} {r['peak_mb']:12.1f} {r['lines']:10d} {r['events']:8d}")
+            if len(sizes) > 1 and peaks[-1] - peaks[0] > args.max_growth * (sizes[-1] - sizes[0]):
+                failed.append(fmt)
+    if failed:
+        print(f"peak RSS grows with the file size: {', '.join(failed)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/bench_parallel.py
+# Scaling of parse_files_parallel over 1/2/4/8 workers: one large file built from the
+# bundled logs/ (split into byte ranges) plus the bundled files themselves.
+#
+#   python benchmarks/bench_parallel.py --size-mb 128 --chunk-mb 8
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_streaming import LOGS_DIR, build_big_file
+from utils.parallel import parse_files_parallel
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=128)
+    ap.add_argument("--chunk-mb", type=int, default=8)
+    ap.add_argument("--workers", default="1,2,4,8")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        big = os.path.join(tmp, "big.log")
+        build_big_file(big, args.size_mb)
+        paths = [big] + sorted(str(p) for p in LOGS_DIR.iterdir() if p.is_file())
+        total_mb = sum(os.path.getsize(p) for p in paths) / 2**20
+        print(f"{len(paths)} files, {total_mb:.0f} MB, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8s} {'seconds':>9s} {'MB/s':>8s} {'speedup':>8s} {'events':>8s}")
+        base = None
+        for workers in [int(w) for w in args.workers.split(",")]:
+            t0 = time.perf_counter()
+            results = parse_files_parallel(paths, workers=workers, chunk_bytes=args.chunk_mb * 2**20, min_parallel_bytes=0)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            n_events = sum(len(events) for _, events, _ in results.values())
+            print(f"{workers:8d} {elapsed:9.2f} {total_mb / elapsed:8.1f} {base / elapsed:7.2f}x {n_events:8d}")
+
+
+if __name__ == "__main__":
+    main()
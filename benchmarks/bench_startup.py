@@ -0,0 +1,76 @@
+# benchmarks/bench_startup.py
+# Import time of the app's building blocks, each measured in a fresh interpreter: "cold" runs
+# right after the repo's __pycache__ directories are removed (our modules get recompiled),
+# "warm" is the median of the following runs. Also lists the third-party packages each
+# import pulls in; the parser core must stay stdlib-only (--check fails otherwise).
+#
+#   python benchmarks/bench_startup.py --repeat 5
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> code to time; "backends" forces the lazily imported plotting/imaging libraries
+TARGETS = {
+    "parser core": "import utils.parser",
+    "columnar": "import utils.columnar",
+    "ingestion": "import utils.parallel",
+    "cli": "import cli",
+    "visuals": "import utils.visuals",
+    "backends": "import utils.visuals as v; v._altair(); v._plotly_express(); v._pil()",
+}
+STDLIB_ONLY = ("parser core",)
+
+_PROBE = """
+import sys, time, json
+before = set(sys.modules)
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+new = {{m.split(".")[0] for m in set(sys.modules) - before}}
+third_party = sorted(m for m in new if m not in sys.stdlib_module_names and not m.startswith("_") and m not in ("utils", "cli"))
+print(json.dumps({{"seconds": elapsed, "third_party": third_party}}))
+"""
+
+
+def clear_bytecode():
+    for cache in ROOT.rglob("__pycache__"):
+        shutil.rmtree(cache, ignore_errors=True)
+
+
+def measure(code):
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(code=code)], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5, help="warm runs per target")
+    ap.add_argument("--check", action="store_true", help="exit 1 if the parser core imports third-party packages")
+    args = ap.parse_args()
+
+    print(f"{'target':<12s} {'cold ms':>8s} {'warm ms':>8s}  third-party imports")
+    failed = []
+    for name, code in TARGETS.items():
+        clear_bytecode()
+        cold = measure(code)
+        warm = [measure(code) for _ in range(args.repeat)]
+        warm_s = statistics.median(r["seconds"] for r in warm)
+        packages = cold["third_party"]
+        print(f"{name:<12s} {cold['seconds'] * 1000:8.1f} {warm_s * 1000:8.1f}  {', '.join(packages) or '-'}")
+        if name in STDLIB_ONLY and packages:
+            failed.append(name)
+    if failed:
+        print(f"not stdlib-only: {', '.join(failed)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
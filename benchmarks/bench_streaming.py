@@ -0,0 +1,79 @@
+# benchmarks/bench_streaming.py
+# Peak memory and throughput of the eager path (read_text + parse_log_file +
+# extract_alarm_events) vs stream_alarm_events on a large file built by
+# concatenating the bundled logs/ files.
+#
+#   python benchmarks/bench_streaming.py --size-mb 256
+#   python benchmarks/bench_streaming.py --size-mb 2048 --no-eager   # 2 GB, streaming only
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.parser import extract_alarm_events, parse_log_file, stream_alarm_events
+
+LOGS_DIR = Path(__file__).resolve().parent.parent / "logs"
+
+
+def build_big_file(path, size_mb):
+    seed = b"".join(p.read_bytes().rstrip(b"\n") + b"\n" for p in sorted(LOGS_DIR.iterdir()) if p.is_file())
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as fh:
+        written = 0
+        while written < target:
+            fh.write(seed)
+            written += len(seed)
+    return written
+
+
+def eager(path):
+    lines = Path(path).read_text(errors="ignore").splitlines()
+    events = extract_alarm_events(parse_log_file(lines))
+    return len(lines), len(events)
+
+
+def streaming(path):
+    stats = {}
+    n_events = sum(1 for _ in stream_alarm_events(path, stats))
+    return stats["lines"], n_events
+
+
+def measure(fn, path, trace):
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    lines, n_events = fn(path)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] if trace else None
+    if trace:
+        tracemalloc.stop()
+    return lines, n_events, elapsed, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=256)
+    ap.add_argument("--no-eager", action="store_true", help="skip the eager path (it needs several x the file size in RAM)")
+    ap.add_argument("--no-trace", action="store_true", help="skip the tracemalloc pass (throughput only)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.log")
+        size = build_big_file(path, args.size_mb)
+        print(f"file: {size / 2**20:.0f} MB")
+        print(f"{'mode':10s} {'lines':>10s} {'events':>8s} {'MB/s':>8s} {'lines/s':>10s} {'peak MB':>9s}")
+        modes = [("streaming", streaming)] + ([] if args.no_eager else [("eager", eager)])
+        for name, fn in modes:
+            lines, n_events, elapsed, _ = measure(fn, path, trace=False)
+            peak = None if args.no_trace else measure(fn, path, trace=True)[3]
+            peak_s = f"{peak / 2**20:9.1f}" if peak is not None else f"{'-':>9s}"
+            print(f"{name:10s} {lines:10d} {n_events:8d} {size / 2**20 / elapsed:8.1f} {lines / elapsed:10.0f} {peak_s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# benchmarks/bench_suite.py
+# Reproducible timings of the pipeline stages on a synthetic corpus (benchmarks/synth_logs.py,
+# one file per format, fixed seed): parse_log_file, extract_alarm_events and DataFrame
+# construction per file, their columnar counterparts, then filtering and chart/diagram
+# building on all events. Each stage is run --repeat times; median and best times are kept.
+# Results go to a JSON file and are compared to a stored baseline on the best time (the least
+# disturbed by other load on the machine): a stage more than --threshold slower (and slower by more than --min-delta seconds, to ignore noise on the
+# short stages) is a regression, as is any change in its row count; the exit status is 1.
+# A baseline of another PARSER_VERSION is not compared to (the outputs differ by design);
+# the timings are printed and the exit status is 2 until the baseline is recorded again.
+#
+#   python benchmarks/bench_suite.py                          # compare to benchmarks/baseline.json
+#   python benchmarks/bench_suite.py --save-baseline          # record a new baseline
+#   python benchmarks/bench_suite.py --size-mb 64 --out results.json --threshold 0.1
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from synth_logs import SYNTH_FORMATS, write_corpus
+from utils import visuals
+from utils.aggregate import alarm_counts, timeline_data
+from utils.columnar import extract_events_frame, parse_log_frame
+from utils.filters import filter_events
+from utils.parser import PARSER_VERSION, extract_alarm_events, parse_log_file
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# settings that must match for two runs to be comparable
+CONFIG_KEYS = ("size_mb", "alarm_density", "seed")
+
+
+def timed(fn, repeat):
+    """(median seconds, best seconds, last result) of repeat calls of fn; like timeit, the
+    garbage collector is off while fn runs, so earlier stages' garbage doesn't skew it."""
+    runs, result = [], None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            result = fn()
+            runs.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return statistics.median(runs), min(runs), result
+
+
+def events_frame(events, source):
+    # as app.py builds it from the per-file event lists
+    df = pd.DataFrame(events)
+    df["source_file"] = source
+    df["Raise Date"] = pd.to_datetime(df["Raise Date"], errors="coerce")
+    df["Terminated Date"] = pd.to_datetime(df["Terminated Date"], errors="coerce")
+    return df
+
+
+def render_diagram(events_df):
+    visuals._PAGE_CACHE.clear()  # time the drawing, not the page cache
+    boxes = visuals.collapse_runs(events_df)
+    return boxes, visuals.render_root_cause_page(boxes, 0, "bench")
+
+
+def run_suite(corpus, repeat):
+    stages = {}
+
+    def record(name, fn, rows=len, mb=None):
+        seconds, best, result = timed(fn, repeat)
+        stages[name] = {"seconds": seconds, "best": best, "rows": rows(result)}
+        if mb:
+            stages[name]["mb_per_s"] = mb / seconds
+        return result
+
+    frames = []
+    for info in corpus:
+        fmt, path, mb = info["format"], info["path"], info["bytes"] / 2**20
+        lines = record(f"read/{fmt}", lambda: Path(path).read_text(errors="ignore").splitlines(), mb=mb)
+        entries = record(f"parse_log_file/{fmt}", lambda: parse_log_file(lines), mb=mb)
+        events = record(f"extract_alarm_events/{fmt}", lambda: extract_alarm_events(entries))
+        frames.append(record(f"dataframe/{fmt}", lambda: events_frame(events, Path(path).name)))
+        frame = record(f"parse_log_frame/{fmt}", lambda: parse_log_frame(lines, keep_raw=True), mb=mb)
+        record(f"extract_events_frame/{fmt}", lambda: extract_events_frame(frame))
+        if len(events) != info["alarms"]:
+            print(f"warning: {fmt}: {len(events)} events, generator wrote {info['alarms']} alarms", file=sys.stderr)
+        del lines, entries, frame
+
+    events_df = pd.concat(frames, ignore_index=True)
+    start, end = events_df["Raise Date"].quantile([0.25, 0.75])
+    record("filter/date+severity", lambda: filter_events(events_df, start, end, ["Critical", "Warning"]))
+    record("filter/text", lambda: filter_events(events_df, alarm_name="FAIL", text="error|restart"))
+    record("chart/timeline", lambda: visuals.plot_timeline_altair(*_timeline(events_df)).to_dict(),
+           rows=lambda spec: sum(len(v) for v in spec.get("datasets", {}).values()))
+    record("chart/counts", lambda: _counts_chart(events_df).to_dict(), rows=lambda spec: len(spec.get("data", [])))
+    record("diagram/page", lambda: render_diagram(events_df), rows=lambda result: len(result[0]))
+    return stages
+
+
+def _timeline(events_df):
+    kind, data, label = timeline_data(events_df)
+    return (data, None, None) if kind == "points" else (events_df, data, label)
+
+
+def _counts_chart(events_df):
+    counts, label = alarm_counts(events_df)
+    return visuals.plot_alarm_counts(events_df, counts=counts, bucket_label=label)
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Rows of (stage, baseline best s, current best s, ratio, verdict) and whether anything regressed."""
+    rows, failed = [], False
+    for name, cur in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            rows.append((name, None, cur["best"], None, "new"))
+            continue
+        ratio = cur["best"] / base["best"] if base["best"] else float("inf")
+        verdict = "ok"
+        if ratio > 1 + threshold and cur["best"] - base["best"] > min_delta:
+            verdict = "REGRESSION"
+        elif ratio < 1 - threshold and base["best"] - cur["best"] > min_delta:
+            verdict = "faster"
+        if cur["rows"] != base["rows"]:
+            verdict = f"ROWS {base['rows']} -> {cur['rows']}"
+        failed |= verdict not in ("ok", "faster")
+        rows.append((name, base["best"], cur["best"], ratio, verdict))
+    return rows, failed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=float, default=4.0, help="size of each synthetic file")
+    ap.add_argument("--alarm-density", type=float, default=0.01)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--data-dir", help="keep the corpus here (reused when it is already there)")
+    ap.add_argument("--out", help="write the results JSON here")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+    ap.add_argument("--threshold", type=float, default=0.3, help="relative slowdown counted as a regression")
+    ap.add_argument("--min-delta", type=float, default=0.01, help="ignore slowdowns below this many seconds")
+    args = ap.parse_args()
+
+    corpus_config = {"size_mb": args.size_mb, "alarm_density": args.alarm_density, "seed": args.seed}
+    config = {**corpus_config, "repeat": args.repeat}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(args.data_dir or tmp)
+        manifest = data_dir / "corpus.json"
+        if manifest.exists() and json.loads(manifest.read_text())["config"] == corpus_config:
+            corpus = json.loads(manifest.read_text())["files"]
+        else:
+            corpus = write_corpus(data_dir, SYNTH_FORMATS, args.size_mb, args.alarm_density, args.seed)
+            manifest.write_text(json.dumps({"config": corpus_config, "files": corpus}, indent=1))
+        stages = run_suite(corpus, args.repeat)
+
+    results = {
+        "meta": {"parser_version": PARSER_VERSION, "python": platform.python_version(), "pandas": pd.__version__,
+                 "machine": platform.machine(), "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "config": config,
+        "stages": stages,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=1) + "\n")
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=1) + "\n")
+        print(f"baseline written to {args.baseline}")
+    baseline = None if args.save_baseline or not Path(args.baseline).exists() else json.loads(Path(args.baseline).read_text())
+    if baseline is not None and any(baseline["config"].get(k) != config[k] for k in CONFIG_KEYS):
+        print(f"baseline was recorded with {baseline['config']}, not comparable; timings only", file=sys.stderr)
+        baseline = None
+    stale = baseline is not None and baseline["meta"].get("parser_version") != PARSER_VERSION
+    if stale:
+        print(f"baseline was recorded with parser version {baseline['meta'].get('parser_version')}, this is "
+              f"{PARSER_VERSION}: not comparable, record it again with --save-baseline", file=sys.stderr)
+        baseline = None
+
+    if baseline is None:
+        print(f"{'stage':<34s} {'seconds':>9s} {'rows':>9s} {'MB/s':>8s}")
+        for name, s in stages.items():
+            mbps = f"{s['mb_per_s']:8.1f}" if "mb_per_s" in s else f"{'':8s}"
+            print(f"{name:<34s} {s['seconds']:9.4f} {s['rows']:9d} {mbps}")
+        if stale:
+            sys.exit(2)
+        return
+    rows, failed = compare(results, baseline, args.threshold, args.min_delta)
+    print(f"{'stage':<34s} {'baseline':>9s} {'current':>9s} {'ratio':>6s}  verdict")
+    for name, base, cur, ratio, verdict in rows:
+        base_s = f"{base:9.4f}" if base is not None else f"{'-':>9s}"
+        ratio_s = f"{ratio:6.2f}" if ratio is not None else f"{'-':>6s}"
+        print(f"{name:<34s} {base_s} {cur:9.4f} {ratio_s}  {verdict}")
+    if failed:
+        print(f"regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
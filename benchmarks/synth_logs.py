@@ -0,0 +1,206 @@
+# benchmarks/synth_logs.py
+# Synthetic McScript, macompatsvc and TSMC logs of any size, for benchmarks and load tests.
+# Background records are drawn from the bundled logs/ files (grouped by the format
+# utils.formats sniffs for them, minus every line an event rule matches), alarm records
+# from ALARM_TEMPLATES, which hit the utils.parser event rules. alarm_density is the
+# fraction of records that are alarms, so a file yields exactly its "alarms" count of events.
+# Output is a function of (format, size, density, seed, start) only.
+#
+#   python benchmarks/synth_logs.py out/ --size-mb 64 --alarm-density 0.01
+#   python benchmarks/synth_logs.py out/ --size-mb 1024 --formats tsmc --seed 7
+import argparse
+import calendar
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.formats import re_agent_full, re_mcscript_full, re_tsmc_header, sniff_format
+from utils.parser import match_event_rule, parse_log_file
+
+LOGS_DIR = Path(__file__).resolve().parent.parent / "logs"
+SYNTH_FORMATS = ("mcscript", "macompatsvc", "tsmc")
+EXTENSIONS = {"mcscript": ".log", "macompatsvc": ".log", "tsmc": ".txt"}
+
+# format -> [(weight, level, component, message)]; message is formatted with rng-drawn fields
+ALARM_TEMPLATES = {
+    "mcscript": [
+        (3, "I", "ScrptMain", "START [C:\\Program Files\\McAfee\\Agent\\x86\\McScript_InUse.exe -script "
+                              "C:\\ProgramData\\McAfee\\Agent\\update\\InstallMain.McS -id {id} -taskid {n}]"),
+        (2, "I", "ScrptExe", "RunScript C:\\ProgramData\\McAfee\\Agent\\Evaluation\\ENDP_AM_{n}\\Install\\0000\\"
+                             "ThreatPreventionInstall.mcs, ScriptMain"),
+        (3, "I", "crypto", "Key imported successfully and recognized in RSA format"),
+        (2, "I", "MsgBus", "msgbus connectvity status : Connected"),
+        (2, "I", "FileWtch", "Added file watcher for C:\\ProgramData\\McAfee\\Agent\\update\\{id}"),
+        (1, "I", "Installer", "No of products to be installed {small}"),
+        (1, "I", "Installer", "Got Build Version : 10.7.0.{n}"),
+        (1, "I", "Policy", "getting spec file from policy successfully"),
+        (2, "E", "ScrptUtl", "Could not find symbol for dereferencing {symbol}"),
+        (3, "E", "Installer", "Failed to {action}, error {n}"),
+    ],
+    "macompatsvc": [
+        (3, "Info", "MsgBus", "msgbus connectvity status : Connected"),
+        (2, "Info", "FileWatcher", "Added file watcher for C:\\ProgramData\\McAfee\\Agent\\data\\{id}"),
+        (4, "Error", "SAProtocol", "Failed to {action}, error {n}"),
+        (2, "Warning", "lpc_Agent_Info", "Could not {action}, retrying in {small} seconds"),
+    ],
+    "tsmc": [
+        (4, "W", "tALM100", "Alarm {alarm} has been raised."),
+        (4, "I", "tALM100", "Alarm {alarm} has been terminated."),
+        (1, "I", "tSYS100", "TSMC uncontrolled restart."),
+        (1, "I", "tSYS100", "TSMC controlled restart."),
+        (2, "F", "tUPS100", "Software error. System error {syserr} _no description_ after call to UPS-SnmpMgrRequest_{small}"),
+        (2, "W", "tCOM100", "Failed to {action} on channel {small}"),
+    ],
+}
+_ALARM_CODES = ["108F", "1090", "10A2", "2001", "2C4", "3B7", "4001", "50E"]
+_SYMBOLS = ["MainCatalogCookie", "ProductCookie", "SiteListCookie", "RepoKey"]
+_ACTIONS = ["open the repository", "send the property collection", "connect to the server",
+            "read the policy", "acquire the update lock"]
+_SEED_CACHE = {}
+
+
+def _fields(rng):
+    return {
+        "id": rng.randrange(10000, 99999), "n": rng.randrange(1, 5000), "small": rng.randrange(1, 12),
+        "alarm": rng.choice(_ALARM_CODES), "symbol": rng.choice(_SYMBOLS), "action": rng.choice(_ACTIONS),
+        "syserr": rng.choice((0, 0, 40, 87)),
+    }
+
+
+def seed_records(fmt):
+    """Background records of format fmt from the bundled logs that no event rule matches:
+    (level, component, message) for mcscript, (process, component, level, message) for
+    macompatsvc, (header tail, body lines) for tsmc."""
+    if fmt in _SEED_CACHE:
+        return _SEED_CACHE[fmt]
+    records, threads = [], set()
+    for path in sorted(LOGS_DIR.iterdir()):
+        if not path.is_file():
+            continue
+        lines = path.read_text(errors="ignore").splitlines()
+        if sniff_format(lines[:50]) != fmt:
+            continue
+        for entry in parse_log_file(lines, fmt=fmt):
+            if match_event_rule((entry.get("Message") or "")[:2000])[0] is not None:
+                continue
+            raw = entry["Raw"]
+            if fmt == "mcscript":
+                m = re_mcscript_full.match(raw)
+                if m:
+                    records.append((m.group("level"), m.group("comp"), m.group("msg")))
+                    threads.add(m.group("thread"))
+            elif fmt == "macompatsvc":
+                m = re_agent_full.match(raw)
+                if m:
+                    records.append((m.group("proc"), m.group("comp"), m.group("level"), m.group("msg")))
+                    threads.add(m.group("thread"))
+            else:
+                header, *body = raw.split("\n")
+                m = re_tsmc_header.match(header)
+                if m and body:
+                    records.append((header[m.end("time"):], body))
+    _SEED_CACHE[fmt] = {"records": records, "threads": sorted(threads) or ["1000"]}
+    return _SEED_CACHE[fmt]
+
+
+def _stamp(fmt, t):
+    sec = int(t)
+    base = time.gmtime(sec)
+    if fmt == "tsmc":
+        return time.strftime("%Y%m%d/%H:%M:%S", base) + f".{int((t - sec) * 1000) * 1000:06d}"
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", base)
+    return stamp if fmt == "mcscript" else f"{stamp}.{int((t - sec) * 1000):03d}"
+
+
+def iter_records(fmt, alarm_density=0.01, seed=0, start=datetime(2025, 8, 1), rate=5.0):
+    """Endless (text, is_alarm) records of format fmt; text ends with a newline (two lines for
+    tsmc). Records are rate per second on average, alarms a fraction alarm_density of them."""
+    rng = random.Random(f"{fmt}:{seed}")
+    pool = seed_records(fmt)
+    records, threads = pool["records"], pool["threads"]
+    alarms = ALARM_TEMPLATES[fmt]
+    alarm_weights = [w for w, *_ in alarms]
+    t = calendar.timegm(start.timetuple())  # stamps are formatted with gmtime: start is kept as-is
+    pid = rng.randrange(1000, 9999)
+    while True:
+        t += rng.expovariate(rate)
+        stamp = _stamp(fmt, t)
+        thread = rng.choice(threads)
+        is_alarm = rng.random() < alarm_density
+        if is_alarm:
+            _, level, comp, template = rng.choices(alarms, alarm_weights)[0]
+            msg = template.format(**_fields(rng))
+            if fmt == "mcscript":
+                text = f"{stamp}\t{level}\t#{thread}\t{comp}\t{msg}\n"
+            elif fmt == "macompatsvc":
+                text = f"{stamp} macompatsvc({pid}.{thread}) {comp}.{level}: {msg}\n"
+            else:
+                text = (f":)/{stamp}/T//{comp}/{comp}.cpp///{rng.randrange(1, 16)}/L{rng.randrange(100, 2000)}\n"
+                        f"/{level}/{msg}/{rng.randrange(0x40, 0x100):08X}h:(\n")
+        else:
+            rec = rng.choice(records)
+            if fmt == "mcscript":
+                text = f"{stamp}\t{rec[0]}\t#{thread}\t{rec[1]}\t{rec[2]}\n"
+            elif fmt == "macompatsvc":
+                text = f"{stamp} {rec[0]}({pid}.{thread}) {rec[1]}.{rec[2]}: {rec[3]}\n"
+            else:
+                text = f":)/{stamp}{rec[0]}\n" + "\n".join(rec[1]) + "\n"
+        yield text, is_alarm
+
+
+def write_log(path, fmt, size_mb=16.0, alarm_density=0.01, seed=0, start=datetime(2025, 8, 1), rate=5.0):
+    """Write records of fmt to path until it holds size_mb MB; returns a summary dict
+    (format, bytes, records, alarms, seed, alarm_density)."""
+    target = int(size_mb * 2**20)
+    written = n_records = n_alarms = 0
+    buf, buf_bytes = [], 0
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for text, is_alarm in iter_records(fmt, alarm_density, seed, start, rate):
+            buf.append(text)
+            size = len(text.encode("utf-8"))
+            buf_bytes += size
+            written += size
+            n_records += 1
+            n_alarms += is_alarm
+            if buf_bytes >= 1 << 20 or written >= target:
+                fh.write("".join(buf))
+                buf, buf_bytes = [], 0
+                if written >= target:
+                    break
+    return {"format": fmt, "path": str(path), "bytes": written, "records": n_records, "alarms": n_alarms,
+            "seed": seed, "alarm_density": alarm_density}
+
+
+def write_corpus(out_dir, formats=SYNTH_FORMATS, size_mb=16.0, alarm_density=0.01, seed=0):
+    """One file per format in out_dir (synth_<format>.<ext>); returns their summaries."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return [write_log(out_dir / f"synth_{fmt}{EXTENSIONS[fmt]}", fmt, size_mb, alarm_density, seed)
+            for fmt in formats]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("out_dir")
+    ap.add_argument("--formats", nargs="+", default=list(SYNTH_FORMATS), choices=SYNTH_FORMATS)
+    ap.add_argument("--size-mb", type=float, default=16.0, help="size of each file")
+    ap.add_argument("--alarm-density", type=float, default=0.01, help="fraction of records that are alarms")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    summaries = write_corpus(args.out_dir, args.formats, args.size_mb, args.alarm_density, args.seed)
+    elapsed = time.perf_counter() - t0
+    for s in summaries:
+        print(json.dumps(s))
+    total_mb = sum(s["bytes"] for s in summaries) / 2**20
+    print(f"{total_mb:.0f} MB in {elapsed:.1f}s ({total_mb / elapsed:.1f} MB/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
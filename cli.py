@@ -0,0 +1,100 @@
+# cli.py
+# Headless batch analyzer: parse log files / directories / globs, extract events, apply the
+# same filters as the app sidebar and stream the result to JSONL, CSV, Parquet or Excel.
+# Only the parser stack is imported (no streamlit/altair/plotly/PIL), so startup stays fast.
+#
+#   python cli.py logs/ -o events.jsonl
+#   python cli.py "collected/**/*.log" --format parquet -o events.parquet --severity Critical Warning
+import argparse
+import glob
+import os
+import sys
+from pathlib import Path
+
+from utils.export import EXPORT_FORMATS, EventWriter
+from utils.filters import filter_events
+from utils.parallel import parse_files_parallel
+
+OUTPUT_FORMATS = EXPORT_FORMATS
+
+
+def expand_inputs(inputs):
+    """Files named by paths, directories (recursive) and glob patterns, in order, de-duplicated."""
+    seen = {}
+    for item in inputs:
+        if os.path.isdir(item):
+            # hidden directories hold the parse cache and upload blobs (logs/.cache, logs/.store)
+            matches = sorted(str(p) for p in Path(item).rglob("*")
+                             if p.is_file() and not any(part.startswith(".") for part in p.relative_to(item).parts[:-1]))
+        elif glob.has_magic(item):
+            matches = sorted(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        else:
+            matches = [item]
+        for p in matches:
+            seen.setdefault(p, None)
+    return list(seen)
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Extract alarm/error events from TSMC and endpoint logs.")
+    ap.add_argument("inputs", nargs="+", help="log files, directories or glob patterns (.gz/.bz2/.xz/.zip/.tar read in place)")
+    ap.add_argument("-o", "--output", default="-", help="output file ('-' = stdout, jsonl/csv only)")
+    ap.add_argument("-f", "--format", choices=OUTPUT_FORMATS, help="output format (default: from --output suffix, else jsonl)")
+    ap.add_argument("--start", help="keep events raised at/after this date-time")
+    ap.add_argument("--end", help="keep events raised at/before this date-time")
+    ap.add_argument("--severity", nargs="*", default=[], help="keep these severities only")
+    ap.add_argument("--alarm", default="", help="alarm name/code filter (partial, case-insensitive)")
+    ap.add_argument("--text", default="", help="full-text filter on the message (case-insensitive)")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    ap.add_argument("--batch", type=int, default=64, help="files parsed per batch before writing")
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    fmt = args.format or next((f for f in OUTPUT_FORMATS if args.output.endswith("." + f)), "jsonl")
+    if fmt in ("parquet", "xlsx") and args.output == "-":
+        print(f"{fmt} output needs a file name (-o)", file=sys.stderr)
+        return 2
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("no input files", file=sys.stderr)
+        return 1
+
+    writer = EventWriter(args.output, fmt)
+    n_lines = n_events = 0
+    try:
+        for i in range(0, len(files), args.batch):
+            batch = files[i:i + args.batch]
+            try:
+                results = parse_files_parallel(batch, workers=args.workers)
+            except Exception as e:
+                print(f"batch failed ({e}), retrying file by file", file=sys.stderr)
+                results = {}
+                for path in batch:
+                    try:
+                        results.update(parse_files_parallel([path], workers=1))
+                    except Exception as e:
+                        print(f"failed to parse {path}: {e}", file=sys.stderr)
+            for path in batch:
+                if path not in results:
+                    continue
+                _, events, lines = results[path]
+                n_lines += lines
+                events = events.assign(source_file=path)
+                events = filter_events(events, args.start, args.end, args.severity, args.alarm, args.text)
+                n_events += len(events)
+                writer.write(events)
+    finally:
+        writer.close()
+    print(f"{len(files)} files, {n_lines} lines, {n_events} events -> {args.output} ({fmt})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        # stdout closed early (e.g. piped into head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
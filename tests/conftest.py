@@ -0,0 +1,48 @@
+# tests/conftest.py
+# Tests run against the sample logs bundled in logs/.
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def logs_dir():
+    return ROOT / "logs"
+
+
+@pytest.fixture
+def log_lines(logs_dir):
+    """Lines of a bundled log file, read the way the app reads uploads."""
+    def read(name):
+        return (logs_dir / name).read_text(errors="ignore").splitlines()
+    return read
+
+
+@pytest.fixture(scope="session")
+def events_df():
+    """Events of every bundled log, as the app concatenates them (dates parsed)."""
+    from utils.parallel import parse_files_parallel
+    paths = [str(p) for p in sorted((ROOT / "logs").iterdir()) if p.is_file()]
+    frames = [events.assign(source_file=Path(p).name) for p, (_, events, _) in parse_files_parallel(paths, workers=1).items()]
+    df = pd.concat(frames, ignore_index=True)
+    for col in ("Raise Date", "Terminated Date"):
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+@pytest.fixture
+def many_series_events():
+    """Synthetic events over a week: per_alarm (+ i % 5) events of each of n_alarms alarms."""
+    def make(n_alarms=900, per_alarm=20, seed=0):
+        rng = np.random.default_rng(seed)
+        counts = [per_alarm + i % 5 for i in range(n_alarms)]
+        alarms = np.repeat([f"ALARM_{i:03d}" for i in range(n_alarms)], counts)
+        dates = pd.Timestamp("2025-08-01") + pd.to_timedelta(rng.integers(0, 7 * 86400, size=len(alarms)), unit="s")
+        return pd.DataFrame({"Alarm Name": alarms, "Severity": "Warning", "Message": "x", "Raise Date": dates})
+    return make
@@ -0,0 +1,81 @@
+# tests/test_aggregate.py
+import pandas as pd
+import pytest
+
+from utils.aggregate import BUCKET_SIZES, MAX_POINTS, OTHER, bin_events, choose_bucket, rebin, timeline_data
+
+
+@pytest.mark.parametrize("span, target, expected", [
+    ("10s", 200, "1s"),
+    ("30min", 200, "15s"),
+    ("30min", 10, "5min"),
+    ("1D", 200, "15min"),
+    ("1D", 24, "1h"),
+    ("1D", 23, "3h"),
+    ("3650D", 60, "30D"),
+])
+def test_choose_bucket(span, target, expected):
+    start = pd.Timestamp("2025-08-01 10:00:00")
+    freq, label = choose_bucket(start, start + pd.Timedelta(span), target_buckets=target)
+    assert freq == expected
+    assert label == dict(BUCKET_SIZES)[expected]
+
+
+def test_choose_bucket_without_range():
+    assert choose_bucket(None, None) == choose_bucket(pd.NaT, pd.Timestamp("2025-08-01")) == BUCKET_SIZES[-3]
+
+
+@pytest.mark.parametrize("freq", ["1min", "1h", "1D"])
+def test_bin_events_counts_every_event(events_df, freq):
+    binned = bin_events(events_df, freq)
+    expected = {}
+    for _, row in events_df.dropna(subset=["Raise Date"]).iterrows():
+        key = (row["Raise Date"].floor(freq), row["Alarm Name"], row["Severity"])
+        n, first, last = expected.get(key, (0, row["Raise Date"], row["Raise Date"]))
+        expected[key] = (n + 1, min(first, row["Raise Date"]), max(last, row["Raise Date"]))
+    got = {(b, a, s): (n, f, l) for b, a, s, n, f, l in binned.itertuples(index=False)}
+    assert got == expected
+    assert binned["bucket"].is_monotonic_increasing
+
+
+def test_bin_events_leaves_out_missing_keys(events_df):
+    binned = bin_events(events_df, "1h", by=("Component",))
+    assert binned["count"].sum() == events_df.dropna(subset=["Raise Date", "Component"]).shape[0]
+    assert bin_events(events_df.iloc[0:0], "1h").empty
+
+
+@pytest.mark.parametrize("fine, coarse", [("1min", "1h"), ("1h", "1D"), ("15min", "3h")])
+@pytest.mark.parametrize("by", [("Alarm Name", "Severity"), ("Alarm Name",)])
+def test_rebin_matches_binning_coarser(events_df, fine, coarse, by):
+    rebinned = rebin(bin_events(events_df, fine, by=by), coarse, by=by)
+    pd.testing.assert_frame_equal(rebinned, bin_events(events_df, coarse, by=by), check_dtype=False)
+
+
+def test_timeline_folds_rare_series_into_other(many_series_events):
+    events = many_series_events()
+    kind, binned, _ = timeline_data(events)
+    assert kind == "bins"
+    assert len(binned) <= MAX_POINTS
+    assert binned["count"].sum() == len(events)
+    # the most frequent alarms (20 + 4 events) keep their own series, the rarest are folded
+    alarms = set(binned["Alarm Name"])
+    assert OTHER in alarms and "ALARM_004" in alarms and "ALARM_000" not in alarms
+    # at most 11 buckets for each of 454 series: a day (7 buckets) is the finest size that fits
+    assert binned["bucket"].nunique() == 7
+
+
+def test_fold_series_caps_coarsest_bins(many_series_events):
+    # ten years at 30 days per bucket is still too many points for 900 series
+    events = many_series_events()
+    events["Raise Date"] = pd.Timestamp("2015-08-01") + (events["Raise Date"] - pd.Timestamp("2025-08-01")) * 520
+    kind, binned, label = timeline_data(events)
+    assert label == "30 days" and len(bin_events(events, "30D")) > MAX_POINTS
+    assert len(binned) <= MAX_POINTS and binned["count"].sum() == len(events)
+
+
+def test_timeline_keeps_few_series(many_series_events):
+    events = many_series_events(n_alarms=40, per_alarm=200)
+    kind, binned, label = timeline_data(events)
+    assert kind == "bins" and len(binned) <= MAX_POINTS
+    assert label == "3 hours"
+    pd.testing.assert_frame_equal(binned, bin_events(events, "3h"))
@@ -0,0 +1,50 @@
+# tests/test_anomaly.py
+import pandas as pd
+import pytest
+
+from utils.anomaly import RateMonitor, detect_rate_anomalies
+
+KEYS = ["Window", "Key", "Bucket", "Count"]
+
+
+@pytest.fixture(scope="module")
+def burst_df(events_df):
+    """The bundled events plus a storm of 30 restarts within one minute on 2025-08-03."""
+    restarts = events_df[events_df["Alarm Name"] == "UNCONTROLLED_RESTART"]
+    storm = restarts.sample(30, replace=True, random_state=0).assign(
+        **{"Raise Date": pd.Timestamp("2025-08-03 12:00:00") + pd.to_timedelta(range(30), unit="s")})
+    return pd.concat([events_df, storm], ignore_index=True).sort_values("Raise Date", kind="stable", ignore_index=True)
+
+
+def _incremental(df, freq, chunk_rows, by):
+    monitor = RateMonitor(freq, by=by)
+    parts = [monitor.update(df.iloc[i:i + chunk_rows]) for i in range(0, len(df), chunk_rows)]
+    parts.append(monitor.flush())
+    parts = [p for p in parts if not p.empty] or parts[-1:]
+    return pd.concat(parts, ignore_index=True).sort_values(["Bucket", "Key"], ignore_index=True)
+
+
+@pytest.mark.parametrize("freq", ["1min", "5min", "1h"])
+@pytest.mark.parametrize("chunk_rows", [1, 37, 10_000])
+@pytest.mark.parametrize("by", ["Alarm Name", "Component"])
+def test_monitor_matches_batch(burst_df, freq, chunk_rows, by):
+    batch = detect_rate_anomalies(burst_df, freqs=(freq,), by=by)
+    incremental = _incremental(burst_df, freq, chunk_rows, by)
+    assert incremental[KEYS].values.tolist() == batch[KEYS].values.tolist()
+    assert incremental["Score"].tolist() == pytest.approx(batch["Score"].tolist())
+
+
+# the restarts all come from tCTR100, whose other events hide the burst in hourly counts
+@pytest.mark.parametrize("by, key, windows", [
+    ("Alarm Name", "UNCONTROLLED_RESTART", {"1min", "5min", "1h"}),
+    ("Component", "tCTR100", {"1min", "5min"}),
+])
+def test_storm_is_flagged(burst_df, by, key, windows):
+    found = detect_rate_anomalies(burst_df, by=by)
+    storm = found[(found["Key"] == key) & (found["Bucket"] <= "2025-08-03 12:00")]
+    assert set(storm["Window"]) == windows
+    assert (found["Group"] == by).all()
+
+
+def test_bundled_logs_have_no_anomalies(events_df):
+    assert detect_rate_anomalies(events_df).empty
@@ -0,0 +1,113 @@
+# tests/test_correlate.py
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.correlate import CORRELATION_COLUMNS, correlate_events
+
+T0 = pd.Timestamp("2025-08-01 10:00:00")
+
+
+def _events(*items):
+    """events frame from (seconds after T0, alarm[, severity]) tuples."""
+    rows = [(T0 + pd.Timedelta(seconds=s), alarm, sev[0] if sev else "Warning") for s, alarm, *sev in items]
+    return pd.DataFrame(rows, columns=["Raise Date", "Alarm Name", "Severity"])
+
+
+def _brute_force(streams, window_seconds, min_count=2, severities=None, cross_file_only=False):
+    """All-pairs reference: each event is an effect of every other key whose latest earlier
+    event (in time order, ties in stream order) lies at most window_seconds before it."""
+    events = []
+    for name, df in streams.items():
+        df = df.sort_values("Raise Date", kind="mergesort").dropna(subset=["Raise Date"])
+        if severities is not None:
+            df = df[df["Severity"].isin(severities)]
+        events += [(t.value // 1000, (name, alarm)) for t, alarm in zip(df["Raise Date"], df["Alarm Name"])]
+    events.sort(key=lambda e: e[0])
+    window = int(window_seconds * 1_000_000)
+    occurrences, lags = {}, {}
+    for j, (t, effect) in enumerate(events):
+        occurrences[effect] = occurrences.get(effect, 0) + 1
+        latest = {}
+        for s, cause in events[:j]:
+            if t - s <= window:
+                latest[cause] = s
+        for cause, s in latest.items():
+            if cause != effect and not (cross_file_only and cause[0] == effect[0]):
+                lags.setdefault((cause, effect), []).append(t - s)
+    out = {}
+    for (cause, effect), found in lags.items():
+        if len(found) >= min_count:
+            mean = sum(found) / len(found)
+            std = math.sqrt(sum((x - mean) ** 2 for x in found) / len(found))
+            out[cause + effect] = [len(found), len(found) / occurrences[effect],
+                                   mean / 1e6, min(found) / 1e6, max(found) / 1e6, std / 1e6]
+    return out
+
+
+def _as_dict(result):
+    keys = CORRELATION_COLUMNS[:4]
+    return {tuple(row[keys]): row[CORRELATION_COLUMNS[4:]].tolist() for _, row in result.iterrows()}
+
+
+def _assert_same(result, expected):
+    got = _as_dict(result)
+    assert got.keys() == expected.keys()
+    for key, values in expected.items():
+        assert got[key][0] == values[0]
+        assert got[key][1:] == pytest.approx(values[1:], abs=1e-6)
+
+
+@pytest.fixture(scope="module")
+def random_streams():
+    # whole seconds over a short span: plenty of ties and of lags exactly at the window
+    rng = np.random.default_rng(7)
+    streams = {}
+    for name in ("a.log", "b.log", "c.log"):
+        seconds = rng.integers(0, 300, size=60)
+        alarms = rng.choice(["X", "Y", "Z"], size=60)
+        severities = rng.choice(["Critical", "Warning"], size=60)
+        streams[name] = _events(*zip(seconds.tolist(), alarms.tolist(), severities.tolist()))
+    return streams
+
+
+@pytest.mark.parametrize("params", [
+    {"window_seconds": 10},
+    {"window_seconds": 10, "min_count": 1},
+    {"window_seconds": 2.5, "min_count": 1, "cross_file_only": True},
+    {"window_seconds": 30, "severities": ["Critical"]},
+])
+def test_matches_all_pairs(random_streams, params):
+    _assert_same(correlate_events(random_streams, **params), _brute_force(random_streams, **params))
+
+
+def test_chunked_streams_match_frames(random_streams):
+    # EventStore.iter_query hands over each file as sorted chunks
+    chunked = {}
+    for name, df in random_streams.items():
+        df = df.sort_values("Raise Date", kind="mergesort")
+        chunked[name] = [df.iloc[i:i + 16] for i in range(0, len(df), 16)]
+    expected = correlate_events(random_streams, window_seconds=10, min_count=1)
+    assert _as_dict(correlate_events(chunked, window_seconds=10, min_count=1)) == _as_dict(expected)
+
+
+def test_window_boundary():
+    streams = {"a.log": _events((0, "X"), (100, "X")), "b.log": _events((60, "Y"), (160.000001, "Y"))}
+    result = _as_dict(correlate_events(streams, window_seconds=60, min_count=1))
+    # a lag of exactly the window counts, one microsecond more does not
+    assert result == {("a.log", "X", "b.log", "Y"): [1, 0.5, 60.0, 60.0, 60.0, 0.0],
+                      ("b.log", "Y", "a.log", "X"): [1, 0.5, 40.0, 40.0, 40.0, 0.0]}
+    _assert_same(correlate_events(streams, window_seconds=60, min_count=1),
+                 _brute_force(streams, window_seconds=60, min_count=1))
+
+
+def test_same_timestamp():
+    # ties go to the earlier stream, so X precedes Y with a lag of 0 but not the other way
+    # round; the second X of a.log only refreshes the latest X
+    streams = {"a.log": _events((5, "X"), (5, "X")), "b.log": _events((5, "Y"), (8, "Y"))}
+    result = _as_dict(correlate_events(streams, window_seconds=10, min_count=1))
+    assert result == {("a.log", "X", "b.log", "Y"): [2, 1.0, 1.5, 0.0, 3.0, 1.5]}
+    _assert_same(correlate_events(streams, window_seconds=10, min_count=1),
+                 _brute_force(streams, window_seconds=10, min_count=1))
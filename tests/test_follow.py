@@ -0,0 +1,97 @@
+# tests/test_follow.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.columnar import EVENT_COLUMNS, extract_events_frame, parse_log_frame
+from utils.follow import FileFollower
+
+HEADER = ":)/20250731/22:40:11.103000/T//tCTR100/tCTR100.cpp///9/L844\n"
+BODY = "/W/Alarm 108F has been raised./00000071h:(\n"
+
+
+def _expected(data: bytes):
+    lines = data.decode("utf-8", errors="ignore").splitlines()
+    return extract_events_frame(parse_log_frame(lines))
+
+
+def _same(got, expected):
+    assert len(got) == len(expected)
+    for col in EVENT_COLUMNS:
+        assert got[col].astype(object).where(got[col].notna(), None).tolist() == \
+            expected[col].astype(object).where(expected[col].notna(), None).tolist(), col
+
+
+def _append(path, data):
+    with open(path, "ab") as fh:
+        fh.write(data)
+
+
+@pytest.mark.parametrize("name", ["TSMC_TP01_LOGS1.txt", "McScript_deploy.log", "macompatsvc_SN18021026TSMC.log"])
+def test_appends_mid_line_match_full_parse(logs_dir, tmp_path, name):
+    data = (logs_dir / name).read_bytes()
+    path = tmp_path / name
+    path.write_bytes(data[:8192])
+    follower = FileFollower(str(path))
+    follower.poll()
+    # the rest in random pieces, most of them cut in the middle of a line, with idle polls in between
+    rng = np.random.default_rng(0)
+    cuts = np.sort(rng.choice(np.arange(8193, len(data)), size=40, replace=False)).tolist()
+    for start, end in zip([8192] + cuts, cuts + [len(data)]):
+        _append(path, data[start:end])
+        follower.poll()
+        follower.poll()
+    follower.flush()
+    _same(follower.events, _expected(data))
+    assert follower.lines == len(data.decode("utf-8", errors="ignore").splitlines())
+
+
+def test_tsmc_record_split_across_polls(tmp_path):
+    path = tmp_path / "tsmc.txt"
+    path.write_text(HEADER)
+    follower = FileFollower(str(path), fmt="tsmc")
+    assert follower.poll().empty
+    assert follower.poll().empty  # idle: the header waits for its body
+    _append(path, BODY[:20].encode())
+    assert follower.poll().empty
+    _append(path, BODY[20:].encode())
+    events = follower.poll()
+    _same(events, _expected((HEADER + BODY).encode()))
+    assert events["Raise Date"].tolist() == [pd.Timestamp("2025-07-31 22:40:11.103")]
+    assert events["Component"].tolist() == ["tCTR100"]
+    assert follower.poll().empty and follower.flush().empty
+
+
+def test_truncation_restarts(logs_dir, tmp_path):
+    data = (logs_dir / "TSMC_TP01_LOGS1.txt").read_bytes()
+    path = tmp_path / "tsmc.txt"
+    path.write_bytes(data)
+    follower = FileFollower(str(path))
+    before = len(follower.poll())
+    # truncated, then refilled with fewer bytes than were consumed
+    path.write_bytes(data[:4096])
+    _same(follower.poll(), _expected(data[:data.rfind(b"\n:)/", 0, 4096) + 1]))
+    assert follower.rotations == 1
+    # truncated, then refilled past the old offset: the leading bytes differ
+    refill = (HEADER + BODY) * (len(data) // len(HEADER + BODY) + 1)
+    path.write_text(refill)
+    assert len(follower.poll()) == refill.count("Alarm 108F")
+    assert follower.rotations == 2
+    assert len(follower.events) > before
+
+
+def test_rename_rotation_flushes_old_record(tmp_path):
+    path = tmp_path / "tsmc.txt"
+    # the old file ends with a record without trailer, and a last line without newline
+    path.write_text(HEADER + "/W/Alarm 108F has been raised.\n" + "in the cabinet")
+    follower = FileFollower(str(path), fmt="tsmc")
+    assert follower.poll().empty
+    os.rename(path, tmp_path / "tsmc.txt.1")
+    path.write_text(HEADER.replace("22:40:11", "22:41:00") + BODY)
+    events = follower.poll()
+    assert follower.rotations == 1
+    assert events["Raise Date"].tolist() == [pd.Timestamp("2025-07-31 22:40:11.103"),
+                                             pd.Timestamp("2025-07-31 22:41:00.103")]
+    assert events["Message"].iloc[0].startswith("Alarm 108F has been raised.")
@@ -0,0 +1,52 @@
+# tests/test_formats.py
+import pytest
+
+from utils.columnar import parse_log_frame
+from utils.formats import sniff_format
+from utils.parser import parse_log_file
+
+SNIFFED = {
+    "McScript_deploy.log": "mcscript",
+    "McScript_error.log": "mcscript",
+    "TSMC_TP01_LOGS1.txt": "tsmc",
+    "TSMC_TP01_LOGS6.txt": "tsmc",
+    "macompatsvc_SN18021026TSMC.log": "macompatsvc",
+    "ma_updater.log": "macompatsvc",
+    "mfemactl_c.log": "mfemactl",
+}
+
+
+@pytest.mark.parametrize("name, fmt", SNIFFED.items())
+def test_sniff_bundled_logs(log_lines, name, fmt):
+    assert sniff_format(log_lines(name)[:50]) == fmt
+
+
+def test_sniff_empty_sample_is_generic():
+    assert sniff_format(["", "   "]) == "generic"
+
+
+def test_tsmc_header_and_body_become_one_entry(log_lines):
+    lines = log_lines("TSMC_TP01_LOGS1.txt")
+    entries = parse_log_file(lines)
+    assert len(entries) == len(lines) // 2
+    first = entries[0]
+    assert first["Component"] == "tDEL100"
+    assert first["Level"] == "I"
+    assert first["Message"] == "Started to check for DPL entries to delete."
+    assert first["Raw"] == "\n".join(lines[:2])
+
+
+def test_agent_levels_are_abbreviated(log_lines):
+    entry = parse_log_file(log_lines("macompatsvc_SN18021026TSMC.log")[:1])[0]
+    assert (entry["Level"], entry["Component"], entry["ThreadID"]) == ("D", "SAProtocol", "4612")
+
+
+@pytest.mark.parametrize("name", ["McScript_deploy_error.log", "TSMC_TP01_LOGS4.txt", "ma_updater.log", "mfemactl_c.log"])
+def test_columnar_parse_matches_row_parse(log_lines, name):
+    lines = log_lines(name)
+    rows = parse_log_file(lines)
+    frame = parse_log_frame(lines, keep_raw=True)
+    assert len(frame) == len(rows)
+    for col in ("Level", "Component", "Message", "Raw"):
+        assert frame[col].tolist() == [r[col] for r in rows]
+    assert frame["Timestamp"].tolist() == [r["Timestamp"] for r in rows]
@@ -0,0 +1,52 @@
+# tests/test_intervals.py
+import pandas as pd
+import pytest
+
+from utils.intervals import interval_summary, pair_alarm_intervals
+from utils.parser import extract_alarm_events, parse_log_file
+
+
+@pytest.fixture
+def tsmc_events(log_lines):
+    frames = [pd.DataFrame(extract_alarm_events(parse_log_file(log_lines(name)))).assign(source_file=name)
+              for name in ("TSMC_TP01_LOGS1.txt", "TSMC_TP01_LOGS4.txt", "TSMC_TP01_LOGS8.txt")]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_every_raise_pairs_with_its_terminate(tsmc_events):
+    intervals = pair_alarm_intervals(tsmc_events)
+    raised = tsmc_events[tsmc_events["Status"] == "Raised"]
+    assert intervals["Raises"].sum() == len(raised)
+    assert (intervals["State"] == "Closed").all()
+    assert (intervals["Terminated Date"] >= intervals["Raise Date"]).all()
+    assert intervals["Raise Date"].is_monotonic_increasing
+    # pairs never cross files or alarms
+    first = intervals.iloc[0]
+    assert first["Alarm Name"] in first["Message"]
+
+
+def test_repeated_raise_folds_and_missing_terminate_stays_open(tsmc_events):
+    one = tsmc_events[tsmc_events["Alarm Name"] == "108F"].head(4)  # raise, terminate, raise, terminate
+    assert one["Status"].tolist() == ["Raised", "Terminated", "Raised", "Terminated"]
+    # raise the second interval twice and drop its terminate
+    again = one.iloc[[2]].assign(**{"Raise Date": one["Raise Date"].iloc[2] + pd.Timedelta("1ms")})
+    intervals = pair_alarm_intervals(pd.concat([one.iloc[:3], again]))
+    assert intervals["Raises"].tolist() == [1, 2]
+    assert intervals["State"].tolist() == ["Closed", "Open"]
+    assert pd.isna(intervals["Terminated Date"].iloc[1])
+
+
+def test_terminate_without_raise_is_dropped(tsmc_events):
+    one = tsmc_events[tsmc_events["Alarm Name"] == "108F"].head(4)
+    intervals = pair_alarm_intervals(one.iloc[1:])
+    assert len(intervals) == 1
+    assert intervals["Raise Date"].iloc[0] == one["Raise Date"].iloc[2]
+
+
+def test_object_dates_are_coerced(tsmc_events):
+    typed = pair_alarm_intervals(tsmc_events)
+    loose = pair_alarm_intervals(tsmc_events.astype({"Raise Date": object}))
+    pd.testing.assert_frame_equal(loose, typed)
+    summary = interval_summary(loose)
+    assert summary["closed"] == len(typed)
+    assert summary["max_duration"] >= summary["median_duration"]
@@ -0,0 +1,46 @@
+# tests/test_parallel.py
+import pytest
+
+from utils.parallel import parse_files_parallel, split_ranges
+from utils.parser import extract_alarm_events, iter_file_lines, parse_log_file
+
+FILES = ["TSMC_TP01_LOGS1.txt", "McScript_deploy.log", "macompatsvc_SN18021026TSMC.log"]
+
+
+def _serial(path):
+    return extract_alarm_events(parse_log_file(path.read_text(errors="ignore").splitlines()))
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_ranges_cover_file_and_start_on_records(logs_dir, name):
+    path = logs_dir / name
+    fmt = "tsmc" if name.startswith("TSMC") else None
+    ranges = split_ranges(path, 4096, fmt)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    data = path.read_bytes()
+    for start, _ in ranges:
+        assert start == 0 or data[start - 1:start] == b"\n"
+        if fmt == "tsmc":
+            assert data[start:start + 3] == b":)/"
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_split_parse_matches_serial_parse(logs_dir, name):
+    path = logs_dir / name
+    _, events, n_lines = parse_files_parallel([str(path)], workers=1, chunk_bytes=128 * 1024)[str(path)]
+    serial = _serial(path)
+    assert n_lines == sum(1 for _ in iter_file_lines(path))
+    assert events["Alarm Name"].tolist() == [e["Alarm Name"] for e in serial]
+    assert events["Message"].tolist() == [e["Message"] for e in serial]
+    assert events["Raise Date"].tolist() == [e["Raise Date"] for e in serial]
+
+
+def test_process_pool_matches_in_process(logs_dir):
+    paths = [str(logs_dir / name) for name in FILES]
+    pooled = parse_files_parallel(paths, workers=2, chunk_bytes=256 * 1024, min_parallel_bytes=0)
+    local = parse_files_parallel(paths, workers=1)
+    for path in paths:
+        assert pooled[path][2] == local[path][2]
+        assert pooled[path][1]["Alarm Name"].tolist() == local[path][1]["Alarm Name"].tolist()
@@ -0,0 +1,75 @@
+# tests/test_store.py
+import pandas as pd
+import pytest
+
+from utils.aggregate import MAX_POINTS, bin_events, timeline_data
+from utils.filters import filter_events
+from utils.store import EventStore
+
+FILTERS = [
+    {},
+    {"severities": ["Critical", "Warning"]},
+    {"alarm_name": "restart"},
+    {"text": "error|fail"},
+    {"start": "2025-08-01", "end": "2025-08-05 12:00"},
+    {"start": "2025-08-02", "severities": ["Unknown"], "alarm_name": "108"},
+]
+
+
+@pytest.fixture(scope="module")
+def store(events_df, tmp_path_factory):
+    store = EventStore(tmp_path_factory.mktemp("store") / "events.db")
+    for name, group in events_df.groupby("source_file", sort=False):
+        store.insert_events(name, "key", group.drop(columns="source_file"))
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pushdown_matches_filter_events(events_df, store, filters):
+    expected = filter_events(events_df, **filters).sort_values("Raise Date", kind="stable", na_position="last")
+    got = store.query(**filters)
+    assert store.count(**filters) == len(expected) == len(got)
+    for col in ("source_file", "Alarm Name", "Severity", "Message"):
+        assert got[col].tolist() == expected[col].tolist()
+    assert got["Raise Date"].tolist() == expected["Raise Date"].tolist()
+
+
+def test_pages_concatenate_to_query(store):
+    full = store.query(severities=["Warning", "Info"])
+    pages = [store.query(limit=50, offset=offset, severities=["Warning", "Info"]) for offset in range(0, len(full), 50)]
+    assert pd.concat(pages, ignore_index=True)["Message"].tolist() == full["Message"].tolist()
+
+
+@pytest.mark.parametrize("by", [("Alarm Name", "Severity"), ("Component",)])
+def test_bins_match_bin_events(events_df, store, by):
+    expected = bin_events(events_df, "1h", by=by)
+    got = store.bin_events("1h", by=by).dropna(subset=list(by)).reset_index(drop=True)
+    assert got[["bucket", *by, "count"]].values.tolist() == expected[["bucket", *by, "count"]].values.tolist()
+    assert got["first"].tolist() == expected["first"].tolist()
+
+
+@pytest.mark.parametrize("text", ["übertragung", "ÉCHEC", "straße", "100%", "a_b", "ΣΦΆΛΜΑ"])
+def test_text_filters_ignore_case_beyond_ascii(tmp_path, text):
+    messages = ["Übertragung fehlgeschlagen", "échec de la mise à jour", "STRASSE Straße", "disk 100% full",
+                "a_b ok", "aXb", "σφάλμα δικτύου", "ΣΦΆΛΜΑ"]
+    events = pd.DataFrame({"Alarm Name": "X", "Severity": "Warning", "Message": messages,
+                           "Raise Date": pd.date_range("2025-08-01", periods=len(messages), freq="min")})
+    store = EventStore(tmp_path / "events.db")
+    store.insert_events("a.log", "key", events)
+    got = store.query(text=text)["Message"].tolist()
+    store.close()
+    assert got == filter_events(events, text=text)["Message"].tolist()
+    assert got
+
+
+def test_chart_data_caps_the_timeline(tmp_path, many_series_events):
+    events = many_series_events()
+    store = EventStore(tmp_path / "events.db")
+    store.insert_events("a.log", "key", events)
+    (kind, binned, label), _ = store.chart_data()
+    store.close()
+    assert kind == "bins" and len(binned) <= MAX_POINTS
+    expected = timeline_data(events)
+    assert label == expected[2]
+    pd.testing.assert_frame_equal(binned, expected[1], check_dtype=False)
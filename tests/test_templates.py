@@ -0,0 +1,108 @@
+# tests/test_templates.py
+import pytest
+
+from utils.columnar import extract_events_frame, parse_log_frame
+from utils.parallel import parse_files_parallel
+from utils.parser import iter_alarm_events, parse_log_file
+from utils.templates import TemplateMiner, mine_files
+
+FILES = ["McScript_deploy.log", "TSMC_TP01_LOGS8.txt", "macompatsvc_SN18021026TSMC.log"]
+
+
+def _walk(node):
+    """(template ids in the leaves, number of empty nodes) of a prefix (sub)tree."""
+    ids, empty = [], 0 if node else 1
+    for value in node.values():
+        if isinstance(value, dict):
+            sub_ids, sub_empty = _walk(value)
+            ids += sub_ids
+            empty += sub_empty
+        else:
+            ids += value
+            empty += not value
+    return ids, empty
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_ingestion_mines_like_mine_files(logs_dir, name):
+    path = str(logs_dir / name)
+    miners = {path: TemplateMiner()}
+    parse_files_parallel([path], workers=1, chunk_bytes=128 * 1024, miners=miners)
+    expected = mine_files([path])
+    assert miners[path].rows() == expected.rows()
+    assert miners[path].stats == expected.stats
+
+
+def _patterns(miner):
+    return sorted((r["Template"], r["Count"], r["First Seen"], r["Last Seen"]) for r in miner.rows())
+
+
+def test_pool_routes_merged_templates_like_serial(tmp_path):
+    # the first range fills the two-child node, so its "<*> alpha cache now" sits under the
+    # wildcard child; the second range's line must end up in that template after the merge
+    messages = ["red x y z", "green x y z", "blue alpha cache now", "pink alpha cache now", "gray alpha cache now"]
+    lines = [f"2025-08-01 10:00:0{i}\tI\t#1\tComp\t{msg}\n" for i, msg in enumerate(messages)]
+    path = tmp_path / "split.log"
+    path.write_text("".join(lines))
+    miners = {str(path): TemplateMiner(max_children=2)}
+    parse_files_parallel([str(path)], workers=2, chunk_bytes=len("".join(lines[:4])) - 1, min_parallel_bytes=0,
+                         miners=miners)
+    assert _patterns(miners[str(path)]) == _patterns(mine_files([path], max_children=2))
+    assert ("<*> alpha cache now", 3) in [(r["Template"], r["Count"]) for r in miners[str(path)].rows()]
+
+
+@pytest.mark.parametrize("name", ["TSMC_TP01_LOGS1.txt", "macompatsvc_SN18021026TSMC.log"])
+def test_pool_mines_like_serial(logs_dir, name):
+    path = str(logs_dir / name)
+    miners = {path: TemplateMiner()}
+    entries, events, _ = parse_files_parallel([path], workers=2, chunk_bytes=16 * 1024, min_parallel_bytes=0,
+                                              miners=miners, with_entries=True)[path]
+    expected = mine_files([path])
+    assert _patterns(miners[path]) == _patterns(expected)
+    assert miners[path].stats["lines"] == expected.stats["lines"]
+    # the lines' ids were renumbered from the workers' miners to the file's
+    assert entries["Template ID"].notna().sum() == expected.stats["lines"]
+    assert set(entries["Template ID"].dropna()) <= set(miners[path].templates)
+    assert set(events["Template ID"].dropna()) <= set(miners[path].templates)
+
+
+def test_lines_get_template_id_and_params(log_lines):
+    lines = log_lines("TSMC_TP01_LOGS1.txt")
+    row_miner, frame_miner = TemplateMiner(), TemplateMiner()
+    entries = parse_log_file(lines)
+    events = list(iter_alarm_events(entries, miner=row_miner))
+    frame = parse_log_frame(lines)
+    events_frame = extract_events_frame(frame, miner=frame_miner)
+
+    ids = [e.get("Template ID") for e in entries]
+    assert frame["Template ID"].astype(object).where(frame["Template ID"].notna(), None).tolist() == ids
+    assert frame["Params"].tolist() == [e.get("Params") for e in entries]
+    assert sum(i is not None for i in ids) == row_miner.stats["lines"] > 0
+    for entry in entries:
+        if entry.get("Template ID") is not None:
+            tokens = row_miner.templates[entry["Template ID"]]["tokens"]
+            assert len(tokens) == len(entry["Message"][:2000].split())
+            assert all(p in entry["Message"].split() for p in entry["Params"])
+    # events of the generic failure rule carry the template of their line, the others none
+    generic = [e for e in events if "Template ID" in e]
+    assert generic and all(e["Alarm Name"] == "FAILED_ACTION" for e in generic)
+    assert events_frame["Template ID"].dropna().tolist() == [e["Template ID"] for e in generic]
+
+
+def test_eviction_prunes_the_tree(logs_dir):
+    miner = mine_files([logs_dir / "McScript_deploy.log"], max_templates=20)
+    assert miner.stats["evicted"] > 0
+    ids, empty = _walk(miner._root)
+    assert sorted(ids) == sorted(miner.templates)
+    assert empty == 0
+
+
+def test_merge_combines_files(logs_dir):
+    parts = [mine_files([path]) for path in sorted(logs_dir.glob("TSMC_*.txt"))]
+    combined = TemplateMiner()
+    for part in parts:
+        combined.merge_frame(part.to_frame(), part.stats)
+    rows = combined.rows()
+    assert combined.stats["lines"] == sum(r["Count"] for r in rows) == sum(part.stats["lines"] for part in parts)
+    assert len(rows) <= sum(len(part.templates) for part in parts)
+    assert all(r["First Seen"] is None or r["First Seen"] <= r["Last Seen"] for r in rows)
@@ -0,0 +1,41 @@
+# tests/test_timestamps.py
+from datetime import datetime
+
+from utils.timestamps import TimestampParser, parse_timestamp_column
+
+
+def _mixed(log_lines):
+    # McScript stamps have no fraction, macompatsvc stamps have milliseconds
+    plain = log_lines("McScript_deploy.log")[:20]
+    frac = log_lines("macompatsvc_SN18021026TSMC.log")[:20]
+    return [line for pair in zip(plain, frac) for line in pair]
+
+
+def _expected(line):
+    stamp = line[:23] if line[19:20] == "." else line[:19]
+    return datetime.fromisoformat(stamp)
+
+
+def test_parser_keeps_fractions_after_plain_first_line(log_lines):
+    lines = _mixed(log_lines)
+    parser = TimestampParser()
+    assert [parser.parse(line) for line in lines] == [_expected(line) for line in lines]
+
+
+def test_parser_handles_plain_lines_after_fractional_first_line(log_lines):
+    lines = _mixed(log_lines)[1:]
+    parser = TimestampParser()
+    assert [parser.parse(line) for line in lines] == [_expected(line) for line in lines]
+
+
+def test_column_parse_keeps_fractions_when_plain_stamps_dominate(log_lines):
+    # the layout detected for the column is "iso": the fractional lines must keep their fraction
+    lines = log_lines("McScript_deploy.log")[:30] + log_lines("macompatsvc_SN18021026TSMC.log")[:5]
+    parsed = parse_timestamp_column(lines)
+    assert list(parsed) == [_expected(line) for line in lines]
+    assert parsed.dt.microsecond.iloc[30] == 149000
+
+
+def test_tsmc_header_stamp(log_lines):
+    header = log_lines("TSMC_TP01_LOGS1.txt")[0]
+    assert TimestampParser().parse(header) == datetime(2025, 7, 31, 1, 0, 17, 852000)
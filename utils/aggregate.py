@@ -0,0 +1,108 @@
+# utils/aggregate.py
+# Server-side binning for the charts: events are counted per time bucket and alarm before
+# anything is handed to Altair/Plotly, so the browser gets at most a few thousand marks.
+import pandas as pd
+
+# (pandas frequency, label) from fine to coarse; the first one giving <= target buckets wins
+BUCKET_SIZES = [
+    ("1s", "second"), ("5s", "5 seconds"), ("15s", "15 seconds"), ("1min", "minute"),
+    ("5min", "5 minutes"), ("15min", "15 minutes"), ("1h", "hour"), ("3h", "3 hours"),
+    ("6h", "6 hours"), ("1D", "day"), ("7D", "week"), ("30D", "30 days"),
+]
+
+# above this many points the timeline switches from one mark per event to bins
+MAX_POINTS = 5000
+# binned timelines aim for at least this many buckets per series (alarm, severity); the
+# least frequent series are folded into one OTHER series when they don't fit in MAX_POINTS
+MIN_BUCKETS = 10
+OTHER = "Other"
+
+
+def choose_bucket(start, end, target_buckets: int = 200):
+    """(freq, label) of the finest bucket size that splits [start, end] into <= target_buckets."""
+    if start is None or end is None or pd.isna(start) or pd.isna(end):
+        return BUCKET_SIZES[-3]
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for freq, label in BUCKET_SIZES:
+        if span / pd.Timedelta(freq) <= target_buckets:
+            return freq, label
+    return BUCKET_SIZES[-1]
+
+
+def visible_range(events_df: pd.DataFrame, start=None, end=None):
+    """The part of [start, end] actually covered by events (the chart's x extent)."""
+    dates = events_df["Raise Date"].dropna()
+    if dates.empty:
+        return start, end
+    lo, hi = dates.min(), dates.max()
+    if start is not None:
+        lo = max(lo, pd.Timestamp(start))
+    if end is not None:
+        hi = min(hi, pd.Timestamp(end))
+    return lo, hi
+
+
+def bin_events(events_df: pd.DataFrame, freq: str, by=("Alarm Name", "Severity")) -> pd.DataFrame:
+    """Event counts per (bucket, *by), with the first/last Raise Date inside each bin."""
+    by = [c for c in by if c in events_df.columns]
+    df = events_df.dropna(subset=["Raise Date"])
+    if df.empty:
+        return pd.DataFrame(columns=["bucket"] + by + ["count", "first", "last"])
+    dates = pd.to_datetime(df["Raise Date"])
+    # rows with a missing key (an event without a component) are left out, like the NULL
+    # groups of EventStore.bin_events are by detect_from_counts
+    keys = [dates.dt.floor(freq).rename("bucket")] + [df[c].astype(str).where(df[c].notna()) for c in by]
+    grouped = dates.groupby(keys, sort=True, observed=True)
+    return grouped.agg(count="size", first="min", last="max").reset_index()
+
+
+def rebin(binned: pd.DataFrame, freq: str, by=("Alarm Name", "Severity")) -> pd.DataFrame:
+    """Coarser bins from bin_events output; exact when freq is a multiple of its bucket size."""
+    by = [c for c in by if c in binned.columns]
+    keys = [binned["bucket"].dt.floor(freq)] + [binned[c] for c in by]
+    grouped = binned.groupby(keys, sort=True, observed=True)
+    return grouped.agg(count=("count", "sum"), first=("first", "min"), last=("last", "max")).reset_index()
+
+
+def timeline_buckets(n_series: int, max_points: int = MAX_POINTS, target_buckets: int = 200) -> int:
+    """Target bucket count of a binned timeline of n_series series that has to fit in
+    max_points rows (fold_series merges the series that don't)."""
+    n_series = max(1, min(n_series, max_points // (MIN_BUCKETS + 1)))
+    # a span of n bucket widths can touch n + 1 buckets
+    return min(target_buckets, max_points // n_series - 1)
+
+
+def fold_series(binned: pd.DataFrame, max_points: int = MAX_POINTS, by=("Alarm Name", "Severity")) -> pd.DataFrame:
+    """binned within max_points rows: past that, the least frequent series are summed into
+    one OTHER series, so that series x buckets fits."""
+    if len(binned) <= max_points:
+        return binned
+    by = [c for c in by if c in binned.columns]
+    series = binned.groupby(by, sort=True, observed=True).ngroup()
+    totals = binned["count"].groupby(series).sum()
+    max_series = max(1, max_points // binned["bucket"].nunique())
+    keep = totals.sort_values(ascending=False, kind="stable").index[:max_series - 1]
+    folded = binned.astype({c: object for c in by})
+    folded.loc[~series.isin(keep), by] = OTHER
+    grouped = folded.groupby(["bucket"] + by, sort=True, observed=True)
+    return grouped.agg(count=("count", "sum"), first=("first", "min"), last=("last", "max")).reset_index()
+
+
+def timeline_data(events_df: pd.DataFrame, start=None, end=None, max_points: int = MAX_POINTS,
+                  target_buckets: int = 200):
+    """("points", events) when the events fit the row budget, else ("bins", binned, label)
+    with at most max_points bins."""
+    df = events_df.dropna(subset=["Raise Date"])
+    if len(df) <= max_points:
+        return "points", df, None
+    # one row per (bucket, alarm, severity): fewer buckets when there are many alarms
+    n_series = len(df[["Alarm Name", "Severity"]].drop_duplicates())
+    freq, label = choose_bucket(*visible_range(df, start, end),
+                                target_buckets=timeline_buckets(n_series, max_points, target_buckets))
+    return "bins", fold_series(bin_events(df, freq), max_points), label
+
+
+def alarm_counts(events_df: pd.DataFrame, start=None, end=None, target_buckets: int = 60):
+    """(counts per bucket and alarm, bucket label) for the counts bar chart."""
+    freq, label = choose_bucket(*visible_range(events_df, start, end), target_buckets=target_buckets)
+    return bin_events(events_df, freq, by=("Alarm Name",)), label
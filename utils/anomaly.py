@@ -0,0 +1,168 @@
+# utils/anomaly.py
+# Event-rate anomalies (bursts of restarts, FAILED_ACTION storms). Events are counted per
+# fixed bucket (1 min, 5 min, 1 h, ...) and per group (alarm, component, device); each group's
+# count series, zeros included, is compared to an online baseline: an EWMA of the earlier buckets,
+# with the median absolute residual of the last `window` buckets as robust spread (MAD).
+# A bucket is flagged when (count - baseline) / scale reaches the threshold; scale is
+# 1.4826 * MAD, but at least sqrt(baseline) (Poisson noise of sparse alarms) and min_spread.
+#
+# detect_rate_anomalies works on a whole events frame (or on pre-binned counts, e.g. from
+# the event store); RateMonitor keeps the same state per group in ring buffers and is fed
+# new events as they arrive. Both flag the same buckets.
+import math
+from collections import deque
+from statistics import median
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregate import bin_events
+
+RATE_WINDOWS = {"1min": "1 minute", "5min": "5 minutes", "1h": "1 hour"}
+ANOMALY_COLUMNS = ["Window", "Group", "Key", "Bucket", "Count", "Rate (/min)", "Baseline", "Spread", "Score"]
+
+_MAD_SCALE = 1.4826  # MAD -> standard deviation for normally distributed residuals
+
+
+def _row(freq, by, key, bucket, count, baseline, spread, score):
+    minutes = pd.Timedelta(freq) / pd.Timedelta("1min")
+    return [freq, by, key, bucket, count, count / minutes, baseline, spread, score]
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=ANOMALY_COLUMNS)
+
+
+def detect_from_counts(counts: pd.DataFrame, freq: str, by: str = "Alarm Name", span: int = 30,
+                       window: int = 60, threshold: float = 5.0, min_spread: float = 2.0,
+                       warmup: int = 10) -> pd.DataFrame:
+    """Anomalous buckets in bin_events(..., freq, by=(by,)) output (bucket, by, count).
+
+    Each group's series runs from its first to its last non-empty bucket with the empty
+    buckets counted as zero; a bucket is scored once warmup residuals are known.
+    """
+    if counts.empty:
+        return _frame([])
+    step = pd.Timedelta(freq).value
+    alpha = 2.0 / (span + 1)
+    rows = []
+    for key, group in counts.groupby(by, sort=True, observed=True):
+        ticks = group["bucket"].astype("datetime64[ns]").to_numpy().view("int64")
+        first = ticks.min()
+        x = np.zeros((ticks.max() - first) // step + 1)
+        np.add.at(x, (ticks - first) // step, group["count"].to_numpy(dtype=float))
+        if len(x) <= warmup:
+            continue
+        level = pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        baseline = np.r_[np.nan, level[:-1]]
+        resid = x - baseline
+        spread = pd.Series(np.abs(resid)).rolling(window, min_periods=1).median().shift(1).to_numpy()
+        scale = np.maximum(np.maximum(_MAD_SCALE * spread, np.sqrt(np.maximum(baseline, 0))), min_spread)
+        score = resid / scale
+        # scored from the bucket after the first warmup residuals (index 1..warmup)
+        hits = np.flatnonzero(score >= threshold)
+        hits = hits[hits > warmup]
+        for i in hits:
+            bucket = pd.Timestamp(int(first + i * step))
+            rows.append(_row(freq, by, key, bucket, int(x[i]), baseline[i], spread[i], score[i]))
+    return _frame(rows).sort_values(["Bucket", "Window", "Key"], ignore_index=True)
+
+
+def detect_rate_anomalies(events_df: pd.DataFrame, freqs=tuple(RATE_WINDOWS), by: str = "Alarm Name",
+                          **params) -> pd.DataFrame:
+    """Anomalous buckets of events_df for every bucket size in freqs (see detect_from_counts)."""
+    parts = [detect_from_counts(bin_events(events_df, freq, by=(by,)), freq, by, **params) for freq in freqs]
+    parts = [p for p in parts if not p.empty]
+    return pd.concat(parts, ignore_index=True) if parts else _frame([])
+
+
+class RateMonitor:
+    """Incremental counterpart of detect_from_counts for one bucket size.
+
+    update() takes the events appended since the previous call (in time order) and returns
+    the anomalies among the buckets they closed; flush() closes the open buckets at the end
+    of a stream. Per group it keeps the open bucket, the EWMA and a ring buffer of the last
+    `window` absolute residuals, so memory depends on the number of groups only. Events
+    older than a group's open bucket are counted into it.
+    """
+
+    def __init__(self, freq: str = "1min", by: str = "Alarm Name", span: int = 30, window: int = 60,
+                 threshold: float = 5.0, min_spread: float = 2.0, warmup: int = 10):
+        self.freq, self.by = freq, by
+        self.step = pd.Timedelta(freq).value
+        self.alpha = 2.0 / (span + 1)
+        self.window, self.threshold, self.min_spread, self.warmup = window, threshold, min_spread, warmup
+        self.groups = {}  # key -> {"tick", "count", "level", "resid" (deque), "seen"}
+
+    def _score(self, key, state, out):
+        if state["level"] is None or state["seen"] < self.warmup:
+            return
+        x, baseline = state["count"], state["level"]
+        floor = max(math.sqrt(max(baseline, 0)), self.min_spread)
+        if x - baseline < self.threshold * floor:
+            return  # below the threshold whatever the MAD; skips the median for most buckets
+        spread = median(state["resid"])
+        score = (x - baseline) / max(_MAD_SCALE * spread, floor)
+        if score >= self.threshold:
+            out.append(_row(self.freq, self.by, key, pd.Timestamp(state["tick"]), int(x), baseline, spread, score))
+
+    def _close(self, key, state, out):
+        x = state["count"]
+        if state["level"] is None:
+            state["level"] = x
+            return
+        self._score(key, state, out)
+        baseline = state["level"]
+        state["resid"].append(abs(x - baseline))
+        state["seen"] += 1
+        state["level"] = (1 - self.alpha) * baseline + self.alpha * x
+
+    def _skip_empty(self, state, n):
+        # n empty buckets: they can't be flagged (count 0 is never above the baseline), and
+        # only the last `window` of them stay in the residual buffer
+        skipped = max(0, n - self.window)
+        if skipped:
+            state["level"] *= (1 - self.alpha) ** skipped
+            state["seen"] += skipped
+        for _ in range(n - skipped):
+            state["resid"].append(state["level"])
+            state["seen"] += 1
+            state["level"] *= 1 - self.alpha
+
+    def update(self, events_df: pd.DataFrame) -> pd.DataFrame:
+        out = []
+        if self.by not in events_df.columns:
+            return _frame(out)
+        df = events_df.dropna(subset=["Raise Date", self.by])  # as bin_events, no group for a missing key
+        if df.empty:
+            return _frame(out)
+        ticks = pd.to_datetime(df["Raise Date"]).astype("datetime64[ns]").to_numpy().view("int64")
+        ticks = ticks - ticks % self.step
+        # count the batch per (group, bucket) first; the Python loop then runs per bucket, not per event
+        per_bucket = pd.Series(ticks).groupby([df[self.by].astype(str).to_numpy(), ticks]).size()
+        for (key, tick), n in zip(per_bucket.index.tolist(), per_bucket.tolist()):
+            state = self.groups.get(key)
+            if state is None:
+                self.groups[key] = {"tick": tick, "count": n, "level": None, "resid": deque(maxlen=self.window), "seen": 0}
+                continue
+            if tick > state["tick"]:
+                self._close(key, state, out)
+                self._skip_empty(state, (tick - state["tick"]) // self.step - 1)
+                state["tick"], state["count"] = tick, 0
+            state["count"] += n
+        return _frame(out)
+
+    def pending(self) -> pd.DataFrame:
+        """Open buckets already above the threshold (their counts can still grow)."""
+        out = []
+        for key, state in self.groups.items():
+            self._score(key, state, out)
+        return _frame(out)
+
+    def flush(self) -> pd.DataFrame:
+        """Close every open bucket (end of stream); the monitor starts over afterwards."""
+        out = []
+        for key, state in self.groups.items():
+            self._close(key, state, out)
+        self.groups = {}
+        return _frame(out)
@@ -0,0 +1,78 @@
+# utils/archives.py
+# Compressed inputs (endpoint log bundles): gzip/bzip2/xz single files, zip and tar (plain or
+# compressed) archives. The kind is recognised from the leading bytes, not the file name, and
+# members are decompressed as streams -- nothing is extracted to disk.
+import bz2
+import gzip
+import lzma
+import os
+import tarfile
+import zipfile
+
+_OPENERS = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+_MAGIC = [(b"\x1f\x8b", "gz"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz")]
+
+# file_uploader extensions accepted besides plain .txt/.log
+ARCHIVE_EXTENSIONS = ["gz", "tgz", "bz2", "xz", "zip", "tar"]
+
+
+def _is_tar_header(block: bytes) -> bool:
+    return len(block) >= 262 and block[257:262] == b"ustar"
+
+
+def archive_kind(path):
+    """"zip", "tar", "gz", "bz2", "xz" or None for a plain (uncompressed, non-archive) file."""
+    with open(path, "rb") as fh:
+        head = fh.read(512)
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return "zip"
+    if _is_tar_header(head):
+        return "tar"
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            try:
+                with _OPENERS[kind](path, "rb") as fh:
+                    inner = fh.read(512)
+            except (OSError, EOFError, lzma.LZMAError):
+                return None
+            return "tar" if _is_tar_header(inner) else kind
+    return None
+
+
+def _looks_binary(fh) -> bool:
+    return b"\x00" in fh.peek(1024)[:1024]
+
+
+def iter_archive_members(path, kind=None):
+    """Yield (member name, binary stream) for every text member of a compressed file/archive.
+
+    Streams are only valid until the next member is requested. Members that look binary
+    (NUL bytes in their first KB) are skipped.
+    """
+    kind = kind or archive_kind(path)
+    if kind == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as fh:
+                    if not _looks_binary(fh):
+                        yield info.filename, fh
+    elif kind == "tar":
+        # "r|*" reads the archive strictly sequentially (any compression), no seeking
+        with tarfile.open(path, "r|*") as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                fh = tf.extractfile(member)
+                if not _looks_binary(fh):
+                    yield member.name, fh
+    elif kind in _OPENERS:
+        name = os.path.basename(str(path))
+        name = name[:name.rfind(".")] if "." in name else name
+        with _OPENERS[kind](path, "rb") as fh:
+            if not _looks_binary(fh):
+                yield name, fh
+    else:
+        with open(path, "rb") as fh:
+            yield os.path.basename(str(path)), fh
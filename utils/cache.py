@@ -0,0 +1,178 @@
+# utils/cache.py
+# On-disk cache of extracted events (and optionally parsed entries and mined templates),
+# stored per log content.
+# Entries are keyed on the file's content hash plus PARSER_VERSION; path, size and mtime
+# only decide whether the hash has to be recomputed. Old entries are evicted LRU once the
+# cache grows past max_bytes.
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.parser import PARSER_VERSION
+
+try:
+    import pyarrow  # noqa: F401
+    _EXT = "parquet"
+except Exception:
+    _EXT = "pkl"
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write(df, path):
+    if _EXT == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+
+
+def _read(path):
+    return pd.read_parquet(path) if _EXT == "parquet" else pd.read_pickle(path)
+
+
+class ParseCache:
+    def __init__(self, cache_dir, max_bytes: int = 512 * 1024 * 1024):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.index_path = self.dir / "index.json"
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # one instance is shared by all Streamlit sessions
+        self._lock = threading.RLock()
+        try:
+            self.index = json.loads(self.index_path.read_text())
+        except Exception:
+            self.index = {}
+        self.index.setdefault("files", {})
+        self.index.setdefault("entries", {})
+
+    def _save_index(self):
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index))
+        os.replace(tmp, self.index_path)
+
+    def key(self, path) -> str:
+        """Content key of path; the hash is only recomputed when size or mtime changed."""
+        path = Path(path)
+        st = path.stat()
+        known = self.index["files"].get(str(path.resolve()))
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            digest = known["sha1"]
+        else:
+            digest = file_digest(path)
+            self.index["files"][str(path.resolve())] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        return f"{digest}-v{PARSER_VERSION}"
+
+    def _paths(self, key):
+        return (self.dir / f"{key}.entries.{_EXT}", self.dir / f"{key}.events.{_EXT}",
+                self.dir / f"{key}.templates.{_EXT}")
+
+    def get(self, path, with_entries: bool = True):
+        """(entries, events, meta) for path, or None on a miss; entries is None unless with_entries."""
+        with self._lock:
+            return self._get(path, with_entries)
+
+    def _get(self, path, with_entries):
+        key = self.key(path)
+        meta = self.index["entries"].get(key)
+        entries_path, events_path, _ = self._paths(key)
+        # an events-only entry is a miss for callers that need the entries
+        if meta is None or not events_path.exists() or (with_entries and not entries_path.exists()):
+            self.stats["misses"] += 1
+            if not events_path.exists():
+                self.index["entries"].pop(key, None)
+            self._save_index()
+            return None
+        try:
+            entries = _read(entries_path) if with_entries else None
+            events = _read(events_path)
+        except Exception:
+            self.stats["misses"] += 1
+            self._drop(key)
+            self._save_index()
+            return None
+        meta["last_used"] = time.time()
+        self.stats["hits"] += 1
+        self._save_index()
+        return entries, events, meta
+
+    def get_templates(self, path, settings: dict):
+        """(templates frame, miner stats) stored for path by a miner built with settings, or None."""
+        with self._lock:
+            key = self.key(path)
+            meta = self.index["entries"].get(key)
+            templates_path = self._paths(key)[2]
+            if meta is None or meta.get("templates", {}).get("settings") != settings or not templates_path.exists():
+                return None
+            try:
+                return _read(templates_path), meta["templates"]["stats"]
+            except Exception:
+                return None
+
+    def put(self, path, entries, events: pd.DataFrame, templates=None, **meta):
+        """Store events, and entries unless None (the app caches events only; entries are many times larger).
+        templates is (frame, {"settings": ..., "stats": ...}) of the file's template miner, if it had one."""
+        with self._lock:
+            self._put(path, entries, events, templates, meta)
+
+    def _put(self, path, entries, events, templates, meta):
+        key = self.key(path)
+        entries_path, events_path, templates_path = self._paths(key)
+        if entries is not None:
+            _write(entries, entries_path)
+        else:
+            entries_path.unlink(missing_ok=True)
+        if templates is not None:
+            _write(templates[0], templates_path)
+            meta["templates"] = templates[1]
+        else:
+            templates_path.unlink(missing_ok=True)
+        _write(events, events_path)
+        meta.update({
+            "bytes": sum(p.stat().st_size for p in (entries_path, events_path, templates_path) if p.exists()),
+            "last_used": time.time(),
+        })
+        self.index["entries"][key] = meta
+        self._evict(keep=key)
+        self._save_index()
+
+    def _drop(self, key):
+        for p in self._paths(key):
+            p.unlink(missing_ok=True)
+        self.index["entries"].pop(key, None)
+
+    def _evict(self, keep=None):
+        entries = self.index["entries"]
+        total = sum(m["bytes"] for m in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]["bytes"]
+            self._drop(key)
+            self.stats["evictions"] += 1
+
+    def total_bytes(self) -> int:
+        return sum(m["bytes"] for m in self.index["entries"].values())
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        for key in list(self.index["entries"]):
+            self._drop(key)
+        self.index["files"] = {}
+        self._save_index()
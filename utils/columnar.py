@@ -0,0 +1,188 @@
+# utils/columnar.py
+# Columnar counterparts of parse_log_file / extract_alarm_events: lines go straight into
+# typed DataFrame columns and events are matched with vectorized Series.str operations,
+# so there is no list-of-dicts round trip and no iterrows().
+import re
+import time
+import warnings
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.parser import EVENT_RULES, RULE_NAMES, build_event, re_event_prefilter, try_parse_datetime
+from utils.formats import (
+    FORMATS, iter_format_entries, parse_agent, re_agent_full, re_fallback_comp, re_mcscript_full, sniff_format,
+)
+from utils.timestamps import parse_timestamp_column
+from utils import profiling
+
+# Arrow-backed strings run Series.str matching in native code; plain objects otherwise
+try:
+    import pyarrow  # noqa: F401
+    _STR_DTYPE = "string[pyarrow]"
+except Exception:
+    _STR_DTYPE = object
+
+# Matcher tables, compiled once per process (pool workers build theirs on import) and
+# passed to Series.str as compiled patterns: (name, literal alternation, pattern, guard)
+_RULE_TABLE = [
+    (name, re.compile("|".join(map(re.escape, rule["literals"]))), rule["pattern"], rule.get("guard"))
+    for name, rule in zip(RULE_NAMES, EVENT_RULES)
+]
+
+_GENERIC_RULES = [i for i, rule in enumerate(EVENT_RULES) if rule.get("generic")]
+
+EVENT_COLUMNS = [
+    "Device Name", "Component", "Alarm Name", "Severity", "Status", "Raise Date", "Terminated Date", "Message",
+]
+# added to entries and events by template mining (extract_events_frame(..., miner=...))
+TEMPLATE_EVENT_COLUMNS = ["Template ID", "Params"]
+
+
+def _empty_frame(keep_raw):
+    frame = pd.DataFrame({
+        "Timestamp": pd.Series([], dtype="datetime64[us]"),
+        "Level": pd.Categorical([]),
+        "ThreadID": pd.Series([], dtype="Int64"),
+        "Component": pd.Categorical([]),
+        "Message": pd.Series([], dtype=object),
+    })
+    if keep_raw:
+        frame["Raw"] = pd.Series([], dtype=object)
+    return frame
+
+
+def _typed_frame(ts, level, thread, comp, msg, raw, keep_raw):
+    frame = pd.DataFrame({
+        "Timestamp": pd.Series(ts, dtype="datetime64[us]"),
+        "Level": pd.Categorical(level),
+        "ThreadID": pd.to_numeric(pd.Series(thread, dtype=object), errors="coerce").astype("Int64"),
+        "Component": pd.Categorical(comp),
+        "Message": pd.Series(msg, dtype=object),
+    })
+    if keep_raw:
+        frame["Raw"] = pd.Series(raw, dtype=object).to_numpy()
+    return frame
+
+
+def _structured_frame(raw, regex, keep_raw):
+    """Rows matching regex (McScript or agent layout) get its fields, others the per-line fallback."""
+    raw = raw.astype(_STR_DTYPE).str.rstrip("\n")
+    parts = raw.str.extract(regex.pattern).astype(object)
+    structured = parts["ts"].notna().to_numpy()
+    other = ~structured
+
+    ts = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[us]")
+    level = parts["level"].str[0].str.upper().to_numpy(copy=True)
+    comp = parts["comp"].to_numpy(copy=True)
+    msg = parts["msg"].str.strip().to_numpy(copy=True)
+    if structured.any():
+        ts[structured] = parse_timestamp_column(parts.loc[structured, "ts"])
+    if other.any():
+        # TSMC style and others
+        rest = raw[other]
+        ts[other] = parse_timestamp_column(rest.astype(object))
+        # level from "/W/", " W/", " W " markers, W before I before F
+        level[other] = np.select(
+            [rest.str.contains(f"/{lv}/| {lv}/| {lv} ", regex=True).fillna(False).to_numpy(dtype=bool) for lv in "WIF"],
+            list("WIF"),
+            default=None,
+        )
+        comp[other] = rest.str.extract(re_fallback_comp.pattern, expand=False).astype(object).to_numpy()
+        msg[other] = rest.str.strip().astype(object).to_numpy()
+    return _typed_frame(ts, level, parts["thread"], comp, msg, raw.astype(object), keep_raw)
+
+
+def _records_frame(entries, keep_raw):
+    columns = ["Timestamp", "Level", "ThreadID", "Component", "Message"] + (["Raw"] if keep_raw else [])
+    records = pd.DataFrame.from_records(entries, columns=columns)
+    return _typed_frame(pd.to_datetime(records["Timestamp"]), records["Level"], records["ThreadID"],
+                        records["Component"], records["Message"], records.get("Raw"), keep_raw)
+
+
+def parse_log_frame(lines: Iterable[str], keep_raw: bool = False, fmt: str = None) -> pd.DataFrame:
+    """Parse lines into a DataFrame with typed columns.
+
+    Timestamp is datetime64, Level and Component are categorical, ThreadID is a nullable
+    Int64. Values match parse_log_file row for row. Line-oriented formats are parsed with
+    vectorized Series.str extraction; multi-line ones (TSMC) go through their plugin.
+    """
+    lines = list(lines)
+    if not lines:
+        return _empty_frame(keep_raw)
+    fmt = fmt or sniff_format(lines[:50])
+    if fmt in ("mcscript", "generic"):
+        return _structured_frame(pd.Series(lines, dtype=object), re_mcscript_full, keep_raw)
+    if FORMATS[fmt]["parse"] is parse_agent:
+        return _structured_frame(pd.Series(lines, dtype=object), re_agent_full, keep_raw)
+    return _records_frame(iter_format_entries(lines, keep_raw=keep_raw, fmt=fmt), keep_raw)
+
+
+def extract_events_frame(frame: pd.DataFrame, miner=None) -> pd.DataFrame:
+    """Vectorized extract_alarm_events over a parsed frame; returns an events DataFrame.
+
+    Rows are matched rule by rule in priority order with Series.str operations; only the
+    (few) matching rows are turned into event records. As in iter_alarm_events, messages
+    left to no or a generic rule go to miner (utils.templates.TemplateMiner) if given; frame
+    then gets "Template ID" and "Params" columns (set on the mined rows), and so do the events.
+    """
+    columns = EVENT_COLUMNS + (TEMPLATE_EVENT_COLUMNS if miner is not None else [])
+    if frame.empty or "Message" not in frame.columns:
+        return pd.DataFrame(columns=columns)
+    parsed, frame = frame, frame.reset_index(drop=True)
+    all_msg = frame["Message"].fillna("").astype(_STR_DTYPE).str.slice(0, 2000)
+    low = all_msg.str.lower()
+    t0 = time.perf_counter()
+    candidates = low.str.contains(re_event_prefilter.pattern, regex=True).to_numpy(dtype=bool)
+    profiling.record_rule("prefilter", int(candidates.sum()), time.perf_counter() - t0)
+    msg, low = all_msg[candidates].astype(object), low[candidates].astype(object)
+
+    rule_idx = pd.Series(-1, index=msg.index)
+    for i, (name, literals, pattern, guard) in enumerate(_RULE_TABLE):
+        todo = rule_idx < 0
+        if not todo.any():
+            break
+        t0 = time.perf_counter()
+        hit = todo & low.str.contains(literals)
+        with warnings.catch_warnings():
+            # patterns carry capture groups for build_event; only the boolean is needed here
+            warnings.filterwarnings("ignore", "This pattern is interpreted as a regular expression")
+            hit &= msg.str.contains(pattern)
+        if guard is not None:
+            hit &= msg.map(guard).astype(bool)
+        rule_idx[hit] = i
+        profiling.record_rule(name, int(hit.sum()), time.perf_counter() - t0)
+
+    ts = frame["Timestamp"] if "Timestamp" in frame.columns else pd.Series(pd.NaT, index=frame.index)
+    if miner is not None:
+        leftover = ~candidates
+        leftover[rule_idx.index[rule_idx.isin([-1] + _GENERIC_RULES)]] = True
+        stamps = ts[leftover].astype(object).where(ts[leftover].notna(), None)
+        template_ids = np.full(len(frame), None, dtype=object)
+        params = np.full(len(frame), None, dtype=object)
+        for i, text, stamp in zip(np.flatnonzero(leftover), all_msg[leftover].astype(object), stamps):
+            template_ids[i], params[i] = miner.add(text, stamp)
+        parsed["Template ID"] = pd.array(template_ids, dtype="Int64")
+        parsed["Params"] = params
+
+    matched = rule_idx[rule_idx >= 0]
+    if matched.empty:
+        return pd.DataFrame(columns=columns)
+    raw = frame["Raw"] if "Raw" in frame.columns else frame["Message"]
+    comp = frame["Component"] if "Component" in frame.columns else pd.Series(None, index=frame.index)
+    comp = comp.astype(object).where(comp.notna(), None)
+    records = []
+    for idx, i in matched.items():
+        rule, text = EVENT_RULES[i], msg[idx]
+        row = {"Message": frame["Message"][idx], "Raw": raw[idx], "Component": comp[idx]}
+        stamp = ts[idx]
+        stamp = try_parse_datetime(row["Raw"]) if pd.isna(stamp) else stamp
+        records.append(build_event(rule, rule["pattern"].search(text), text, row, stamp))
+    events = pd.DataFrame.from_records(records, index=matched.index, columns=EVENT_COLUMNS)
+    events["Raise Date"] = pd.to_datetime(events["Raise Date"])
+    events["Terminated Date"] = pd.to_datetime(events["Terminated Date"])
+    if miner is not None:
+        events["Template ID"] = pd.array(template_ids[matched.index], dtype="Int64")
+        events["Params"] = params[matched.index]
+    return events.reset_index(drop=True)
@@ -0,0 +1,82 @@
+# utils/correlate.py
+# Cross-file temporal correlation. The time-sorted event streams of all files are merged with
+# a k-way heap merge and swept once with a sliding window: for every event, each distinct
+# (file, alarm) seen within the window before it counts as a candidate cause. The window
+# keeps only the latest occurrence per key, so the cost is linear in the number of events
+# times the number of distinct keys active inside one window.
+import heapq
+import math
+from collections import deque
+
+import pandas as pd
+
+CORRELATION_COLUMNS = ["Cause File", "Cause Alarm", "Effect File", "Effect Alarm", "Count", "Confidence",
+                       "Mean Lag (s)", "Min Lag (s)", "Max Lag (s)", "Std Lag (s)"]
+
+
+def _iter_stream(source_file, frames, severities=None):
+    """(time in us, key) of one file's events; frames is a DataFrame or an iterable of
+    DataFrames already sorted by Raise Date (e.g. EventStore.iter_query)."""
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames.sort_values("Raise Date", kind="mergesort")]
+    for df in frames:
+        df = df[df["Raise Date"].notna()]
+        if severities is not None:
+            df = df[df["Severity"].isin(severities)]
+        times = df["Raise Date"].astype("datetime64[us]").to_numpy().view("int64")
+        for t, alarm in zip(times.tolist(), df["Alarm Name"].astype(str).tolist()):
+            yield t, (source_file, alarm)
+
+
+def merge_streams(streams, severities=None):
+    """k-way merge of {source_file: events} into one (time in us, (file, alarm)) stream."""
+    return heapq.merge(*(_iter_stream(f, frames, severities) for f, frames in streams.items()),
+                       key=lambda item: item[0])
+
+
+def correlate_events(streams, window_seconds: float = 60.0, min_count: int = 2, severities=None,
+                     cross_file_only: bool = False) -> pd.DataFrame:
+    """Cause -> effect pairs of (file, alarm) keys where the cause occurred at most
+    window_seconds before the effect, with counts and lag statistics.
+
+    Confidence is the share of the effect's occurrences preceded by the cause within the
+    window. Keys are never paired with themselves.
+    """
+    window = int(window_seconds * 1_000_000)
+    recent = deque()   # (time, key) inside the window, oldest first
+    last_seen = {}     # key -> latest time inside the window
+    occurrences = {}
+    pairs = {}         # (cause, effect) -> [count, sum, sum of squares, min, max] of lags (us)
+    for t, key in merge_streams(streams, severities):
+        cutoff = t - window
+        while recent and recent[0][0] < cutoff:
+            _, old = recent.popleft()
+            if last_seen.get(old, t) < cutoff:
+                del last_seen[old]
+        for cause, seen in last_seen.items():
+            if cause == key or (cross_file_only and cause[0] == key[0]):
+                continue
+            lag = t - seen
+            stats = pairs.get((cause, key))
+            if stats is None:
+                pairs[(cause, key)] = [1, lag, lag * lag, lag, lag]
+            else:
+                stats[0] += 1
+                stats[1] += lag
+                stats[2] += lag * lag
+                stats[3] = min(stats[3], lag)
+                stats[4] = max(stats[4], lag)
+        last_seen[key] = t
+        recent.append((t, key))
+        occurrences[key] = occurrences.get(key, 0) + 1
+
+    rows = []
+    for (cause, effect), (n, total, squares, lo, hi) in pairs.items():
+        if n < min_count:
+            continue
+        mean = total / n
+        std = math.sqrt(max(squares / n - mean * mean, 0.0))
+        rows.append([cause[0], cause[1], effect[0], effect[1], n, n / occurrences[effect],
+                     mean / 1e6, lo / 1e6, hi / 1e6, std / 1e6])
+    out = pd.DataFrame(rows, columns=CORRELATION_COLUMNS)
+    return out.sort_values(["Count", "Confidence"], ascending=False, ignore_index=True)
@@ -0,0 +1,122 @@
+# utils/export.py
+# Streaming event writers shared by the app's download button and cli.py. Frames are
+# appended in chunks, so memory stays bounded by the chunk size rather than the export:
+# Excel goes through openpyxl's write-only mode (a new sheet every EXCEL_MAX_ROWS rows),
+# Parquet through a pyarrow ParquetWriter (one row group per chunk).
+import sys
+import tempfile
+
+import pandas as pd
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet", "xlsx")
+EXPORT_MIME = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# rows per worksheet, including the header row
+EXCEL_MAX_ROWS = 1_048_576
+
+
+class EventWriter:
+    """Appends event frames to one output (path, "-" for stdout, or a binary file object)."""
+
+    def __init__(self, path, fmt, sheet_rows: int = EXCEL_MAX_ROWS):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self.sheet_rows = sheet_rows
+        self._parquet = None
+        self._empty = None
+        self._book = None
+        self._sheet = None
+        self._sheet_used = 0
+        self._fh = None
+        self._own = isinstance(path, str) and path != "-"
+        self._binary = not isinstance(path, str)
+        if fmt in ("jsonl", "csv"):
+            if path == "-":
+                self._fh = sys.stdout
+            elif self._own:
+                self._fh = open(path, "w", encoding="utf-8", newline="")
+            else:
+                self._fh = path
+        elif fmt == "xlsx":
+            from openpyxl import Workbook
+
+            self._book = Workbook(write_only=True)
+
+    def _write_text(self, text):
+        self._fh.write(text.encode("utf-8") if self._binary else text)
+
+    def _write_xlsx(self, df):
+        # write-only cells take plain Python values; missing values become empty cells
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet is None or self._sheet_used >= self.sheet_rows:
+                n = len(self._book.worksheets) + 1
+                self._sheet = self._book.create_sheet("events" if n == 1 else f"events_{n}")
+                self._sheet.append(list(df.columns))
+                self._sheet_used = 1
+            self._sheet.append(row)
+            self._sheet_used += 1
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            if self._empty is None:
+                self._empty = df  # schema for close() if no rows ever come
+            return
+        if self.fmt == "jsonl":
+            text = df.to_json(orient="records", lines=True, date_format="iso")
+            self._write_text(text if text.endswith("\n") else text + "\n")
+        elif self.fmt == "csv":
+            self._write_text(df.to_csv(index=False, header=self.rows == 0))
+        elif self.fmt == "xlsx":
+            self._write_xlsx(df)
+        else:
+            self._write_parquet(df)
+        self.rows += len(df)
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def close(self):
+        if self.rows == 0 and self._empty is not None:
+            # nothing matched: still a valid file with the columns (CSV header, Parquet schema)
+            if self.fmt == "csv":
+                self._write_text(self._empty.to_csv(index=False))
+            elif self.fmt == "parquet":
+                self._write_parquet(self._empty)
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._book is not None:
+            if not self._book.worksheets:
+                self._book.create_sheet("events")
+            self._book.save(self.path)
+        if self._fh is not None and self._own:
+            self._fh.close()
+
+
+def export_events(frames, fmt: str, chunk_rows: int = 50_000, sheet_rows: int = EXCEL_MAX_ROWS) -> bytes:
+    """The events (a DataFrame, or an iterable of frames such as EventStore.iter_query) as a
+    file of the given format. Chunks are written to a temporary file, so only the finished
+    file is held in memory, never the writer's object model."""
+    if isinstance(frames, pd.DataFrame):
+        df = frames
+        frames = (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+    with tempfile.TemporaryFile() as out:
+        writer = EventWriter(out, fmt, sheet_rows=sheet_rows)
+        try:
+            for frame in frames:
+                writer.write(frame)
+        finally:
+            writer.close()
+        out.seek(0)
+        return out.read()
@@ -0,0 +1,34 @@
+# utils/filters.py
+# Event filters shared by the Streamlit sidebar (app.py) and the command line (cli.py).
+import numpy as np
+import pandas as pd
+
+
+def filter_events(events_df: pd.DataFrame, start=None, end=None, severities=None,
+                  alarm_name: str = "", text: str = "", index=None) -> pd.DataFrame:
+    """Raise Date within [start, end], Severity in severities, case-insensitive substring
+    (regex) matches on Alarm Name and Message. Empty/None arguments don't filter.
+
+    index is an optional utils.search.EventIndex built over events_df; the text filters
+    are then answered from it instead of scanning every row.
+    """
+    df = events_df
+    if df.empty:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    # filter by datetime if Raise Date exists
+    if (start is not None or end is not None) and df["Raise Date"].notna().any():
+        if start is not None:
+            mask &= (df["Raise Date"] >= pd.to_datetime(start)).to_numpy(dtype=bool, na_value=False)
+        if end is not None:
+            mask &= (df["Raise Date"] <= pd.to_datetime(end)).to_numpy(dtype=bool, na_value=False)
+    if severities:
+        mask &= df["Severity"].isin(severities).to_numpy(dtype=bool)
+    for column, query in (("Alarm Name", alarm_name), ("Message", text)):
+        if not query:
+            continue
+        if index is not None:
+            mask &= index.mask(column, query)
+        else:
+            mask &= df[column].astype(str).str.contains(query, case=False, na=False).to_numpy(dtype=bool)
+    return df if mask.all() else df[mask]
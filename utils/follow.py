@@ -0,0 +1,120 @@
+# utils/follow.py
+# Incremental "tail -f" parsing of growing log files. A FileFollower remembers the byte
+# offset it has consumed and any trailing partial line; each poll() parses only the bytes
+# appended since the last one and appends the new events to its events frame; the lines no
+# specific rule matched go to its miner (utils.templates.TemplateMiner), if it has one.
+# flush() parses what is still held back once the file is known to be complete.
+import os
+import re
+
+import pandas as pd
+
+from utils.columnar import EVENT_COLUMNS, extract_events_frame, parse_log_frame
+from utils.formats import sniff_format
+
+# end of a TSMC body: "/I/message/00000097h:("
+re_tsmc_trailer = re.compile(r'/[0-9A-Fa-f]+h:\($')
+
+
+class FileFollower:
+    def __init__(self, path, fmt: str = None, max_read: int = 64 * 1024 * 1024, miner=None):
+        self.path = path
+        self.fmt = fmt
+        self.miner = miner
+        self.max_read = max_read
+        self.offset = 0
+        self.partial = b""
+        # TSMC records span several lines; the last one stays pending until its trailer, the
+        # next header, a rotation or flush(): a writer may be between two of its lines
+        self.pending = []
+        self.inode = None
+        # first bytes of the file, to spot a truncate-and-refill that outgrew the old offset
+        self.head = b""
+        self.lines = 0
+        self.rotations = 0
+        self.events = pd.DataFrame(columns=EVENT_COLUMNS)
+
+    def _reset(self):
+        self.offset = 0
+        self.partial = b""
+        self.pending = []
+        self.head = b""
+        self.rotations += 1
+
+    def poll(self) -> pd.DataFrame:
+        """Parse what was appended since the last poll; returns only the new events.
+
+        The first poll (and the first after a restart) reads up to the end of the file,
+        max_read bytes at a time; later polls read at most max_read bytes each.
+        A changed inode (rotation), a file smaller than the consumed offset or different
+        leading bytes (truncation) restart reading from byte 0; the record and line held back
+        from the old content are parsed first, and events seen before are kept.
+        """
+        st = os.stat(self.path)
+        parts = []
+        with open(self.path, "rb") as fh:
+            if self.inode is not None and (
+                st.st_ino != self.inode or st.st_size < self.offset or fh.read(len(self.head)) != self.head
+            ):
+                parts.append(self._drain())
+                self._reset()
+            self.inode = st.st_ino
+            catch_up = self.offset == 0
+            while True:
+                fh.seek(self.offset)
+                data = fh.read(self.max_read)
+                if not data:
+                    break
+                parts.append(self._consume(data))
+                if not catch_up:
+                    break
+        return self._append(parts)
+
+    def flush(self) -> pd.DataFrame:
+        """Parse the pending TSMC record and a last line without newline (the file is complete);
+        returns their events."""
+        return self._append([self._drain()])
+
+    def _append(self, parts):
+        parts = [p for p in parts if not p.empty]
+        if not parts:
+            return self.events.iloc[0:0]
+        new_events = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        self.events = new_events if self.events.empty else pd.concat([self.events, new_events], ignore_index=True)
+        return new_events
+
+    def _drain(self):
+        # the pending TSMC record and the partial last line, taken as complete
+        lines = self.pending + ([self.partial.decode("utf-8", errors="ignore").rstrip("\r")] if self.partial else [])
+        self.lines += bool(self.partial)
+        self.pending, self.partial = [], b""
+        return self._parse(lines)
+
+    def _consume(self, data):
+        # events of the complete lines in data (plus the partial line kept from before)
+        if self.offset == 0:
+            self.head = data[:256]
+        self.offset += len(data)
+        data = self.partial + data
+        cut = data.rfind(b"\n") + 1
+        self.partial = data[cut:]
+        lines = [raw.decode("utf-8", errors="ignore").rstrip("\r") for raw in data[:cut].split(b"\n")[:-1]]
+        if not lines:
+            return self.events.iloc[0:0]
+        self.lines += len(lines)
+
+        if self.fmt is None:
+            self.fmt = sniff_format(lines[:50])
+        if self.fmt == "tsmc":
+            lines = self.pending + lines
+            last_header = max((i for i, line in enumerate(lines) if line.startswith(":)/")), default=0)
+            lines, self.pending = lines[:last_header], lines[last_header:]
+            # a body line ending in the "/...h:(" trailer closes the record: no need to wait
+            if len(self.pending) > 1 and re_tsmc_trailer.search(self.pending[-1].rstrip()):
+                lines, self.pending = lines + self.pending, []
+        return self._parse(lines)
+
+    def _parse(self, lines):
+        if not lines:
+            return self.events.iloc[0:0]
+        return extract_events_frame(parse_log_frame(lines, fmt=self.fmt), miner=self.miner)
@@ -0,0 +1,195 @@
+# utils/formats.py
+# Log format plugins. Each format registers a sniffer, which scores a sample of lines
+# (fraction it recognises, 0..1), and a parser, which turns an iterable of lines into
+# entry dicts (Timestamp, Level, ThreadID, Component, Message[, Raw]).
+import re
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from utils.timestamps import TimestampParser, search_timestamp, slice_compact, slice_iso
+
+# McScript: "2025-07-31 22:37:42<TAB>I<TAB>#4552<TAB>ScrptMain<TAB>message"
+re_mcscript_full = re.compile(
+    r'^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+'
+    r'(?P<level>[IEWF])\s+'
+    r'#(?P<thread>\d+)\s+'
+    r'(?P<comp>\S+)\s+'
+    r'(?P<msg>.*)$'
+)
+# McAfee agent services (macompatsvc, masvc/mfemactl, ma_updater):
+# "2025-08-06 04:37:39.149 macompatsvc(6080.4612) SAProtocol.Debug: message"
+re_agent_full = re.compile(
+    r'^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+'
+    r'(?P<proc>[^\s(]+)\((?P<pid>\d+)\.(?P<thread>\d+)\)\s+'
+    r'(?P<comp>\S+?)\.(?P<level>[A-Za-z]+):\s?'
+    r'(?P<msg>.*)$'
+)
+# TSMC records: a ":)/YYYYMMDD/HH:MM:SS.ffffff/T//task/file///n/Lline" header followed by
+# one or more "/I/message/00000097h:(" body lines
+re_tsmc_header = re.compile(r'^:\)/(?P<date>\d{8})/(?P<time>\d{2}:\d{2}:\d{2}(?:\.\d+)?)/[^/]*//(?P<comp>[^/]+)/')
+re_tsmc_body = re.compile(r'^/(?P<level>[A-Z])/(?P<msg>.*?)(?:/[0-9A-Fa-f]+h:\()?$', re.DOTALL)
+re_fallback_comp = re.compile(r'//(?P<comp>[^/]+)/')
+
+# name -> {"sniff": lines -> score, "parse": (lines, keep_raw) -> entries}; ties go to the
+# format registered first, so register specific formats before general ones
+FORMATS: Dict[str, Dict[str, Callable]] = {}
+SNIFF_THRESHOLD = 0.5
+
+
+def register_format(name: str, sniff: Callable, parse: Callable):
+    FORMATS[name] = {"sniff": sniff, "parse": parse}
+
+
+def sniff_format(lines: List[str]) -> str:
+    """Best registered format for a sample of lines, "generic" if none scores high enough."""
+    sample = [line for line in lines if line.strip()]
+    if not sample:
+        return "generic"
+    best, best_score = "generic", SNIFF_THRESHOLD
+    for name, fmt in FORMATS.items():
+        score = fmt["sniff"](sample)
+        if score > best_score:
+            best, best_score = name, score
+    return best
+
+
+def iter_format_entries(lines: Iterable[str], keep_raw: bool = True, fmt: str = None,
+                        sample: int = 50) -> Iterator[Dict]:
+    """Parse lines with fmt, sniffing it from the first `sample` lines when not given."""
+    lines = iter(lines)
+    if fmt is None:
+        head = list(islice(lines, sample))
+        fmt = sniff_format(head)
+        lines = chain(head, lines)
+    return FORMATS[fmt]["parse"](lines, keep_raw)
+
+
+def _generic_entry(line, ts_parser):
+    # Fallback for TSMC style and others: heuristics on a single line
+    ts = ts_parser.parse(line)
+    level = None
+    if "/W/" in line or " W/" in line or " W " in line:
+        level = "W"
+    elif "/I/" in line or " I/" in line or " I " in line:
+        level = "I"
+    elif "/F/" in line or " F/" in line or " F " in line:
+        level = "F"
+    comp_match = re_fallback_comp.search(line)
+    return {
+        "Timestamp": ts,
+        "Level": level,
+        "ThreadID": None,
+        "Component": comp_match.group("comp") if comp_match else None,
+        "Message": line.strip(),
+    }
+
+
+def _mcscript_entry(m, line):
+    try:
+        ts = slice_iso(line)
+    except ValueError:
+        ts = search_timestamp(line)
+    return {
+        "Timestamp": ts,
+        "Level": m.group("level"),
+        "ThreadID": m.group("thread"),
+        "Component": m.group("comp"),
+        "Message": m.group("msg").strip(),
+    }
+
+
+def parse_generic(lines, keep_raw=True):
+    # timestamp layout is detected on the first stamped line and reused for the whole file
+    ts_parser = TimestampParser()
+    for line in lines:
+        line = line.rstrip("\n")
+        m = re_mcscript_full.match(line)
+        entry = _mcscript_entry(m, line) if m else _generic_entry(line, ts_parser)
+        if keep_raw:
+            entry["Raw"] = line
+        yield entry
+
+
+def parse_agent(lines, keep_raw=True):
+    ts_parser = TimestampParser()
+    for line in lines:
+        line = line.rstrip("\n")
+        m = re_agent_full.match(line)
+        if m:
+            ts = m.group("ts")
+            try:
+                stamp = slice_iso(ts, 0, ts[20:])
+            except ValueError:
+                stamp = search_timestamp(ts)
+            entry = {
+                "Timestamp": stamp,
+                # Info -> I, Debug -> D, Error -> E, Warning -> W ...
+                "Level": m.group("level")[0].upper(),
+                "ThreadID": m.group("thread"),
+                "Component": m.group("comp"),
+                "Message": m.group("msg").strip(),
+            }
+        else:
+            entry = _generic_entry(line, ts_parser)
+        if keep_raw:
+            entry["Raw"] = line
+        yield entry
+
+
+def _tsmc_entry(header, body, keep_raw):
+    h = re_tsmc_header.match(header) if header is not None else None
+    text = " ".join(part.strip() for part in body)
+    b = re_tsmc_body.match(text)
+    try:
+        ts = slice_compact(h.group("date"), h.group("time")) if h else None
+    except ValueError:
+        ts = None
+    entry = {
+        "Timestamp": ts,
+        "Level": b.group("level") if b else None,
+        "ThreadID": None,
+        "Component": h.group("comp") if h else None,
+        "Message": (b.group("msg") if b else text).strip(),
+    }
+    if keep_raw:
+        entry["Raw"] = "\n".join(([header] if header is not None else []) + body)
+    return entry
+
+
+def parse_tsmc(lines, keep_raw=True):
+    """Join each header line with the body line(s) that follow it into one entry."""
+    header, body = None, []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith(":)/"):
+            if header is not None or body:
+                yield _tsmc_entry(header, body, keep_raw)
+            header, body = line, []
+        elif line.strip() or body:
+            body.append(line)
+    if header is not None or body:
+        yield _tsmc_entry(header, body, keep_raw)
+
+
+def _sniff_regex(regex, processes=None):
+    def sniff(sample):
+        hits = 0
+        for line in sample:
+            m = regex.match(line)
+            if m and (processes is None or m.group("proc").lower() in processes):
+                hits += 1
+        return hits / len(sample)
+    return sniff
+
+
+def _sniff_tsmc(sample):
+    # roughly every other line is a header; bodies start with a level marker
+    hits = sum(1 for line in sample if re_tsmc_header.match(line) or re_tsmc_body.match(line))
+    return hits / len(sample)
+
+
+register_format("mcscript", _sniff_regex(re_mcscript_full), parse_generic)
+register_format("tsmc", _sniff_tsmc, parse_tsmc)
+register_format("mfemactl", _sniff_regex(re_agent_full, {"masvc", "mfemactl"}), parse_agent)
+register_format("macompatsvc", _sniff_regex(re_agent_full), parse_agent)
+register_format("generic", lambda sample: 0.0, parse_generic)
@@ -0,0 +1,230 @@
+# utils/parallel.py
+# Parallel ingestion: files are spread over a ProcessPoolExecutor and large files are split
+# into newline-aligned byte ranges (record-aligned for TSMC, so a header is never separated
+# from its body) that are parsed independently and merged back in file order. Compressed
+# files/archives can't be split; each is one task that streams its members through the parser.
+# Every task parses its lines in batches, so its memory doesn't grow with the range or file size.
+# Template mining (utils.templates) rides along: a worker mines its range into a miner of its
+# own, which is merged into the file's miner in file order (and its lines' ids renumbered).
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+import pandas as pd
+
+from utils.archives import archive_kind, iter_archive_members
+from utils.columnar import extract_events_frame, parse_log_frame
+from utils.formats import sniff_format
+from utils.parser import iter_file_lines, iter_stream_lines
+from utils import profiling
+from utils.templates import TemplateMiner
+
+
+def _record_start(line: bytes, fmt: str) -> bool:
+    return line.startswith(b":)/") if fmt == "tsmc" else True
+
+
+def split_ranges(path, chunk_bytes: int, fmt: str = None):
+    """[(start, end), ...] byte ranges of about chunk_bytes, each starting at a record start."""
+    size = os.path.getsize(path)
+    if size <= chunk_bytes:
+        return [(0, size)]
+    bounds = [0]
+    with open(path, "rb") as fh:
+        pos = chunk_bytes
+        while pos < size:
+            fh.seek(pos)
+            fh.readline()  # finish the line pos falls into
+            while True:
+                start = fh.tell()
+                line = fh.readline()
+                if not line or _record_start(line, fmt):
+                    break
+            if start >= size:
+                break
+            if start > bounds[-1]:
+                bounds.append(start)
+            pos = max(start, pos) + chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class _RangeReader:
+    # read() over bytes [start, end) of an open file, for iter_stream_lines
+    def __init__(self, fh, length):
+        self.fh, self.left = fh, length
+
+    def read(self, size):
+        data = self.fh.read(min(size, self.left))
+        self.left -= len(data)
+        return data
+
+
+def _concat(frames):
+    # empty parts (ranges/batches without events) are untyped and would widen the dtypes
+    non_empty = [f for f in frames if not f.empty]
+    if len(non_empty) == 1:
+        return non_empty[0]
+    return pd.concat(non_empty or frames[:1], ignore_index=True)
+
+
+def _record_batches(lines, fmt: str, batch_lines: int):
+    """Lists of about batch_lines lines; TSMC batches end before a header, never inside a record."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_lines:
+            if fmt == "tsmc":
+                cut = max((i for i, ln in enumerate(batch) if ln.startswith(":)/")), default=0)
+                if cut:
+                    yield batch[:cut]
+                    batch = batch[cut:]
+                continue
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _parse_batches(lines, fmt: str, name: str, with_entries: bool, batch_lines: int, miner=None):
+    """(entries or None, events, line count) of lines parsed batch by batch: only one batch of
+    lines and entries is alive at a time, whatever the input size. fmt is sniffed from the
+    first lines when None; lines no specific rule matched go to miner if given."""
+    entry_parts, event_parts, n_lines = [], [], 0
+    if fmt is None:
+        lines = iter(lines)
+        head = list(islice(lines, 50))
+        fmt = sniff_format(head)
+        lines = chain(head, lines)
+    # reading (and decompressing) happens while batches are drawn, so "read" includes it
+    batches = _record_batches(lines, fmt, batch_lines)
+    while True:
+        with profiling.stage("read", name) as rec:
+            batch = next(batches, None)
+            rec["rows"] = len(batch or ())
+        if batch is None:
+            break
+        with profiling.stage("parse", name) as rec:
+            entries = parse_log_frame(batch, fmt=fmt)
+            rec["rows"] = len(entries)
+        with profiling.stage("extract", name) as rec:
+            event_parts.append(extract_events_frame(entries, miner=miner))
+            rec["rows"] = len(event_parts[-1])
+        if with_entries:
+            entry_parts.append(entries)
+        n_lines += len(batch)
+    if not event_parts:
+        empty = parse_log_frame([])
+        entry_parts, event_parts = [empty], [extract_events_frame(empty)]
+    return (_concat(entry_parts) if with_entries else None), _concat(event_parts), n_lines
+
+
+def parse_range(path, start: int, end: int, fmt: str = None, with_entries: bool = False,
+                batch_lines: int = 200_000, miner=None):
+    """Worker: (entries or None, events, line count) of one byte range of a file, streamed
+    in batches of batch_lines lines."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        lines = iter_stream_lines(_RangeReader(fh, end - start))
+        return _parse_batches(lines, fmt, os.path.basename(str(path)), with_entries, batch_lines, miner)
+
+
+def parse_archive(path, with_entries: bool = False, batch_lines: int = 200_000, miner=None):
+    """Worker: (entries or None, events, line count) of all text members of a compressed
+    file/archive, decompressed on the fly; each member's format is sniffed on its own."""
+    parts = []
+    for member, fh in iter_archive_members(path):
+        name = f"{os.path.basename(str(path))}:{member}"
+        parts.append(_parse_batches(iter_stream_lines(fh), None, name, with_entries, batch_lines, miner))
+    if not parts:
+        return _parse_batches([], None, os.path.basename(str(path)), with_entries, batch_lines)
+    entries = _concat([p[0] for p in parts]) if with_entries else None
+    return entries, _concat([p[1] for p in parts]), sum(p[2] for p in parts)
+
+
+def _renumber(result, ids):
+    # a worker's template ids -> the file miner's (templates the worker evicted have none there)
+    renumbered = []
+    for frame in result[:2]:
+        if frame is not None and "Template ID" in frame.columns:
+            frame = frame.assign(**{"Template ID": frame["Template ID"].map(ids).astype("Int64")})
+        renumbered.append(frame)
+    return (*renumbered, result[2])
+
+
+def _parse_task(path, start, end, fmt, with_entries, miner=None):
+    if start is None:
+        return parse_archive(path, with_entries, miner=miner)
+    return parse_range(path, start, end, fmt, with_entries, miner=miner)
+
+
+def _worker_task(path, start, end, fmt, with_entries, profile, mine):
+    # in a worker process: record into a fresh profiler and miner and ship their numbers back
+    profiler = profiling.Profiler(trace_memory=profile) if profile is not None else None
+    miner = TemplateMiner(**mine) if mine is not None else None
+    profiling.activate(profiler)
+    try:
+        result = _parse_task(path, start, end, fmt, with_entries, miner)
+    finally:
+        profiling.deactivate()
+    return (result, profiler.as_dict() if profiler is not None else None,
+            (miner.rows(), miner.stats) if miner is not None else None)
+
+
+def parse_files_parallel(paths, workers: int = None, chunk_bytes: int = 32 * 1024 * 1024,
+                         min_parallel_bytes: int = 8 * 1024 * 1024, with_entries: bool = False,
+                         miners: dict = None):
+    """Parse many files at once; returns {path: (entries or None, events, line count)}.
+
+    Each file's format is sniffed once up front and passed to every range of that file;
+    compressed files and archives are parsed whole, one task each.
+    Below min_parallel_bytes in total the work runs in-process, where a pool would only
+    add start-up cost. Workers report to the caller's active profiler (utils.profiling).
+    miners maps paths to utils.templates.TemplateMiner objects that the lines no specific
+    rule matched are mined into, in the same pass.
+    """
+    tasks = []
+    total = 0
+    for path in dict.fromkeys(paths):
+        if archive_kind(path):
+            tasks.append((path, None, None, None))
+            total += os.path.getsize(path)
+            continue
+        fmt = sniff_format(list(islice(iter_file_lines(path), 50)))
+        for start, end in split_ranges(path, chunk_bytes, fmt):
+            tasks.append((path, start, end, fmt))
+            total += end - start
+
+    workers = workers or os.cpu_count() or 1
+    miners = miners or {}
+    if workers <= 1 or len(tasks) <= 1 or total < min_parallel_bytes:
+        results = [_parse_task(path, start, end, fmt, with_entries, miners.get(path))
+                   for path, start, end, fmt in tasks]
+    else:
+        profiler = profiling.active()
+        profile = profiler.trace_memory if profiler is not None else None
+        # spawned, not forked: forking a multi-threaded process (the Streamlit server) can
+        # deadlock the children on locks held by other threads
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_worker_task, path, start, end, fmt, with_entries, profile,
+                                   miners[path].settings() if path in miners else None)
+                       for path, start, end, fmt in tasks]
+            results = []
+            for (path, _, _, _), future in zip(tasks, futures):
+                result, worker_stats, templates = future.result()
+                if worker_stats is not None:
+                    profiler.merge(worker_stats)
+                if templates is not None:
+                    result = _renumber(result, miners[path].merge(*templates))
+                results.append(result)
+
+    merged = {}
+    for (path, _, _, _), (entries, events, n_lines) in zip(tasks, results):
+        merged.setdefault(path, []).append((entries, events, n_lines))
+    out = {}
+    for path, parts in merged.items():
+        entries = _concat([p[0] for p in parts]) if with_entries else None
+        events = _concat([p[1] for p in parts])
+        out[path] = (entries, events, sum(p[2] for p in parts))
+    return out
@@ -1,20 +1,15 @@
 # utils/parser.py
 # utils/parser.py
 import re
-from dateutil import parser as dtparser
-from datetime import datetime
-from typing import List, Dict
+import time
+from typing import Dict, Iterable, Iterator, List
+from utils import profiling
+from utils.archives import iter_archive_members
+from utils.formats import iter_format_entries
+from utils.timestamps import search_timestamp
 
-# Regex patterns
-re_mcscript_full = re.compile(
-    r'^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+'
-    r'(?P<level>[IEWF])\s+'
-    r'#(?P<thread>\d+)\s+'
-    r'(?P<comp>\S+)\s+'
-    r'(?P<msg>.*)$'
-)
-re_tsmc = re.compile(r'/\)(?P<date>\d{8})/(?P<time>\d{2}:\d{2}:\d{2}(?:\.\d+)?)')
-re_iso = re.compile(r'(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)')
+# Bump whenever parse/extract output changes: cached results (utils.cache) are keyed on it
+PARSER_VERSION = "7"
 
 # McScript subpatterns
 re_install_run = re.compile(r'RunScript.*ThreatPreventionInstall', re.IGNORECASE)
@@ -36,264 +31,199 @@ re_failed_symbol = re.compile(r'Could not find symbol for dereferencing\s+(\S+)'
 re_failed_generic = re.compile(r'Failed to|Could not|Error trace', re.IGNORECASE)
 
 def try_parse_datetime(text: str):
-    if not text:
-        return None
-    m = re_tsmc.search(text)
-    if m:
-        date = m.group("date")
-        time = m.group("time")
-        try:
-            time_part = time.split(".")[0]
-            return datetime.strptime(date + " " + time_part, "%Y%m%d %H:%M:%S")
-        except Exception:
-            pass
-    m = re_iso.search(text)
-    if m:
-        try:
-            return dtparser.parse(m.group("ts"))
-        except Exception:
-            pass
-    return None
-
-def parse_log_file(lines: List[str]) -> List[Dict]:
-    entries = []
-    for line in lines:
-        line = line.rstrip("\n")
-        # McScript structured
-        m = re_mcscript_full.match(line)
-        if m:
-            try:
-                ts = dtparser.parse(m.group("ts"))
-            except Exception:
-                ts = try_parse_datetime(line)
-            level = m.group("level")
-            thread = m.group("thread")
-            comp = m.group("comp")
-            msg = m.group("msg").strip()
-            entries.append({
-                "Timestamp": ts,
-                "Level": level,
-                "ThreadID": thread,
-                "Component": comp,
-                "Message": msg,
-                "Raw": line
-            })
-            continue
+    # TSMC `)/YYYYMMDD/HH:MM:SS.ffffff` or ISO `YYYY-MM-DD HH:MM:SS[.fff]`, sub-seconds kept
+    return search_timestamp(text)
+
+def iter_parsed_entries(lines: Iterable[str], keep_raw: bool = True, fmt: str = None) -> Iterator[Dict]:
+    """Lazily parse lines into entry dicts; "Raw" is left out when keep_raw is False.
+
+    The format (see utils.formats) is sniffed from the first lines unless fmt is given;
+    TSMC header/body pairs come out as a single entry.
+    """
+    return iter_format_entries(lines, keep_raw=keep_raw, fmt=fmt)
+
+def parse_log_file(lines: List[str], fmt: str = None) -> List[Dict]:
+    return list(iter_parsed_entries(lines, fmt=fmt))
+
+def iter_stream_lines(fh, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Yield the decoded lines of a binary stream read in chunks of chunk_size bytes.
+
+    Only the current chunk and one partial line are held in memory, so the size doesn't
+    matter. Undecodable bytes are dropped like read_text(errors="ignore").
+    """
+    tail = b""
+    while True:
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            break
+        parts = (tail + chunk).split(b"\n")
+        tail = parts.pop()
+        for raw in parts:
+            yield raw.decode("utf-8", errors="ignore").rstrip("\r")
+    if tail:
+        yield tail.decode("utf-8", errors="ignore").rstrip("\r")
+
+def iter_file_lines(path, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Yield the decoded lines of a file; compressed files and archives (utils.archives)
+    are decompressed on the fly, their members one after the other."""
+    for _, fh in iter_archive_members(path):
+        yield from iter_stream_lines(fh, chunk_size)
+
+def iter_log_file(path, keep_raw: bool = False, chunk_size: int = 1 << 20, fmt: str = None) -> Iterator[Dict]:
+    """Streaming counterpart of parse_log_file: parsed entries of a file, one at a time."""
+    return iter_parsed_entries(iter_file_lines(path, chunk_size), keep_raw=keep_raw, fmt=fmt)
+
+# Event rules, in priority order. "literals" are lower-case substrings of which at least one
+# must be present for "pattern" to match (used as a cheap prefilter). "device", "alarm",
+# "severity" and "message" may be callables taking (match, msg, row); "guard" is an extra check on msg.
+# "name" labels the rule in profiles (utils.profiling) when "alarm" isn't a fixed string;
+# "generic" rules catch unrelated messages under one alarm, so template mining still sees them.
+EVENT_RULES = [
+    # McScript informational events
+    {"pattern": re_install_run, "literals": ("runscript",),
+     "device": "Endpoint", "alarm": "INSTALL_RUN", "severity": "Info", "status": "Started"},
+    {"pattern": re_start_marker, "literals": ("start",), "guard": lambda msg: "START" in msg,
+     "device": "Endpoint", "alarm": "SCRIPT_START", "severity": "Info", "status": "Started"},
+    {"pattern": re_key_imported, "literals": ("key imported successfully",),
+     "device": "Endpoint", "alarm": "KEY_IMPORTED", "severity": "Info", "status": "OK"},
+    {"pattern": re_msgbus_connected, "literals": ("msgbus connectvity status",),
+     "device": "Endpoint", "alarm": "MSGBUS_CONNECTED", "severity": "Info", "status": "OK"},
+    {"pattern": re_added_file_watcher, "literals": ("added file watcher",),
+     "device": "Endpoint", "alarm": "FILE_WATCHER_ADDED", "severity": "Info", "status": "OK"},
+    {"pattern": re_no_of_products, "literals": ("no of products to be installed",),
+     "device": "Endpoint", "alarm": "PRODUCT_COUNT", "severity": "Info", "status": "Info",
+     "message": lambda m, msg, row: f"No of products to be installed: {m.group(1)}"},
+    {"pattern": re_version_info, "literals": ("got build version",),
+     "device": "Endpoint", "alarm": "BUILD_VERSION", "severity": "Info", "status": "Info",
+     "message": lambda m, msg, row: f"Build Version: {m.group(1)}"},
+    {"pattern": re_spec_success, "literals": ("getting spec file from policy successfully",),
+     "device": "Endpoint", "alarm": "SPECFILE_OK", "severity": "Info", "status": "Info"},
+    # TSMC alarms & restarts
+    {"name": "ALARM_RAISED", "pattern": re_alarm_raised, "literals": ("alarm",),
+     "device": "TSMC", "alarm": lambda m, msg, row: m.group(1), "severity": "Unknown", "status": "Raised"},
+    {"name": "ALARM_TERMINATED", "pattern": re_alarm_terminated, "literals": ("alarm",),
+     "device": "TSMC", "alarm": lambda m, msg, row: m.group(1), "severity": "Unknown", "status": "Terminated"},
+    {"pattern": re_uncontrolled_restart, "literals": ("uncontrolled restart",),
+     "device": "TSMC", "alarm": "UNCONTROLLED_RESTART", "severity": "Critical", "status": "Occurred"},
+    {"pattern": re_controlled_restart, "literals": ("controlled restart",),
+     "device": "TSMC", "alarm": "CONTROLLED_RESTART", "severity": "Info", "status": "Occurred"},
+    {"name": "SYS_ERR", "pattern": re_software_err, "literals": ("software error. system error",),
+     "device": "TSMC", "alarm": lambda m, msg, row: f"SYS_ERR_{m.group(1)}",
+     "severity": lambda m, msg, row: "Critical" if m.group(1) != "0" else "Warning", "status": "Occurred"},
+    {"name": "INSTALL_FAIL", "pattern": re_failed_symbol, "literals": ("could not find symbol for dereferencing",),
+     "device": "Endpoint", "alarm": lambda m, msg, row: f"INSTALL_FAIL_{m.group(1)}",
+     "severity": "Critical", "status": "Failed"},
+    {"pattern": re_failed_generic, "literals": ("failed to", "could not", "error trace"), "generic": True,
+     "device": lambda m, msg, row: "TSMC" if "TSMC" in (row.get("Raw", "") or "") else "Endpoint",
+     "alarm": "FAILED_ACTION", "severity": "Warning", "status": "Occurred"},
+]
+
+# One alternation over the literals of every rule, run on the lower-cased message: a single
+# scan rejects the (vast majority of) lines that match nothing, only hits go through the
+# ordered per-rule dispatch. Keeps the priority order of the old if/continue cascade.
+re_event_prefilter = re.compile(
+    "|".join(re.escape(lit) for lit in dict.fromkeys(
+        lit for rule in EVENT_RULES for lit in rule["literals"]
+    ))
+)
 
-        # Fallback for TSMC style and others
-        ts = try_parse_datetime(line)
-        level = None
-        if "/W/" in line or " W/" in line or " W " in line:
-            level = "W"
-        elif "/I/" in line or " I/" in line or " I " in line:
-            level = "I"
-        elif "/F/" in line or " F/" in line or " F " in line:
-            level = "F"
-        comp_match = re.search(r'//(?P<comp>[^/]+)/', line)
-        comp = comp_match.group("comp") if comp_match else None
-        entries.append({
-            "Timestamp": ts,
-            "Level": level,
-            "ThreadID": None,
-            "Component": comp,
-            "Message": line.strip(),
-            "Raw": line
-        })
-    return entries
-
-def extract_alarm_events(parsed_entries) -> List[Dict]:
-    events = []
-    # accept DataFrame-like or list
-    if hasattr(parsed_entries, "iterrows"):
-        parsed_entries = [r[1].to_dict() for r in parsed_entries.iterrows()]
 
+RULE_NAMES = [rule.get("name", rule["alarm"]) for rule in EVENT_RULES]
+
+
+def _rule_field(value, m, msg, row):
+    return value(m, msg, row) if callable(value) else value
+
+
+def match_event_rule(msg: str):
+    """Return (rule, match) for the highest-priority rule matching msg, or (None, None)."""
+    low = msg.lower()
+    if not re_event_prefilter.search(low):
+        return None, None
+    for rule in EVENT_RULES:
+        if not any(lit in low for lit in rule["literals"]):
+            continue
+        m = rule["pattern"].search(msg)
+        if m and (rule.get("guard") is None or rule["guard"](msg)):
+            return rule, m
+    return None, None
+
+
+def _match_event_rule_profiled(msg: str):
+    """match_event_rule that reports prefilter/rule hits and match time to the active profiler."""
+    low = msg.lower()
+    t0 = time.perf_counter()
+    passed = re_event_prefilter.search(low) is not None
+    profiling.record_rule("prefilter", int(passed), time.perf_counter() - t0)
+    if not passed:
+        return None, None
+    for rule, name in zip(EVENT_RULES, RULE_NAMES):
+        if not any(lit in low for lit in rule["literals"]):
+            continue
+        t0 = time.perf_counter()
+        m = rule["pattern"].search(msg)
+        hit = m is not None and (rule.get("guard") is None or rule["guard"](msg))
+        profiling.record_rule(name, int(hit), time.perf_counter() - t0)
+        if hit:
+            return rule, m
+    return None, None
+
+
+def build_event(rule, m, msg: str, row, ts) -> Dict:
+    return {
+        "Device Name": _rule_field(rule["device"], m, msg, row),
+        "Component": row.get("Component"),
+        "Alarm Name": _rule_field(rule["alarm"], m, msg, row),
+        "Severity": _rule_field(rule["severity"], m, msg, row),
+        "Status": rule["status"],
+        "Raise Date": ts,
+        "Terminated Date": ts,
+        "Message": _rule_field(rule.get("message"), m, msg, row) or msg,
+    }
+
+
+def iter_alarm_events(parsed_entries: Iterable[Dict], miner=None) -> Iterator[Dict]:
+    """Events of parsed entries; messages left to no or a generic rule go to miner
+    (a utils.templates.TemplateMiner) if given, and their entry (and event, for a generic
+    rule) gets the "Template ID" and "Params" the miner assigned."""
+    match = match_event_rule if profiling.active() is None else _match_event_rule_profiled
     for row in parsed_entries:
         msg = (row.get("Message") or "")[:2000]
-        ts = row.get("Timestamp") or try_parse_datetime(row.get("Raw", ""))
-
-        # McScript informational events
-        if re_install_run.search(msg):
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "INSTALL_RUN",
-                "Severity": "Info",
-                "Status": "Started",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-        if re_start_marker.search(msg) and "START" in msg:
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "SCRIPT_START",
-                "Severity": "Info",
-                "Status": "Started",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-        if re_key_imported.search(msg):
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "KEY_IMPORTED",
-                "Severity": "Info",
-                "Status": "OK",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-        if re_msgbus_connected.search(msg):
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "MSGBUS_CONNECTED",
-                "Severity": "Info",
-                "Status": "OK",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-        if re_added_file_watcher.search(msg):
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "FILE_WATCHER_ADDED",
-                "Severity": "Info",
-                "Status": "OK",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-        mprod = re_no_of_products.search(msg)
-        if mprod:
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "PRODUCT_COUNT",
-                "Severity": "Info",
-                "Status": "Info",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": f"No of products to be installed: {mprod.group(1)}"
-            })
-            continue
-        mver = re_version_info.search(msg)
-        if mver:
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "BUILD_VERSION",
-                "Severity": "Info",
-                "Status": "Info",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": f"Build Version: {mver.group(1)}"
-            })
-            continue
-        if re_spec_success.search(msg):
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": "SPECFILE_OK",
-                "Severity": "Info",
-                "Status": "Info",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        # TSMC alarms & restarts
-        m = re_alarm_raised.search(msg)
-        if m:
-            events.append({
-                "Device Name": "TSMC",
-                "Alarm Name": m.group(1),
-                "Severity": "Unknown",
-                "Status": "Raised",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        m2 = re_alarm_terminated.search(msg)
-        if m2:
-            events.append({
-                "Device Name": "TSMC",
-                "Alarm Name": m2.group(1),
-                "Severity": "Unknown",
-                "Status": "Terminated",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        if re_uncontrolled_restart.search(msg):
-            events.append({
-                "Device Name": "TSMC",
-                "Alarm Name": "UNCONTROLLED_RESTART",
-                "Severity": "Critical",
-                "Status": "Occurred",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        if re_controlled_restart.search(msg):
-            events.append({
-                "Device Name": "TSMC",
-                "Alarm Name": "CONTROLLED_RESTART",
-                "Severity": "Info",
-                "Status": "Occurred",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        m3 = re_software_err.search(msg)
-        if m3:
-            code = m3.group(1)
-            events.append({
-                "Device Name": "TSMC",
-                "Alarm Name": f"SYS_ERR_{code}",
-                "Severity": "Critical" if code != "0" else "Warning",
-                "Status": "Occurred",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
+        rule, m = match(msg)
+        mined = miner is not None and (rule is None or rule.get("generic"))
+        if mined:
+            row["Template ID"], row["Params"] = miner.add(msg, row.get("Timestamp"))
+        if rule is None:
             continue
-
-        m_sym = re_failed_symbol.search(msg)
-        if m_sym:
-            symbol = m_sym.group(1)
-            events.append({
-                "Device Name": "Endpoint",
-                "Alarm Name": f"INSTALL_FAIL_{symbol}",
-                "Severity": "Critical",
-                "Status": "Failed",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-        if re_failed_generic.search(msg):
-            events.append({
-                "Device Name": "TSMC" if "TSMC" in (row.get("Raw","") or "") else "Endpoint",
-                "Alarm Name": "FAILED_ACTION",
-                "Severity": "Warning",
-                "Status": "Occurred",
-                "Raise Date": ts,
-                "Terminated Date": ts,
-                "Message": msg
-            })
-            continue
-
-    return events
+        ts = row.get("Timestamp") or try_parse_datetime(row.get("Raw", ""))
+        event = build_event(rule, m, msg, row, ts)
+        if mined:
+            event["Template ID"], event["Params"] = row["Template ID"], row["Params"]
+        yield event
 
 
+def extract_alarm_events(parsed_entries) -> List[Dict]:
+    # accept DataFrame-like or list; frames are matched column-wise (see utils.columnar)
+    if hasattr(parsed_entries, "iterrows"):
+        from utils.columnar import extract_events_frame
+        events = extract_events_frame(parsed_entries)
+        return events.astype(object).where(events.notna(), None).to_dict("records")
+    return list(iter_alarm_events(parsed_entries))
+
+
+def stream_alarm_events(path, stats: Dict = None, chunk_size: int = 1 << 20, fmt: str = None,
+                        miner=None) -> Iterator[Dict]:
+    """Parse a file lazily and yield its events; lines are dropped as soon as they are classified.
+
+    If given, stats["lines"] is updated with the number of lines read so far, and miner
+    mines the messages no specific rule matched (see iter_alarm_events).
+    """
+    def lines():
+        for n, line in enumerate(iter_file_lines(path, chunk_size), 1):
+            if stats is not None:
+                stats["lines"] = n
+            yield line
+
+    if stats is not None:
+        stats["lines"] = 0
+    return iter_alarm_events(iter_parsed_entries(lines(), keep_raw=True, fmt=fmt), miner=miner)
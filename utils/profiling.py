@@ -0,0 +1,154 @@
+# utils/profiling.py
+# Opt-in pipeline instrumentation. A Profiler records wall time, rows and (optionally, via
+# tracemalloc) peak memory per stage and file, plus hits and match time per event rule.
+# Code reports through the module-level helpers (stage, record_rule), which do nothing
+# unless a profiler is active in the current thread -- Streamlit runs each session in its
+# own thread, so sessions never see each other's numbers.
+#
+# Memory is the exception: tracemalloc is process-wide, so a stage's peak_mb is the peak of
+# all allocations in the process while the stage ran (other sessions' included), above the
+# traced memory when it started. Tracing runs while any profiler with trace_memory is started.
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+# shared tracemalloc state, guarded by _trace_lock
+_trace_lock = threading.Lock()
+_tracers = 0  # started profilers that trace memory
+_owns_tracing = False  # tracing was started here (not by the host), so it is stopped here too
+_open_peaks = {}  # id(stage record) -> peak bytes so far, for every open traced stage in the process
+
+
+def _tracemalloc():
+    # imported on demand: it drags in pickle/fnmatch and only matters when memory is traced
+    import tracemalloc
+    return tracemalloc
+
+
+class Profiler:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.rules = {}
+        self._tracing = False
+
+    def start(self):
+        global _tracers, _owns_tracing
+        if not self.trace_memory or self._tracing:
+            return
+        tracemalloc = _tracemalloc()
+        with _trace_lock:
+            if _tracers == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _owns_tracing = True
+            _tracers += 1
+        self._tracing = True
+
+    def stop(self):
+        global _tracers, _owns_tracing
+        if not self._tracing:
+            return
+        with _trace_lock:
+            _tracers -= 1
+            if _tracers == 0 and _owns_tracing:
+                _tracemalloc().stop()
+                _owns_tracing = False
+        self._tracing = False
+
+    @contextmanager
+    def stage(self, name, file=None):
+        rec = {"stage": name, "file": file, "seconds": 0.0, "rows": None, "peak_mb": None}
+        tracing = self._tracing
+        if tracing:
+            tracemalloc = _tracemalloc()
+            with _trace_lock:
+                # the peak is reset for this stage: fold it into every stage still open first
+                base, peak = tracemalloc.get_traced_memory()
+                for key in _open_peaks:
+                    _open_peaks[key] = max(_open_peaks[key], peak)
+                tracemalloc.reset_peak()
+                _open_peaks[id(rec)] = 0
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+            if tracing:
+                with _trace_lock:
+                    peak = max(_open_peaks.pop(id(rec)), tracemalloc.get_traced_memory()[1])
+                rec["peak_mb"] = max(peak - base, 0) / 2**20
+            self.stages.append(rec)
+
+    def record_stage(self, name, seconds, file=None, rows=None):
+        """Add a stage that was timed elsewhere (no memory figure)."""
+        self.stages.append({"stage": name, "file": file, "seconds": seconds, "rows": rows, "peak_mb": None})
+
+    def record_rule(self, name, hits, seconds):
+        stats = self.rules.setdefault(name, {"rule": name, "hits": 0, "seconds": 0.0})
+        stats["hits"] += hits
+        stats["seconds"] += seconds
+
+    def merge(self, data):
+        """Add the numbers of another profiler's as_dict() (e.g. from a worker process)."""
+        self.stages.extend(data["stages"])
+        for rule in data["rules"]:
+            self.record_rule(rule["rule"], rule["hits"], rule["seconds"])
+
+    def stage_totals(self):
+        """Stages summed per (stage, file): calls, seconds, rows, largest peak_mb."""
+        totals = {}
+        for rec in self.stages:
+            tot = totals.setdefault((rec["stage"], rec["file"]), {
+                "stage": rec["stage"], "file": rec["file"], "calls": 0, "seconds": 0.0, "rows": None, "peak_mb": None})
+            tot["calls"] += 1
+            tot["seconds"] += rec["seconds"]
+            if rec["rows"] is not None:
+                tot["rows"] = (tot["rows"] or 0) + rec["rows"]
+            if rec["peak_mb"] is not None:
+                tot["peak_mb"] = max(tot["peak_mb"] or 0.0, rec["peak_mb"])
+        return list(totals.values())
+
+    def as_dict(self):
+        return {"trace_memory": self.trace_memory, "stages": list(self.stages),
+                "rules": sorted(self.rules.values(), key=lambda r: -r["seconds"])}
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=1, default=str)
+
+
+def active():
+    """The profiler activated in this thread, or None."""
+    return getattr(_local, "profiler", None)
+
+
+def activate(profiler):
+    _local.profiler = profiler
+    if profiler is not None:
+        profiler.start()
+
+
+def deactivate():
+    profiler = active()
+    if profiler is not None:
+        profiler.stop()
+    _local.profiler = None
+
+
+@contextmanager
+def stage(name, file=None):
+    """Time a block on the active profiler; yields the record dict (set "rows" on it)."""
+    profiler = active()
+    if profiler is None:
+        yield {}
+        return
+    with profiler.stage(name, file) as rec:
+        yield rec
+
+
+def record_rule(name, hits, seconds):
+    profiler = active()
+    if profiler is not None:
+        profiler.record_rule(name, hits, seconds)
@@ -0,0 +1,85 @@
+# utils/search.py
+# Trigram inverted index over event text columns. Event messages repeat a lot, so each
+# column is factorized first and only the distinct values are indexed; a query intersects
+# the posting lists of its trigrams, verifies the few candidate values with a substring
+# check and maps them back to rows through the factorized codes.
+import re
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+_REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def is_regex(query: str) -> bool:
+    return bool(_REGEX_CHARS & set(query))
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _ColumnIndex:
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values.fillna("").astype(str), sort=False)
+        self.codes = codes
+        self.values = [u.lower() for u in uniques]
+        postings: Dict[str, list] = {}
+        for uid, text in enumerate(self.values):
+            for gram in _trigrams(text):
+                postings.setdefault(gram, []).append(uid)
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self._all = np.arange(len(self.values), dtype=np.int64)
+
+    def _candidates(self, term: str):
+        grams = _trigrams(term)
+        if not grams:
+            return self._all  # too short for a trigram: check every distinct value
+        lists = sorted((self.postings.get(g) for g in grams), key=lambda a: 0 if a is None else len(a))
+        if lists[0] is None:
+            return self._all[:0]
+        ids = lists[0]
+        for other in lists[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+            if not len(ids):
+                break
+        return ids
+
+    def matching_values(self, term: str):
+        term = term.lower()
+        return np.asarray([uid for uid in self._candidates(term) if term in self.values[uid]], dtype=np.int64)
+
+    def rows(self, value_ids) -> np.ndarray:
+        hit = np.zeros(len(self.values), dtype=bool)
+        hit[value_ids] = True
+        return hit[self.codes]
+
+
+class EventIndex:
+    """Search index over the text columns of an events frame (row positions, not labels)."""
+
+    def __init__(self, events_df: pd.DataFrame, columns: Iterable[str] = ("Message", "Alarm Name")):
+        self.n_rows = len(events_df)
+        self.columns = {col: _ColumnIndex(events_df[col]) for col in columns if col in events_df.columns}
+        self._frame = events_df
+
+    def mask(self, column: str, query: str, mode: str = "phrase") -> np.ndarray:
+        """Boolean row mask of case-insensitive matches of query in column.
+
+        mode "phrase" matches the whole query as a substring (like str.contains), "all"
+        requires every whitespace-separated term. Queries with regex metacharacters fall
+        back to a regex scan of the column.
+        """
+        if not query:
+            return np.ones(self.n_rows, dtype=bool)
+        if column not in self.columns or is_regex(query):
+            values = self._frame[column].astype(str)
+            return values.str.contains(query, case=False, na=False, flags=re.IGNORECASE).to_numpy(dtype=bool)
+        col = self.columns[column]
+        terms = query.split() if mode == "all" else [query]
+        value_ids = None
+        for term in terms:
+            ids = col.matching_values(term)
+            value_ids = ids if value_ids is None else np.intersect1d(value_ids, ids, assume_unique=True)
+        return col.rows(value_ids)
@@ -0,0 +1,222 @@
+# utils/store.py
+# Optional on-disk event store (SQLite, stdlib only). Extracted events are bulk-inserted once
+# per file version; the sidebar filters become a WHERE clause, and the app only loads the
+# page of rows it shows, or aggregated bins for the charts. Memory use then depends on
+# the page size, not on how much history is stored.
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+from utils.aggregate import MAX_POINTS, choose_bucket, fold_series, rebin, timeline_buckets
+from utils.columnar import EVENT_COLUMNS
+from utils.search import is_regex
+
+# events frame column -> table column; dates are stored as integer microseconds since the epoch
+_COLUMNS = {
+    "Device Name": "device", "Component": "component", "Alarm Name": "alarm", "Severity": "severity", "Status": "status",
+    "Raise Date": "raise_us", "Terminated Date": "terminated_us", "Message": "message",
+}
+_DATE_COLUMNS = ("Raise Date", "Terminated Date")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    device TEXT, component TEXT, alarm TEXT, severity TEXT, status TEXT,
+    raise_us INTEGER, terminated_us INTEGER, message TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_events_raise ON events (raise_us);
+-- matches the ORDER BY of EventStore._ordered, so a page is read without sorting the whole match
+CREATE INDEX IF NOT EXISTS ix_events_order ON events (raise_us IS NULL, raise_us, id);
+CREATE INDEX IF NOT EXISTS ix_events_severity ON events (severity);
+CREATE INDEX IF NOT EXISTS ix_events_alarm ON events (alarm);
+-- covers the chart aggregations (bins per alarm/severity) without touching the table
+CREATE INDEX IF NOT EXISTS ix_events_file ON events (source_file, raise_us, alarm, severity);
+CREATE TABLE IF NOT EXISTS files (
+    source_file TEXT PRIMARY KEY,
+    file_key TEXT NOT NULL,
+    lines INTEGER,
+    events INTEGER
+);
+"""
+
+
+@lru_cache(maxsize=64)
+def _compiled(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern, value):
+    return value is not None and _compiled(pattern).search(value) is not None
+
+
+def _to_us(value):
+    return pd.Timestamp(value).value // 1000
+
+
+class EventStore:
+    def __init__(self, db_path):
+        self.path = str(db_path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self._lock = threading.RLock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            # stores created before events had a component; their files are reinserted anyway,
+            # since the bump of PARSER_VERSION changed every file_key
+            if "component" not in {row[1] for row in self._conn.execute("PRAGMA table_info(events)")}:
+                self._conn.execute("ALTER TABLE events ADD COLUMN component TEXT")
+
+    # ingestion
+    def file_key(self, source_file):
+        row = self._conn.execute("SELECT file_key FROM files WHERE source_file = ?", (source_file,)).fetchone()
+        return row[0] if row else None
+
+    def insert_events(self, source_file, file_key, events_df: pd.DataFrame, lines: int = 0):
+        """Replace the stored events of source_file with events_df (one transaction)."""
+        df = events_df.reindex(columns=EVENT_COLUMNS)
+        cols = {}
+        for col in EVENT_COLUMNS:
+            if col in _DATE_COLUMNS:
+                dates = pd.to_datetime(df[col], errors="coerce").astype("datetime64[us]")
+                cols[col] = pd.Series(dates.to_numpy().view("int64"), index=df.index).astype(object).where(dates.notna(), None)
+            else:
+                cols[col] = df[col].astype(object).where(df[col].notna(), None)
+        rows = zip([source_file] * len(df), *(cols[c] for c in EVENT_COLUMNS))
+        names = ", ".join(_COLUMNS[c] for c in EVENT_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events WHERE source_file = ?", (source_file,))
+            self._conn.executemany(f"INSERT INTO events (source_file, {names}) VALUES (?, {', '.join('?' * len(EVENT_COLUMNS))})", rows)
+            self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (source_file, file_key, lines, len(df)))
+
+    def file_summaries(self, files):
+        marks = ", ".join("?" * len(files))
+        rows = self._conn.execute(f"SELECT source_file, lines, events FROM files WHERE source_file IN ({marks})", list(files))
+        found = {name: {"lines": lines, "events": events} for name, lines, events in rows}
+        return {name: found[name] for name in files if name in found}
+
+    # filtering
+    @staticmethod
+    def where(files=None, start=None, end=None, severities=None, alarm_name="", text="", statuses=None):
+        """(WHERE clause, params) for the same filters as utils.filters.filter_events."""
+        clauses, params = [], []
+        if files is not None:
+            clauses.append(f"source_file IN ({', '.join('?' * len(files))})")
+            params += list(files)
+        if start is not None:
+            clauses.append("raise_us >= ?")
+            params.append(_to_us(start))
+        if end is not None:
+            clauses.append("raise_us <= ?")
+            params.append(_to_us(end))
+        for column, values in (("severity", severities), ("status", statuses)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params += list(values)
+        for column, query in (("alarm", alarm_name), ("message", text)):
+            if query:
+                # REGEXP for plain substrings too: LIKE only ignores the case of ASCII letters
+                clauses.append(f"{column} REGEXP ?")
+                params.append(query if is_regex(query) else re.escape(query))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters) -> int:
+        where, params = self.where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def date_range(self, **filters):
+        where, params = self.where(**filters)
+        with self._lock:
+            lo, hi = self._conn.execute(f"SELECT MIN(raise_us), MAX(raise_us) FROM events{where}", params).fetchone()
+        return (pd.NaT, pd.NaT) if lo is None else (pd.Timestamp(lo, unit="us"), pd.Timestamp(hi, unit="us"))
+
+    def distinct(self, column, **filters):
+        where, params = self.where(**filters)
+        col = _COLUMNS[column]
+        with self._lock:
+            rows = self._conn.execute(f"SELECT DISTINCT {col} FROM events{where}", params).fetchall()
+        return sorted(r[0] for r in rows if r[0] is not None)
+
+    def _frame(self, rows):
+        df = pd.DataFrame.from_records(rows, columns=["source_file"] + EVENT_COLUMNS)
+        for col in _DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col].astype("Int64"), unit="us")
+        return df[EVENT_COLUMNS + ["source_file"]]
+
+    def _ordered(self, **filters):
+        # Raise Date order, missing dates last (ix_events_order walks the same order)
+        where, params = self.where(**filters)
+        names = ", ".join(_COLUMNS[c] for c in EVENT_COLUMNS)
+        sql = f"SELECT source_file, {names} FROM events{where} ORDER BY raise_us IS NULL, raise_us, id"
+        return sql, params
+
+    def query(self, limit=None, offset=0, **filters) -> pd.DataFrame:
+        """Matching events ordered by Raise Date (missing dates last), optionally one page."""
+        sql, params = self._ordered(**filters)
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit, offset]
+        with self._lock:
+            return self._frame(self._conn.execute(sql, params).fetchall())
+
+    def iter_query(self, chunk_rows: int = 50_000, **filters):
+        """All of query() as frames of chunk_rows rows (for exports); one empty frame if nothing matches."""
+        sql, params = self._ordered(**filters)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            yield self._frame([])
+        while rows:
+            yield self._frame(rows)
+            with self._lock:
+                rows = cursor.fetchmany(chunk_rows)
+
+    def bin_events(self, freq: str, by=("Alarm Name", "Severity"), **filters) -> pd.DataFrame:
+        """SQL counterpart of utils.aggregate.bin_events (fixed-width buckets from the epoch)."""
+        step = pd.Timedelta(freq) // pd.Timedelta("1us")
+        where, params = self.where(**filters)
+        where = (where + " AND" if where else " WHERE") + " raise_us IS NOT NULL"
+        keys = ", ".join(_COLUMNS[c] for c in by)
+        sql = (f"SELECT (raise_us / ?) * ? AS bucket, {keys}, COUNT(*), MIN(raise_us), MAX(raise_us) "
+               f"FROM events{where} GROUP BY bucket, {keys} ORDER BY bucket, {keys}")
+        with self._lock:
+            rows = self._conn.execute(sql, [step, step] + params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=["bucket"] + list(by) + ["count", "first", "last"])
+        for col in ("bucket", "first", "last"):
+            df[col] = pd.to_datetime(df[col].astype("int64"), unit="us")
+        return df
+
+    def chart_data(self, **filters):
+        """(timeline, (counts, label)) shaped like the in-memory chart data, with one SQL
+        aggregation pass; coarser bins are derived from it when the sizes divide evenly."""
+        lo, hi = self.date_range(**filters)
+        freq, label = choose_bucket(lo, hi, target_buckets=200)
+        if self.count(**filters) <= MAX_POINTS:
+            timeline = ("points", self.query(**filters).dropna(subset=["Raise Date"]), None)
+            binned = None
+        else:
+            binned = self.bin_events(freq, **filters)
+            n_series = len(binned[["Alarm Name", "Severity"]].drop_duplicates())
+            t_freq, t_label = choose_bucket(lo, hi, target_buckets=timeline_buckets(n_series))
+            timeline = ("bins", fold_series(self._coarser(binned, freq, t_freq, filters)), t_label)
+        c_freq, c_label = choose_bucket(lo, hi, target_buckets=60)
+        if binned is None:
+            counts = self.bin_events(c_freq, by=("Alarm Name",), **filters)
+        else:
+            counts = self._coarser(binned, freq, c_freq, filters, by=("Alarm Name",))
+        return timeline, (counts, c_label)
+
+    def _coarser(self, binned, freq, new_freq, filters, by=("Alarm Name", "Severity")):
+        if pd.Timedelta(new_freq) % pd.Timedelta(freq) == pd.Timedelta(0):
+            return rebin(binned, new_freq, by=by)
+        return self.bin_events(new_freq, by=by, **filters)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,165 @@
+# utils/templates.py
+# Online log-template mining (Drain-style) for the lines no specific event rule explains.
+# Messages are tokenized on whitespace, tokens containing a digit become "<*>" parameters,
+# and a fixed-depth prefix tree (token count, then the first few constant tokens) narrows each
+# message down to a short list of templates to compare against. A message joins the most
+# similar template if enough tokens agree (differing positions turn into "<*>"), otherwise
+# it starts a new one. Templates are kept in an LRU capped at max_templates (evicting one also
+# prunes the tree nodes it leaves empty), so memory stays bounded however many lines go through.
+# Miners fed separately (per file, per worker process) are combined with merge().
+# Stdlib only; to_frame() imports pandas on demand.
+import re
+from collections import OrderedDict
+
+WILDCARD = "<*>"
+TEMPLATE_COLUMNS = ["Template ID", "Template", "Count", "First Seen", "Last Seen"]
+
+# a whitespace-delimited token with a digit in it: ids, counters, versions, addresses
+re_variable_token = re.compile(r"\S*\d\S*")
+
+_LEAF = object()  # key of a tree node's template list
+
+
+class TemplateMiner:
+    def __init__(self, depth: int = 4, similarity: float = 0.5, max_children: int = 100,
+                 max_templates: int = 5000):
+        self.depth = max(depth, 3)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.templates = OrderedDict()  # id -> template dict, least recently matched first
+        self._root = {}
+        self._next_id = 1
+        self.stats = {"lines": 0, "templates": 0, "evicted": 0}
+
+    def settings(self):
+        """Constructor arguments of this miner (to build an empty one alike, e.g. in a worker)."""
+        return {"depth": self.depth, "similarity": self.similarity, "max_children": self.max_children,
+                "max_templates": self.max_templates}
+
+    def _route(self, tokens):
+        # token count, then the first constant tokens; parameters are skipped: lines often
+        # start with timestamps/ids, which would send everything down the same branch
+        return [str(len(tokens))] + [t for t in tokens if t != WILDCARD][:self.depth - 2]
+
+    def _leaf(self, route):
+        """(template id list, [(node, key), ...] from the root down to it) for a _route()."""
+        path = [(self._root, int(route[0]))]
+        node = self._root.setdefault(int(route[0]), {})
+        for tok in route[1:]:
+            if tok not in node and len(node) >= self.max_children:
+                tok = WILDCARD  # overflowing branches share one wildcard child
+            path.append((node, tok))
+            node = node.setdefault(tok, {})
+        path.append((node, _LEAF))
+        return node.setdefault(_LEAF, []), path
+
+    def _evict(self):
+        _, old = self.templates.popitem(last=False)
+        path = old["path"]
+        path[-1][0][_LEAF].remove(old["id"])
+        # prune the nodes left empty, so the tree doesn't outgrow max_templates either
+        for node, key in reversed(path):
+            if node[key]:
+                break
+            del node[key]
+        self.stats["evicted"] += 1
+
+    def _best(self, leaf, tokens):
+        best, best_score = None, -1.0
+        for tid in leaf:
+            tpl = self.templates[tid]["tokens"]
+            same = params = 0
+            for a, b in zip(tpl, tokens):
+                if a == b:
+                    same += 1
+                elif a == WILDCARD:
+                    params += 1
+            score = same / len(tokens) if tokens else 1.0
+            # ties go to the more general template
+            if score > best_score or (score == best_score and params > best["params"]):
+                best, best_score = {"id": tid, "params": params}, score
+        return (best["id"], best_score) if best else (None, 0.0)
+
+    def add(self, message: str, timestamp=None):
+        """Assign message to a template; returns (template id, list of parameter values)."""
+        self.stats["lines"] += 1
+        words = message.split()
+        tpl = self._assign(re_variable_token.sub(WILDCARD, message).split(), 1, timestamp, timestamp)
+        return tpl["id"], [w for w, t in zip(words, tpl["tokens"]) if t == WILDCARD]
+
+    def _assign(self, tokens, count, first, last, route=None):
+        route = route or self._route(tokens)
+        leaf, path = self._leaf(route)
+        tid, score = self._best(leaf, tokens)
+        if tid is not None and score >= self.similarity:
+            tpl = self.templates[tid]
+            tpl["tokens"] = [a if a == b else WILDCARD for a, b in zip(tpl["tokens"], tokens)]
+            tpl["count"] += count
+            if first is not None:
+                tpl["first"] = first if tpl["first"] is None else min(tpl["first"], first)
+            if last is not None:
+                tpl["last"] = last if tpl["last"] is None else max(tpl["last"], last)
+            self.templates.move_to_end(tid)
+            return tpl
+        tid = self._next_id
+        self._next_id += 1
+        tpl = {"id": tid, "tokens": tokens, "count": count, "first": first, "last": last, "path": path,
+               "route": [str(key) for _, key in path[:-1]]}
+        self.templates[tid] = tpl
+        leaf.append(tid)
+        self.stats["templates"] += 1
+        if len(self.templates) > self.max_templates:
+            self._evict()
+        return tpl
+
+    def merge(self, rows, stats=None):
+        """Fold templates mined elsewhere (rows() of another miner: per file, per worker) into
+        this one, as if their lines had been added here; stats are that miner's stats. Returns
+        {their template id: id here}, to renumber the lines they assigned."""
+        # least frequent first: the frequent ones end up most recently used, last to be evicted
+        rows = sorted(rows, key=lambda r: r["Count"])
+        ids = {}
+        for row in rows:
+            # a template goes down the branch its first line took there (wildcard children of
+            # full nodes included), not the one its by now more general tokens would take
+            route = row["Route"].split() if row.get("Route") else None
+            tpl = self._assign(row["Template"].split(), row["Count"], row["First Seen"], row["Last Seen"], route)
+            ids[row["Template ID"]] = tpl["id"]
+        if stats is not None:
+            self.stats["lines"] += stats["lines"]
+            self.stats["evicted"] += stats["evicted"]
+        else:
+            self.stats["lines"] += sum(row["Count"] for row in rows)
+        return ids
+
+    def rows(self):
+        """Current templates as dicts (TEMPLATE_COLUMNS, plus the "Route" merge() needs),
+        most frequent first."""
+        out = [{"Template ID": t["id"], "Template": " ".join(t["tokens"]), "Count": t["count"],
+                "First Seen": t["first"], "Last Seen": t["last"], "Route": " ".join(t["route"])}
+               for t in self.templates.values()]
+        return sorted(out, key=lambda r: (-r["Count"], r["Template ID"]))
+
+    def to_frame(self, route: bool = False):
+        """TEMPLATE_COLUMNS as a frame; with route, one that merge_frame() can fold in as well as rows()."""
+        import pandas as pd
+        df = pd.DataFrame(self.rows(), columns=TEMPLATE_COLUMNS + (["Route"] if route else []))
+        for col in ("First Seen", "Last Seen"):
+            df[col] = pd.to_datetime(df[col])
+        return df
+
+    def merge_frame(self, df, stats=None):
+        """merge() for a to_frame(route=True) result (e.g. read back from the parse cache)."""
+        return self.merge(df.astype(object).where(df.notna(), None).to_dict("records"), stats)
+
+
+def mine_files(paths, miner: TemplateMiner = None, **kwargs) -> TemplateMiner:
+    """Stream each file once through the event rules and mine the lines they leave over
+    (unmatched, or only caught by the generic failure rule). kwargs go to TemplateMiner."""
+    from utils.parser import stream_alarm_events
+    miner = miner or TemplateMiner(**kwargs)
+    for path in paths:
+        for _ in stream_alarm_events(path, miner=miner):
+            pass
+    return miner
@@ -0,0 +1,163 @@
+# utils/timestamps.py
+# Fixed-layout timestamp parsing. The layout is detected once per file, after which lines
+# are parsed by slicing fixed-position fields instead of going through dateutil.
+import re
+from datetime import datetime
+
+# Layouts found at the start of a line, most specific first
+re_ts_iso_frac = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+')
+re_ts_iso = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+re_ts_tsmc = re.compile(r'^:\)/\d{8}/\d{2}:\d{2}:\d{2}(?:\.\d+)?')
+
+# Same layouts anywhere in a line
+re_tsmc = re.compile(r'\)/(?P<date>\d{8})/(?P<time>\d{2}:\d{2}:\d{2}(?:\.\d+)?)')
+re_iso = re.compile(r'(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)')
+
+
+def _micro(frac):
+    # ".149" -> 149000, ".852000" -> 852000; anything past microseconds is dropped
+    return int((frac + "000000")[:6]) if frac else 0
+
+
+def slice_iso(text: str, pos: int = 0, frac: str = None) -> datetime:
+    """`YYYY-MM-DD HH:MM:SS` starting at text[pos]."""
+    return datetime(int(text[pos:pos + 4]), int(text[pos + 5:pos + 7]), int(text[pos + 8:pos + 10]),
+                    int(text[pos + 11:pos + 13]), int(text[pos + 14:pos + 16]), int(text[pos + 17:pos + 19]),
+                    _micro(frac))
+
+
+def slice_compact(date: str, time: str) -> datetime:
+    """TSMC `YYYYMMDD` + `HH:MM:SS[.ffffff]`."""
+    return datetime(int(date[0:4]), int(date[4:6]), int(date[6:8]),
+                    int(time[0:2]), int(time[3:5]), int(time[6:8]), _micro(time[9:]))
+
+
+def _parse_iso(text):
+    # the fraction is checked on every line: files may mix "...SS" and "...SS.fff" stamps,
+    # whichever layout their first line locked in
+    if text[19:20] == ".":
+        m = re_ts_iso_frac.match(text)
+        if m:
+            return slice_iso(text, 0, text[20:m.end()])
+    return slice_iso(text) if re_ts_iso.match(text) else None
+
+
+def _parse_tsmc(text):
+    m = re_ts_tsmc.match(text)
+    return slice_compact(text[3:11], text[12:m.end()]) if m else None
+
+
+# name -> (detector regex, fast parser, pandas format of the matched prefix)
+TIMESTAMP_FORMATS = {
+    "iso_frac": (re_ts_iso_frac, _parse_iso, "%Y-%m-%d %H:%M:%S.%f"),
+    "iso": (re_ts_iso, _parse_iso, "%Y-%m-%d %H:%M:%S"),
+    "tsmc": (re_ts_tsmc, _parse_tsmc, ":)/%Y%m%d/%H:%M:%S.%f"),
+}
+_ISO_LAYOUTS = ("iso_frac", "iso")
+
+
+def search_timestamp(text: str):
+    """Find a TSMC or ISO timestamp anywhere in text; dateutil is the last resort."""
+    if not text:
+        return None
+    m = re_tsmc.search(text)
+    if m:
+        try:
+            return slice_compact(m.group("date"), m.group("time"))
+        except ValueError:
+            pass
+    m = re_iso.search(text)
+    if m:
+        ts = m.group("ts")
+        try:
+            return slice_iso(ts, 0, ts[20:])
+        except ValueError:
+            pass
+        try:
+            from dateutil import parser as dtparser
+            return dtparser.parse(ts)
+        except Exception:
+            pass
+    return None
+
+
+def detect_timestamp_format(lines, sample: int = 200):
+    """Name of the layout matching most of the first `sample` non-empty lines, or None."""
+    hits = dict.fromkeys(TIMESTAMP_FORMATS, 0)
+    seen = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        for name, (regex, _, _) in TIMESTAMP_FORMATS.items():
+            if regex.match(line):
+                hits[name] += 1
+                break
+        seen += 1
+        if seen >= sample:
+            break
+    best = max(hits, key=hits.get)
+    return best if hits[best] else None
+
+
+class TimestampParser:
+    """Per-file timestamp parser.
+
+    The layout is detected from the first line that carries a known timestamp and cached;
+    later lines are parsed with the fast slicer for that layout and only fall back to
+    `fallback` (search_timestamp by default) when they don't fit it.
+    """
+
+    def __init__(self, fmt=None, fallback=search_timestamp):
+        self.fmt = fmt
+        self.fallback = fallback
+
+    def parse(self, text: str):
+        if not text:
+            return None
+        if self.fmt is None:
+            for name, (regex, _, _) in TIMESTAMP_FORMATS.items():
+                if regex.match(text):
+                    self.fmt = name
+                    break
+        if self.fmt is not None:
+            try:
+                ts = TIMESTAMP_FORMATS[self.fmt][1](text)
+            except ValueError:
+                ts = None
+            if ts is not None:
+                return ts
+        return self.fallback(text) if self.fallback else None
+
+
+def parse_timestamp_column(texts, fmt: str = None):
+    """Vectorized parse of a sequence of lines into a datetime64 Series.
+
+    Uses `pd.to_datetime(format=...)` on the prefix for the detected layout; lines that
+    don't fit it get the same search-anywhere fallback as search_timestamp, also vectorized.
+    """
+    import pandas as pd
+
+    texts = pd.Series(texts, dtype="object")
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[us]")
+    fmt = fmt or detect_timestamp_format(texts.dropna())
+    if fmt is not None:
+        regex, _, pd_format = TIMESTAMP_FORMATS[fmt]
+        pattern = regex.pattern[1:]
+        if fmt in _ISO_LAYOUTS:
+            # either ISO layout may be mixed with the other one in a file
+            pattern, pd_format = re_ts_iso.pattern[1:] + r"(?:\.\d+)?", TIMESTAMP_FORMATS["iso_frac"][2]
+        prefix = texts.str.extract(f"^({pattern})", expand=False)
+        if fmt == "tsmc" or fmt in _ISO_LAYOUTS:
+            # stamps may omit the fraction; pad so one format string fits all
+            prefix = prefix.where(prefix.str.contains(r"\.\d+$", na=True), prefix + ".0")
+        parsed = pd.to_datetime(prefix, format=pd_format, errors="coerce").astype("datetime64[us]")
+    missing = parsed.isna() & texts.notna()
+    if missing.any():
+        found = texts[missing].str.extract(re_tsmc.pattern)
+        stamp = found["date"] + " " + found["time"].where(found["time"].str.contains(".", regex=False), found["time"] + ".0")
+        parsed[missing] = pd.to_datetime(stamp, format="%Y%m%d %H:%M:%S.%f", errors="coerce")
+    missing = parsed.isna() & texts.notna()
+    if missing.any():
+        found = texts[missing].str.extract(re_iso.pattern, expand=False)
+        parsed[missing] = pd.to_datetime(found, format="ISO8601", errors="coerce")
+    return parsed
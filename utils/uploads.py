@@ -0,0 +1,78 @@
+# utils/uploads.py
+# Content-addressed storage for files uploaded through the app. Blobs live in
+# logs/.store/<sha1>[.gz] and a manifest maps upload names to blobs, so uploading the same
+# bytes again (under any name) writes nothing. Large plain-text logs can be kept gzipped;
+# the parser decompresses them on the fly (utils.archives).
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+# plain-text uploads at least this large are gzipped when compression is enabled
+COMPRESS_MIN_BYTES = 8 * 1024 * 1024
+
+
+class UploadStore:
+    def __init__(self, root, compress_min_bytes: int = COMPRESS_MIN_BYTES):
+        self.dir = Path(root) / ".store"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.compress_min_bytes = compress_min_bytes
+        self._manifest_path = self.dir / "manifest.json"
+        self._lock = threading.RLock()
+        try:
+            self.manifest = json.loads(self._manifest_path.read_text())
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.stats = {"stored": 0, "skipped": 0}
+
+    def _save_manifest(self):
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=1))
+        os.replace(tmp, self._manifest_path)
+
+    def _blob_in_use(self, blob):
+        return any(entry["blob"] == blob for entry in self.manifest.values())
+
+    def add(self, name: str, data, compress: bool = False) -> bool:
+        """Store data (bytes/memoryview) under name; False when that content was already stored."""
+        sha = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            old = self.manifest.get(name)
+            if old is not None and old["sha1"] == sha:
+                self.stats["skipped"] += 1
+                return False
+            blob = next((e["blob"] for e in self.manifest.values() if e["sha1"] == sha), None)
+            new = blob is None
+            if new:
+                blob = sha
+                tmp = self.dir / f"{sha}.part"
+                if compress and len(data) >= self.compress_min_bytes and not _is_compressed(data):
+                    blob += ".gz"
+                    with gzip.open(tmp, "wb", compresslevel=6) as fh:
+                        fh.write(data)
+                else:
+                    with open(tmp, "wb") as fh:
+                        fh.write(data)
+                os.replace(tmp, self.dir / blob)
+            self.manifest[name] = {"sha1": sha, "blob": blob, "size": len(data)}
+            if old is not None and not self._blob_in_use(old["blob"]):
+                (self.dir / old["blob"]).unlink(missing_ok=True)
+            self._save_manifest()
+            self.stats["stored" if new else "skipped"] += 1
+            return new
+
+    def paths(self):
+        """{upload name: blob path}, sorted by name."""
+        with self._lock:
+            return {name: self.dir / entry["blob"] for name, entry in sorted(self.manifest.items())}
+
+    def stored_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.dir.iterdir() if p.name != self._manifest_path.name)
+
+
+def _is_compressed(data) -> bool:
+    head = bytes(data[:8])
+    return head.startswith((b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00", b"PK\x03\x04"))
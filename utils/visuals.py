@@ -1,34 +1,93 @@
 # utils/visuals.py
 # utils/visuals.py
-from PIL import Image, ImageDraw, ImageFont
 import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import pandas as pd
-import altair as alt
 from datetime import datetime
 
-# Try to import plotly; fallback handled in functions
-try:
-    import plotly.express as px
-    _HAS_PLOTLY = True
-except Exception:
-    _HAS_PLOTLY = False
+from utils.aggregate import bin_events
 
-def draw_root_cause_diagram_pil(events, title="diagram"):
-    width, height = 1000, max(400, 120 + 80 * len(events))
-    img = Image.new("RGBA", (width, height), "white")
-    d = ImageDraw.Draw(img)
+# Plotting/imaging backends are imported on first use: together they cost more start-up
+# time than the rest of the app, and a run that draws no chart shouldn't pay for them.
+@lru_cache(maxsize=None)
+def _altair():
+    import altair as alt
+    return alt
+
+@lru_cache(maxsize=None)
+def _plotly_express():
+    # None when plotly is missing; the counts chart falls back to Altair
+    try:
+        import plotly.express as px
+    except Exception:
+        return None
+    return px
+
+@lru_cache(maxsize=None)
+def _pil():
+    from PIL import Image, ImageDraw, ImageFont
+    return Image, ImageDraw, ImageFont
+
+# Root cause diagram: consecutive identical alarms collapse into one "xN" box and boxes are
+# drawn onto fixed-size pages, so a file with thousands of events costs one page at a time.
+DIAGRAM_WIDTH = 1000
+PAGE_BOXES = 25
+_RUN_KEYS = ["Alarm Name", "Status", "Severity"]
+
+@lru_cache(maxsize=None)
+def _font(size):
+    ImageFont = _pil()[2]
     try:
-        title_font = ImageFont.truetype("DejaVuSans.ttf", 18)
-        font = ImageFont.truetype("DejaVuSans.ttf", 14)
+        return ImageFont.truetype("DejaVuSans.ttf", size)
     except Exception:
-        title_font = ImageFont.load_default()
-        font = ImageFont.load_default()
-    d.text((20, 10), f"Root cause flow — {title}", fill="black", font=title_font)
+        return ImageFont.load_default()
+
+def collapse_runs(events):
+    """Boxes (dicts) for the diagram: runs of events with the same alarm, status and severity
+    become one box with a Count and the Raise Date of the run's first and last event."""
+    df = events if isinstance(events, pd.DataFrame) else pd.DataFrame(list(events))
+    if df.empty:
+        return []
+    df = df.reset_index(drop=True)
+    for col in _RUN_KEYS + ["Raise Date", "Message"]:
+        if col not in df.columns:
+            df[col] = None
+    keys = df[_RUN_KEYS].astype(object).where(df[_RUN_KEYS].notna(), "").astype(str)
+    starts = (keys != keys.shift()).any(axis=1).to_numpy(copy=True)
+    starts[0] = True
+    first = starts.nonzero()[0]
+    last = list(first[1:] - 1) + [len(df) - 1]
+    boxes = df.loc[first, _RUN_KEYS + ["Raise Date", "Message"]].astype(object)
+    boxes = boxes.where(boxes.notna(), None).to_dict("records")
+    last_dates = df["Raise Date"].to_numpy(dtype=object)[last]
+    for box, a, b, d in zip(boxes, first, last, last_dates):
+        box["Count"] = int(b - a + 1)
+        box["Last Date"] = None if pd.isna(d) else d
+    return boxes
+
+def diagram_page_count(boxes, page_size=PAGE_BOXES):
+    return max(1, -(-len(boxes) // page_size))
+
+def _fmt_dt(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S") if isinstance(dt, datetime) else str(dt)
 
+def _draw_page(boxes, page, title, page_size):
+    Image, ImageDraw, _ = _pil()
+    chunk = boxes[page * page_size:(page + 1) * page_size]
+    # sized to the boxes on this page: short diagrams and last pages aren't padded out
+    height = 70 + max(min(len(chunk), page_size), 1) * 70
+    img = Image.new("RGB", (DIAGRAM_WIDTH, height), "white")
+    d = ImageDraw.Draw(img)
+    n_pages = diagram_page_count(boxes, page_size)
+    d.text((20, 10), f"Root cause flow — {title}  (page {page + 1}/{n_pages})", fill="black", font=_font(18))
+
+    font = _font(14)
     start_y = 50
-    box_w = width - 120
+    box_w = DIAGRAM_WIDTH - 120
     x = 60
-    for i, ev in enumerate(events):
+    for i, ev in enumerate(chunk):
         y = start_y + i * 70
         sev = (ev.get("Severity") or "").lower()
         if "crit" in sev or "critical" in sev:
@@ -39,17 +98,59 @@ def draw_root_cause_diagram_pil(events, title="diagram"):
             color = "#ffff99"
         d.rounded_rectangle([x, y, x+box_w, y+50], radius=10, fill=color, outline="black")
         name = f"{ev.get('Alarm Name','')}"
-        dt = ev.get("Raise Date")
-        dt_str = dt.strftime("%Y-%m-%d %H:%M:%S") if isinstance(dt, datetime) else str(dt)
-        msg = ev.get("Message","")
+        dt_str = _fmt_dt(ev.get("Raise Date"))
+        if ev.get("Count", 1) > 1:
+            name = f"{name}  ×{ev['Count']}"
+            dt_str = f"{dt_str} → {_fmt_dt(ev.get('Last Date'))}"
+        msg = ev.get("Message","") or ""
         text = f"{name}  |  {ev.get('Status','')}  |  {dt_str}\n{msg[:180]}"
         d.text((x+12, y+8), text, fill="black", font=font)
-        if i < len(events)-1:
+        if i < len(chunk)-1 or (i == len(chunk)-1 and page < n_pages-1):
             d.line([(x+box_w/2, y+50), (x+box_w/2, y+60)], fill="black", width=2)
             d.polygon([(x+box_w/2-6, y+60-10),(x+box_w/2+6, y+60-10),(x+box_w/2, y+60)], fill="black")
     return img
 
-def plot_timeline_altair(events_df):
+# rendered pages as PNG bytes, LRU by the boxes they show; shared by all Streamlit sessions,
+# so every lookup, insert and eviction holds _PAGE_LOCK (drawing doesn't)
+_PAGE_CACHE = OrderedDict()
+_PAGE_CACHE_SIZE = 64
+_PAGE_LOCK = threading.Lock()
+
+def render_root_cause_page(boxes, page=0, title="diagram", page_size=PAGE_BOXES):
+    """PNG bytes of one diagram page (boxes from collapse_runs); cached by the event set."""
+    page = min(max(page, 0), diagram_page_count(boxes, page_size) - 1)
+    chunk = boxes[page * page_size:(page + 1) * page_size]
+    # a page only shows its own boxes and the page count, so those make up the key
+    key = (title, page, page_size, len(boxes), tuple(tuple(map(str, b.values())) for b in chunk))
+    with _PAGE_LOCK:
+        png = _PAGE_CACHE.get(key)
+        if png is not None:
+            _PAGE_CACHE.move_to_end(key)
+            return png
+    buf = io.BytesIO()
+    _draw_page(boxes, page, title, page_size).save(buf, format="PNG")
+    png = buf.getvalue()
+    with _PAGE_LOCK:
+        _PAGE_CACHE[key] = png
+        _PAGE_CACHE.move_to_end(key)
+        while len(_PAGE_CACHE) > _PAGE_CACHE_SIZE:
+            _PAGE_CACHE.popitem(last=False)
+    return png
+
+def draw_root_cause_diagram_pil(events, title="diagram", page=0):
+    return _pil()[0].open(io.BytesIO(render_root_cause_page(collapse_runs(events), page, title)))
+
+def plot_timeline_altair(events_df, binned=None, bucket_label=None):
+    alt = _altair()
+    if binned is not None:
+        # pre-aggregated (utils.aggregate.bin_events): one mark per bucket and alarm
+        return alt.Chart(binned).mark_circle().encode(
+            x=alt.X("bucket:T", title=f"Raise Date (per {bucket_label})" if bucket_label else "Raise Date"),
+            y=alt.Y("Alarm Name:N", title="Alarm"),
+            size=alt.Size("count:Q", title="Events"),
+            color=alt.Color("Severity:N", legend=alt.Legend(title="Severity")),
+            tooltip=["Alarm Name", "Severity", "count", "first", "last"]
+        ).interactive()
     df = events_df.copy()
     df = df.dropna(subset=["Raise Date"])
     df["Raise Date"] = pd.to_datetime(df["Raise Date"])
@@ -61,23 +162,22 @@ def plot_timeline_altair(events_df):
     ).interactive()
     return chart
 
-def plot_alarm_counts(events_df):
-    df = events_df.copy()
-    df = df.dropna(subset=["Raise Date"])
-    df["Raise Date"] = pd.to_datetime(df["Raise Date"])
-    df["date"] = df["Raise Date"].dt.floor("1D")
-    counts = df.groupby(["date","Alarm Name"]).size().reset_index(name="count")
-    if _HAS_PLOTLY:
-        fig = px.bar(counts, x="date", y="count", color="Alarm Name", title="Alarm counts per day", labels={"date":"Date","count":"Count"})
+def plot_alarm_counts(events_df, counts=None, bucket_label="day"):
+    if counts is None:
+        counts = bin_events(events_df, "1D", by=("Alarm Name",))
+    counts = counts.rename(columns={"bucket": "date"})[["date", "Alarm Name", "count"]]
+    title = f"Alarm counts per {bucket_label}"
+    px = _plotly_express()
+    if px is not None:
+        fig = px.bar(counts, x="date", y="count", color="Alarm Name", title=title, labels={"date":"Date","count":"Count"})
         return fig
     else:
         # Build an altair bar chart grouped by Alarm Name (fallback)
+        alt = _altair()
         chart = alt.Chart(counts).mark_bar().encode(
             x=alt.X("date:T", title="Date"),
             y=alt.Y("count:Q", title="Count"),
             color=alt.Color("Alarm Name:N", title="Alarm Name"),
             tooltip=["date","Alarm Name","count"]
-        ).properties(title="Alarm counts per day")
+        ).properties(title=title)
         return chart
-
-